@@ -4,6 +4,7 @@
 
 import sys
 import os
+import time
 
 # --- Fix import path for Streamlit ---
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -14,21 +15,22 @@ import streamlit as st
 import pandas as pd
 
 # --- Core pipeline imports ---
-from src.data_loader import load_netflix_data
-from src.preprocessing import preprocess_netflix_data
-from src.text_features import build_text_embeddings
-from src.clustering import build_feature_matrix, run_kmeans
-from src.promotion_risk import compute_promotion_failure_score
-from src.diversity_metrics import assess_discovery_diversity_risk
-from src.hybrid_decision_engine import hybrid_content_selection
-from src.nltk_setup import setup_nltk
+from src.pipeline import run_pipeline, DEFAULT_RISK_WEIGHTS
+from src.artifacts import save_artifacts
+from src.stage_cache import MANIFEST
+from src.shared_catalog import SharedCatalog, REFRESH_INTERVAL_S
+from src.hybrid_decision_engine import batch_content_selection
+from src.profiling import StageProfiler
+from src.risk_sweep import score_weights, sweep_risk_weights, weight_grid
 
 
 # ---------------------------
 # CONFIG
 # ---------------------------
 DATA_PATH = "data/netflix.csv"
-K_CLUSTERS = 4
+K_CLUSTERS = 4  # or "auto" to pick K with the sweep in src.k_selection
+CACHE_DIR = os.path.join(ROOT_DIR, ".cache", "stages")
+ARTIFACT_DIR = os.path.join(ROOT_DIR, "artifacts")  # published by main.py
 
 
 # ---------------------------
@@ -54,7 +56,7 @@ STRATEGIES = {
 
 
 # ---------------------------
-# CLUSTER PROFILES
+# CLUSTER PROFILES (curated for the k=4 solution)
 # ---------------------------
 CLUSTER_PROFILES = {
     0: "Recent, mainstream, short-format content (safe & familiar)",
@@ -65,24 +67,31 @@ CLUSTER_PROFILES = {
 
 
 # ---------------------------
-# PIPELINE LOADER (CACHED)
+# SHARED CATALOG (one per server process)
 # ---------------------------
-@st.cache_data(show_spinner=True)
-def load_pipeline():
-    setup_nltk()
+def publish_pipeline() -> None:
+    # Fresh checkout without artifacts: run the pipeline once and publish
+    profiler = StageProfiler()
+    results = run_pipeline(DATA_PATH, k=K_CLUSTERS, cache_dir=CACHE_DIR, profiler=profiler)
+    results['stage_timings'] = profiler.summary()
+    save_artifacts(ARTIFACT_DIR, results)
 
-    df_raw = load_netflix_data(DATA_PATH)
-    df = preprocess_netflix_data(df_raw)
 
-    X_svd, _, _ = build_text_embeddings(df)
-    X = build_feature_matrix(df, X_svd)
+@st.cache_resource(show_spinner="Loading catalog...")
+def load_catalog() -> SharedCatalog:
+    # Every session shares the same read-only snapshot (catalog, memory-
+    # mapped features, risk components, selection index); newer artifacts
+    # published by main.py are swapped in by a background thread.
+    if not os.path.exists(os.path.join(ARTIFACT_DIR, MANIFEST)):
+        publish_pipeline()
+    return SharedCatalog(ARTIFACT_DIR, REFRESH_INTERVAL_S).start()
 
-    df, _ = run_kmeans(df, X, k=K_CLUSTERS)
-    df = compute_promotion_failure_score(df, X)
 
-    diversity_report = assess_discovery_diversity_risk(df)
-
-    return df, X, diversity_report
+@st.cache_data(max_entries=4)
+def weight_sensitivity(_snapshot, created_at: float, top_n: int) -> pd.DataFrame:
+    # Top-N stability of every weighting on a 0.05 grid vs the defaults,
+    # computed once per artifact set
+    return sweep_risk_weights(_snapshot.risk_components, weight_grid(0.05), top_n)[0]
 
 
 # ============================================================
@@ -100,8 +109,15 @@ st.caption(
     "and discovery diversity in a streaming content catalog."
 )
 
-# Load data
-df, X, diversity_report = load_pipeline()
+# Load data: one snapshot per rerun, so a background refresh never
+# mixes two artifact sets within a page
+snapshot = load_catalog().snapshot
+df = snapshot.df
+diversity_report = snapshot.diversity_report
+risk_components = snapshot.risk_components
+near_duplicates = snapshot.near_duplicates
+selection_index = snapshot.selection_index
+st.caption(f"Catalog of {len(snapshot)} titles published {time.ctime(snapshot.created_at)}.")
 
 # Tabs
 tab1, tab2, tab3 = st.tabs([
@@ -127,6 +143,40 @@ with tab1:
         """
     )
 
+    # Risk weights: rescored from the cached component matrix
+    st.markdown("**Risk component weights** (normalized to sum to 1)")
+    wcol1, wcol2, wcol3 = st.columns(3)
+    raw_weights = {
+        'w_duration': wcol1.slider("Duration", 0.0, 1.0, DEFAULT_RISK_WEIGHTS['w_duration'], 0.05),
+        'w_cluster': wcol2.slider("Atypicality", 0.0, 1.0, DEFAULT_RISK_WEIGHTS['w_cluster'], 0.05),
+        'w_delay': wcol3.slider("Delay", 0.0, 1.0, DEFAULT_RISK_WEIGHTS['w_delay'], 0.05)
+    }
+    total = sum(raw_weights.values())
+    weights = (
+        {name: w / total for name, w in raw_weights.items()} if total > 0 else DEFAULT_RISK_WEIGHTS
+    )
+    scored = df.assign(promotion_failure_score=score_weights(risk_components, weights)[:, 0])
+
+    stability = sweep_risk_weights(risk_components, weights, top_n=20)[0].iloc[0]
+    scol1, scol2 = st.columns(2)
+    scol1.metric(
+        "Top-20 overlap with default weights (Jaccard)", f"{stability['jaccard']:.0%}"
+    )
+    scol2.metric(
+        "Rank agreement with default weights (Kendall τ)", f"{stability['kendall_tau']:.2f}"
+    )
+
+    with st.expander("Weight sensitivity (all weightings on a 0.05 grid)"):
+        sensitivity = weight_sensitivity(snapshot, snapshot.created_at, 20)
+        st.caption(
+            "How much the top-20 highest-risk titles change across weightings; "
+            "low Jaccard means the ranking depends strongly on the weights."
+        )
+        st.dataframe(
+            sensitivity.sort_values('jaccard').round(3).reset_index(drop=True),
+            use_container_width=True
+        )
+
     risk_threshold = st.slider(
         "Promotion Risk Threshold (risk tolerance)",
         min_value=0.10,
@@ -136,7 +186,7 @@ with tab1:
     )
 
     risky = (
-        df[df['promotion_failure_score'] >= risk_threshold]
+        scored[scored['promotion_failure_score'] >= risk_threshold]
         .sort_values('promotion_failure_score', ascending=False)
     )
 
@@ -217,15 +267,33 @@ with tab3:
             strategy['risk_threshold']
         )
 
-    # Hybrid decision engine
-    selection = hybrid_content_selection(
-        df=df,
-        diversity_report=diversity_report,
-        max_items=max_items,
-        risk_threshold=strategy['risk_threshold'],
-        exploration_bias=strategy['exploration_bias']
+    suppress_duplicates = st.checkbox(
+        "Suppress near-duplicate titles",
+        value=False,
+        disabled=near_duplicates is None,
+        help="Skip titles whose description is nearly identical to one already selected "
+             "(remakes, sequels, regional variants)."
     )
 
+    # Hybrid decision engine: every strategy preset in one batch
+    slates = dict(zip(
+        STRATEGIES,
+        batch_content_selection(
+            selection_index,
+            diversity_report,
+            [
+                {
+                    'max_items': max_items,
+                    'risk_threshold': preset['risk_threshold'],
+                    'exploration_bias': preset['exploration_bias'],
+                    'near_duplicates': near_duplicates if suppress_duplicates else None
+                }
+                for preset in STRATEGIES.values()
+            ]
+        )
+    ))
+    selection = slates[strategy_name]
+
     st.subheader("Recommended Promotion Set")
 
     st.dataframe(
@@ -238,6 +306,19 @@ with tab3:
         "Selection balances promotion safety with discovery exploration "
         "based on the chosen strategy."
     )
+
+    st.subheader("Strategy Comparison")
+    st.dataframe(
+        pd.DataFrame({
+            name: {
+                "Titles": len(slate),
+                "Mean risk": round(slate['promotion_failure_score'].mean(), 3),
+                "Clusters covered": slate['km_cluster'].nunique()
+            }
+            for name, slate in slates.items()
+        }).T,
+        use_container_width=True
+    )
 # Cluster explanations
 with st.expander("ℹ️ How to interpret content clusters"):
     st.markdown(
@@ -248,6 +329,28 @@ with st.expander("ℹ️ How to interpret content clusters"):
         """
     )
 
-    for cid, desc in CLUSTER_PROFILES.items():
+    for cid in sorted(df['km_cluster'].unique()):
+        desc = CLUSTER_PROFILES.get(cid, "Automatically discovered theme (no curated profile)")
         st.markdown(f"**Cluster {cid}:** {desc}")
 
+# Pipeline timings (from the run that published the artifacts)
+with st.expander("⏱️ Pipeline stage timings"):
+    stage_timings, stage_schedule = snapshot.stage_timings, snapshot.schedule
+    if stage_timings is None:
+        st.caption("These artifacts were published without stage timings (e.g. by an incremental update).")
+    else:
+        st.caption(
+            "Wall time, CPU time, peak memory growth and throughput per stage. "
+            "Dotted names are sub-stages; cached stages were loaded from disk."
+        )
+        st.bar_chart(stage_timings['wall_s'])
+        st.dataframe(stage_timings, use_container_width=True)
+
+    if stage_schedule is not None:
+        critical = stage_schedule.index[stage_schedule['critical']]
+        st.caption(
+            f"Independent stages run concurrently: {stage_schedule['end_s'].max():.2f} s wall "
+            f"for {stage_schedule['wall_s'].sum():.2f} s of stage time. "
+            f"Critical path: {' → '.join(critical)}."
+        )
+        st.dataframe(stage_schedule, use_container_width=True)
@@ -0,0 +1,79 @@
+# ============================
+# BENCHMARK: CLUSTERING BACKENDS
+# ============================
+# Compares exact KMeans against MiniBatchKMeans (in-memory and streamed
+# through partial_fit) on synthetic feature matrices shaped like the
+# pipeline's (50 SVD components + 4 structural columns).
+#
+#   python -m benchmarks.bench_clustering --sizes 20000 100000
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from sklearn.datasets import make_blobs
+from sklearn.metrics import adjusted_rand_score, confusion_matrix
+
+from src.clustering import fit_kmeans
+
+
+N_FEATURES = 54
+
+
+def label_agreement(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Share of points with the same cluster after optimally matching labels.
+    """
+    cm = confusion_matrix(a, b)
+    rows, cols = linear_sum_assignment(-cm)
+    return cm[rows, cols].sum() / len(a)
+
+
+def measure(X, k, **params):
+    tracemalloc.start()
+    start = time.perf_counter()
+    labels, _ = fit_kmeans(X, k=k, **params)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return labels, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    configs = {
+        'exact': {'backend': 'exact'},
+        'minibatch': {'backend': 'minibatch', 'batch_size': args.batch_size},
+        'minibatch-stream': {
+            'backend': 'minibatch',
+            'batch_size': args.batch_size,
+            'chunk_size': args.chunk_size
+        }
+    }
+
+    print(f"{'rows':>9} {'backend':<17} {'time (s)':>9} {'peak MB':>9} {'ARI':>6} {'agree':>6}")
+    for n in args.sizes:
+        X, _ = make_blobs(n_samples=n, n_features=N_FEATURES, centers=args.k,
+                          cluster_std=4.0, random_state=0)
+
+        reference = None
+        for name, params in configs.items():
+            labels, elapsed, peak = measure(X, args.k, n_threads=args.threads, **params)
+            if reference is None:
+                reference = labels
+            ari = adjusted_rand_score(reference, labels)
+            agree = label_agreement(reference, labels)
+            print(f"{n:>9} {name:<17} {elapsed:>9.2f} {peak / 2**20:>9.1f} {ari:>6.3f} {agree:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# ============================
+# BENCHMARK: STREAMING DIVERSITY TRACKER
+# ============================
+# Replays a synthetic exposure log (clusters with a drifting popularity
+# mix) through src.diversity_stream and reports events/sec, then checks
+# every tumbling window and the final sliding window against the batch
+# assess_discovery_diversity_risk. For contrast, a full value_counts
+# recompute per event is timed on a short prefix of the log.
+#
+#   python -m benchmarks.bench_diversity_stream --events 5000000
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.diversity_metrics import assess_discovery_diversity_risk
+from src.diversity_stream import DiversityStreamTracker, replay_exposures
+
+
+def make_exposure_log(n_events: int, n_clusters: int, hours: float, seed: int = 0) -> pd.DataFrame:
+    """
+    Sorted (timestamp, title, km_cluster) events; the dominant cluster
+    shifts over the log so windows move between risk levels.
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = np.sort(rng.uniform(0, hours * 3600, n_events))
+
+    phase = timestamps / timestamps[-1]
+    weights = np.exp(-np.abs(np.arange(n_clusters)[None, :] - phase[:, None] * (n_clusters - 1)) * 3)
+    cumulative = np.cumsum(weights / weights.sum(axis=1, keepdims=True), axis=1)
+    clusters = (rng.random(n_events)[:, None] > cumulative).sum(axis=1)
+    clusters = np.minimum(clusters, n_clusters - 1)
+
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'title': 'Title ' + pd.Series(rng.integers(0, 10_000, n_events)).astype(str),
+        'km_cluster': clusters
+    })
+
+
+def max_difference(stream: dict, batch: dict) -> float:
+    keys = ('entropy', 'top1_dominance', 'top2_dominance')
+    diff = max(abs(stream[k] - batch[k]) for k in keys)
+    dist = (stream['cluster_distribution'] - batch['cluster_distribution']).abs().max()
+    return max(diff, dist)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--clusters", type=int, default=8)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--window", type=float, default=3600)
+    parser.add_argument("--slide", type=float, default=60)
+    parser.add_argument("--naive-events", type=int, default=5_000)
+    args = parser.parse_args()
+
+    log = make_exposure_log(args.events, args.clusters, args.hours)
+
+    tracker = DiversityStreamTracker(args.window, args.slide)
+    start = time.perf_counter()
+    reports = replay_exposures(tracker, log)
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {len(log)} events in {elapsed:.2f} s "
+          f"({len(log) / elapsed:,.0f} events/sec)")
+
+    # Correctness against the batch metrics
+    worst = 0.0
+    flags_match = True
+    window_ids = (log['timestamp'] // args.window).to_numpy()
+    for report in reports:
+        rows = log[window_ids == report['window_start'] // args.window]
+        batch = assess_discovery_diversity_risk(rows)
+        worst = max(worst, max_difference(report, batch))
+        flags_match &= report['diversity_risk'] == batch['diversity_risk']
+
+    sliding = tracker.sliding_report()
+    recent = log[log['timestamp'] >= sliding['window_start']]
+    worst = max(worst, max_difference(sliding, assess_discovery_diversity_risk(recent)))
+
+    print(f"Tumbling windows: {len(reports)}, flags "
+          f"{[r['diversity_risk'] for r in reports[:6]]}{' ...' if len(reports) > 6 else ''}")
+    print(f"Max |stream - batch| over all windows: {worst:.2e}, "
+          f"flags match: {flags_match}")
+
+    # Naive: recompute the batch report after every event
+    prefix = log.head(args.naive_events)
+    start = time.perf_counter()
+    for i in range(1, len(prefix) + 1):
+        assess_discovery_diversity_risk(prefix.iloc[max(0, i - 1000):i])
+    naive = time.perf_counter() - start
+    print(f"Naive recompute per event: {len(prefix) / naive:,.0f} events/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# ============================
+# BENCHMARK: IMPORT TIME
+# ============================
+# Cold-import cost of the CLI and service entry points, measured with
+# `python -X importtime` in a fresh interpreter per run. Prints the
+# slowest imports under each module and exits non-zero when a module's
+# median cumulative import time exceeds its budget.
+#
+#   python -m benchmarks.bench_import_time --repeats 5
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+import numpy as np
+
+
+# Budgets in milliseconds (cumulative, including dependencies)
+IMPORT_BUDGETS_MS = {
+    'main': 50,
+    'src.nltk_setup': 100,
+    'src.text_features': 800,
+    'src.diversity_metrics': 800,
+    'src.service': 3000,
+}
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Maps each imported module to its cumulative import time in ms."""
+    times = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(2)) / 1000
+    return times
+
+
+def measure_import(module: str) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=root, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--modules", nargs="*", default=list(IMPORT_BUDGETS_MS))
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<24}{'median ms':>11}{'budget ms':>11}  status")
+    for module in args.modules:
+        runs = [measure_import(module) for _ in range(args.repeats)]
+        median = float(np.median([r[module] for r in runs]))
+        budget = IMPORT_BUDGETS_MS.get(module)
+        ok = budget is None or median <= budget
+        if not ok:
+            failures.append(module)
+
+        print(f"{module:<24}{median:>11.1f}{budget or float('nan'):>11.0f}  {'ok' if ok else 'OVER'}")
+
+        slowest = sorted(
+            ((t, name) for name, t in runs[-1].items() if name != module),
+            reverse=True
+        )[:args.top]
+        for t, name in slowest:
+            print(f"    {name:<36}{t:>8.1f} ms")
+
+    if failures:
+        print(f"\nOver budget: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nAll modules within budget.")
+
+
+if __name__ == "__main__":
+    main()
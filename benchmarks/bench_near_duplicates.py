@@ -0,0 +1,102 @@
+# ============================
+# BENCHMARK: NEAR-DUPLICATE INDEX
+# ============================
+# LSH near-duplicate report (src.near_duplicates) against an exact
+# blockwise all-pairs scan of the SVD embeddings, on synthetic catalogs
+# with planted near-duplicate descriptions (one word dropped or added).
+# Reports build time, pairs found, recall against the exact pairs and
+# the cost of a selection-time "too similar" check.
+#
+#   python -m benchmarks.bench_near_duplicates --sizes 20000 100000
+
+import argparse
+import time
+
+import numpy as np
+
+from src.preprocessing import preprocess_netflix_data
+from src.text_features import build_text_embeddings
+from src.near_duplicates import NearDuplicateIndex, NEAR_DUPLICATE_THRESHOLD
+from benchmarks.synthetic import make_catalog
+
+
+def plant_duplicates(df, share: float, seed: int = 0):
+    """
+    Rewrites share of the descriptions as lightly edited copies of others.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(len(df) * share)
+    rows = rng.choice(len(df), size=2 * n, replace=False)
+    sources, targets = rows[:n], rows[n:]
+
+    descriptions = df['description'].to_numpy(dtype=object).copy()
+    for src, dst in zip(sources, targets):
+        words = descriptions[src].split()
+        if rng.random() < 0.5 and len(words) > 3:
+            del words[rng.integers(len(words))]
+        else:
+            words.insert(rng.integers(len(words) + 1), words[rng.integers(len(words))])
+        descriptions[dst] = ' '.join(words)
+    df['description'] = descriptions
+    return df
+
+
+def exact_pairs(vectors: np.ndarray, threshold: float, block: int = 2048) -> set:
+    pairs = set()
+    for lo in range(0, len(vectors), block):
+        sims = vectors[lo:lo + block] @ vectors.T
+        rows, cols = np.nonzero(sims >= threshold)
+        rows = rows + lo
+        keep = rows < cols
+        pairs.update(zip(rows[keep].tolist(), cols[keep].tolist()))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20_000, 50_000])
+    parser.add_argument("--tables", type=int, nargs="+", default=[4, 8, 12])
+    parser.add_argument("--duplicate-share", type=float, default=0.02)
+    parser.add_argument("--threshold", type=float, default=NEAR_DUPLICATE_THRESHOLD)
+    parser.add_argument("--checks", type=int, default=1000)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9}{'tables':>8}{'build s':>9}{'pairs s':>9}{'exact s':>9}"
+          f"{'pairs':>8}{'exact':>8}{'recall':>8}{'check µs':>10}")
+    for n in args.sizes:
+        df = preprocess_netflix_data(plant_duplicates(make_catalog(n), args.duplicate_share))
+        X_svd = build_text_embeddings(df, n_jobs=args.n_jobs)[0]
+
+        start = time.perf_counter()
+        vectors = NearDuplicateIndex.build(X_svd, n_tables=1).vectors
+        exact = exact_pairs(vectors, args.threshold)
+        t_exact = time.perf_counter() - start
+
+        rng = np.random.default_rng(0)
+        for n_tables in args.tables:
+            start = time.perf_counter()
+            index = NearDuplicateIndex.build(X_svd, n_tables=n_tables, threshold=args.threshold)
+            t_build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            pairs = index.near_duplicate_pairs()
+            t_pairs = time.perf_counter() - start
+
+            found = set(map(tuple, pairs[:, :2].astype(int).tolist()))
+            recall = len(found & exact) / len(exact) if exact else 1.0
+
+            # Selection-time check against a 20-title slate
+            slate = rng.choice(n, size=20, replace=False).tolist()
+            candidates = rng.integers(n, size=args.checks)
+            start = time.perf_counter()
+            for row in candidates:
+                index.is_too_similar(int(row), slate)
+            t_check = (time.perf_counter() - start) / args.checks
+
+            print(f"{n:>9}{n_tables:>8}{t_build:>9.2f}{t_pairs:>9.2f}{t_exact:>9.2f}"
+                  f"{len(found):>8}{len(exact):>8}{recall:>8.1%}{t_check * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
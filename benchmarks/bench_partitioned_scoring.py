@@ -0,0 +1,157 @@
+# ============================
+# BENCHMARK: OUT-OF-CORE RISK SCORING
+# ============================
+# Fits models on a small synthetic base catalog, then scores a larger
+# synthetic catalog split into CSV partitions two ways: out of core with
+# src.partitioned_scoring (worker processes, sketched medians) and in
+# memory with compute_promotion_failure_score on the concatenated frame.
+# Each mode runs in its own interpreter; reports wall time, peak RSS and
+# the score differences.
+#
+#   python -m benchmarks.bench_partitioned_scoring --rows 400000 --partitions 8 --workers 4
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing import preprocess_netflix_data
+from src.pipeline import fit_catalog
+from src.artifacts import save_artifacts, load_models
+from src.incremental import embed_new_titles
+from src.promotion_risk import compute_promotion_failure_score, DEFAULT_RISK_WEIGHTS
+from src.partitioned_scoring import score_partitions, list_partitions
+from benchmarks.synthetic import make_catalog
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def write_partitions(directory: str, n_rows: int, n_parts: int, missing: float) -> None:
+    """
+    Synthetic raw partitions, with a share of durations blanked out so
+    the sketched medians are exercised.
+    """
+    rng = np.random.default_rng(1)
+    os.makedirs(directory)
+    per_part = n_rows // n_parts
+    for i in range(n_parts):
+        part = make_catalog(per_part, seed=i + 1, start_id=1_000_000 + i * per_part)
+        part.loc[rng.random(len(part)) < missing, 'duration'] = None
+        part.to_csv(os.path.join(directory, f"part-{i:03d}.csv"), index=False)
+
+
+# --------------------------------------------------
+# Modes, each run in a fresh interpreter so peak RSS is its own (Linux
+# keeps ru_maxrss across exec, so the parent must stay small too)
+# --------------------------------------------------
+def prepare(workdir: str, args) -> dict:
+    base = preprocess_netflix_data(make_catalog(args.base_rows))
+    save_artifacts(os.path.join(workdir, 'artifacts'), fit_catalog(base, k=4, n_jobs=-1))
+    write_partitions(os.path.join(workdir, 'parts'), args.rows, args.partitions, args.missing)
+    return {}
+
+
+def run_out_of_core(workdir: str, args) -> dict:
+    start = time.perf_counter()
+    result = score_partitions(
+        os.path.join(workdir, 'parts'), os.path.join(workdir, 'scored'),
+        os.path.join(workdir, 'artifacts'), n_workers=args.workers
+    )
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(workdir, 'medians.json'), 'w') as f:
+        json.dump({k: float(result['stats'][k]) for k in ('duration_median', 'delay_median')}, f)
+    return {'seconds': elapsed, 'peak_rss_mb': max(peak_rss_mb(), peak_rss_mb(resource.RUSAGE_CHILDREN))}
+
+
+def run_in_memory(workdir: str, args) -> dict:
+    models = load_models(os.path.join(workdir, 'artifacts'))
+    start = time.perf_counter()
+    paths = list_partitions(os.path.join(workdir, 'parts'))
+    df = preprocess_netflix_data(pd.concat([pd.read_csv(p) for p in paths], ignore_index=True))
+    X = embed_new_titles(df, models, n_jobs=args.workers)
+    kmeans = models['kmeans']
+    df['km_cluster'] = kmeans.predict(X)
+    df = compute_promotion_failure_score(
+        df, X, centers=kmeans.cluster_centers_, **models['risk_stats']['weights']
+    )
+    elapsed = time.perf_counter() - start
+    df[['km_cluster', 'promotion_failure_score', 'duration_int', 'delay_years']].to_parquet(
+        os.path.join(workdir, 'in_memory.parquet')
+    )
+    return {'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}
+
+
+MODES = {'prepare': prepare, 'out_of_core': run_out_of_core, 'in_memory': run_in_memory}
+
+
+def run_mode(mode: str, workdir: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_partitioned_scoring',
+         '--run', mode, '--dir', workdir, *sys.argv[1:]],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--base-rows", type=int, default=20_000)
+    parser.add_argument("--missing", type=float, default=0.01)
+    parser.add_argument("--run", choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(MODES[args.run](args.dir, args)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run_mode('prepare', tmp)
+        ooc = run_mode('out_of_core', tmp)
+        mem = run_mode('in_memory', tmp)
+
+        scored = pd.concat(
+            [pd.read_parquet(p) for p in list_partitions(os.path.join(tmp, 'scored'))],
+            ignore_index=True
+        )
+        df = pd.read_parquet(os.path.join(tmp, 'in_memory.parquet'))
+        with open(os.path.join(tmp, 'medians.json')) as f:
+            medians = json.load(f)
+
+    diff = np.abs(scored['promotion_failure_score'].to_numpy() - df['promotion_failure_score'].to_numpy())
+    imputed = (df['duration_int'].isna() | df['delay_years'].isna()).to_numpy()
+
+    # Score tolerance for imputed rows (see src.partitioned_scoring)
+    def _spread(values):
+        p49, p51 = values.quantile([0.49, 0.51])
+        return (p51 - p49) / (values.max() - values.min())
+    bound = (
+        1.3 * DEFAULT_RISK_WEIGHTS['w_duration'] * _spread(df['duration_int']) +
+        DEFAULT_RISK_WEIGHTS['w_delay'] * _spread(df['delay_years'])
+    )
+
+    print(f"{len(df)} rows in {args.partitions} partitions, {args.workers} workers\n")
+    print(f"Out of core: {ooc['seconds']:.2f} s, peak RSS {ooc['peak_rss_mb']:.0f} MB (largest process)")
+    print(f"In memory:   {mem['seconds']:.2f} s, peak RSS {mem['peak_rss_mb']:.0f} MB")
+    print(f"\nCluster labels identical: {(scored['km_cluster'].to_numpy() == df['km_cluster'].to_numpy()).all()}")
+    print(f"Duration median: sketch {medians['duration_median']}, exact {df['duration_int'].median()}")
+    print(f"Delay median:    sketch {medians['delay_median']}, exact {df['delay_years'].median()}")
+    print(f"Max |score diff|, complete rows: {diff[~imputed].max():.2e}")
+    print(f"Max |score diff|, imputed rows ({imputed.sum()}): "
+          f"{diff[imputed].max() if imputed.any() else 0:.2e} (bound {bound:.2e})")
+
+
+if __name__ == "__main__":
+    main()
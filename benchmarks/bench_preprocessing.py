@@ -0,0 +1,86 @@
+# ============================
+# BENCHMARK: PREPROCESSING
+# ============================
+# Checks that the vectorized preprocess_netflix_data produces the same
+# frame as the original row-wise implementation and reports the speedup
+# on synthetic catalogs.
+#
+#   python -m benchmarks.bench_preprocessing --sizes 100000 500000
+
+import argparse
+import time
+
+import pandas as pd
+
+from src.preprocessing import preprocess_netflix_data, PLACEHOLDERS
+from benchmarks.synthetic import make_catalog
+
+
+def reference_preprocess(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    The original implementation, kept verbatim for comparison.
+    """
+    df = df_raw.copy()
+
+    df.replace(PLACEHOLDERS, pd.NA, inplace=True)
+
+    df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
+    df['year_added'] = df['date_added'].dt.year
+
+    for col in ['director', 'cast', 'country', 'rating', 'listed_in']:
+        df[col] = df[col].fillna('Unknown').astype(str).str.strip()
+
+    df['description'] = df['description'].fillna('').astype(str)
+
+    df['duration'] = df['duration'].astype(str)
+    df['duration_int'] = df['duration'].str.extract(r'(\d+)', expand=False).astype(float)
+    df['duration_type'] = (
+        df['duration']
+        .str.extract(r'([A-Za-z]+)', expand=False)
+        .str.lower()
+        .fillna('')
+    )
+
+    df['num_genres'] = df['listed_in'].apply(
+        lambda x: len(str(x).split(',')) if pd.notna(x) else 0
+    )
+
+    df['release_year'] = pd.to_numeric(df['release_year'], errors='coerce')
+    df['delay_years'] = df['year_added'] - df['release_year']
+    df['delay_years'] = df['delay_years'].where(df['delay_years'].between(0, 50))
+
+    return df
+
+
+def best_of(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50_000, 200_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'reference (s)':>14} {'vectorized (s)':>15} {'no-copy (s)':>12} {'speedup':>8}")
+    for n in args.sizes:
+        raw = make_catalog(n)
+
+        pd.testing.assert_frame_equal(reference_preprocess(raw), preprocess_netflix_data(raw))
+
+        t_ref = best_of(lambda: reference_preprocess(raw), args.repeats)
+        t_vec = best_of(lambda: preprocess_netflix_data(raw), args.repeats)
+        t_inplace = best_of(lambda: preprocess_netflix_data(raw.copy(), copy=False), args.repeats)
+
+        print(f"{n:>9} {t_ref:>14.3f} {t_vec:>15.3f} {t_inplace:>12.3f} {t_ref / t_vec:>7.1f}x")
+
+    print("\nOutputs identical to the reference implementation.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# ============================
+# BENCHMARK: RISK-WEIGHT SWEEP
+# ============================
+# Scores a synthetic catalog under a full weight grid with
+# src.risk_sweep (one matrix product per row block + argpartition)
+# against rerunning compute_promotion_failure_score per weight vector,
+# and counts where their top-N sets differ (only expected for titles
+# tied at the cut-off up to float rounding).
+#
+#   python -m benchmarks.bench_risk_sweep --rows 500000 --step 0.01
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.preprocessing import preprocess_netflix_data
+from src.promotion_risk import (
+    compute_promotion_failure_score, compute_risk_components, fit_risk_stats, RISK_COMPONENTS
+)
+from src.risk_sweep import weight_grid, sweep_risk_weights
+from benchmarks.synthetic import make_catalog
+
+
+N_FEATURES = 54
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--step", type=float, default=0.02)
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--naive-weights", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = preprocess_netflix_data(make_catalog(args.rows))
+    X = rng.standard_normal((len(df), N_FEATURES)).astype(np.float32)
+    df['km_cluster'] = rng.integers(0, 4, len(df))
+    stats = fit_risk_stats(df, X, df['km_cluster'].to_numpy())
+    weights = weight_grid(args.step)
+
+    start = time.perf_counter()
+    components = compute_risk_components(df, X, stats=stats)
+    t_components = time.perf_counter() - start
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    frame, top = sweep_risk_weights(components, weights, args.top_n)
+    t_sweep = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Naive: rescore the frame once per weight vector (on a sample)
+    sample = rng.choice(len(weights), size=min(args.naive_weights, len(weights)), replace=False)
+    mismatches = 0
+    start = time.perf_counter()
+    for i in sample:
+        w = dict(zip(RISK_COMPONENTS, weights[i]))
+        scored = compute_promotion_failure_score(df.copy(), X, stats=stats, **w)
+        naive_top = (-scored['promotion_failure_score'].to_numpy()).argsort(kind='stable')[:args.top_n]
+        mismatches += len(set(naive_top) ^ set(top[i]))
+    t_naive = (time.perf_counter() - start) / len(sample)
+
+    print(f"{len(df)} rows, {len(weights)} weight vectors, top-{args.top_n}\n")
+    print(f"Component matrix:        {t_components:.2f} s")
+    print(f"Sweep (all weights):     {t_sweep:.2f} s "
+          f"({t_sweep / len(weights) * 1000:.2f} ms/weight vector, peak {peak / 2**20:.1f} MB)")
+    print(f"Rescore per weight:      {t_naive * 1000:.1f} ms/weight vector "
+          f"(~{t_naive * len(weights):.0f} s for the grid)")
+    print(f"Top-N mismatches on {len(sample)} sampled weights: {mismatches}")
+
+    print("\nStability against the default weights:")
+    print(frame[['jaccard', 'kendall_tau']].describe().round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
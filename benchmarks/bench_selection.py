@@ -0,0 +1,111 @@
+# ============================
+# BENCHMARK: SELECTION LATENCY
+# ============================
+# Latency of hybrid_content_selection versus the precomputed
+# SelectionIndex across max_items and strategy settings, with an
+# equality check on every combination, plus one batch of many
+# segment/strategy specs against independent scans.
+#
+#   python -m benchmarks.bench_selection --rows 1000000
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.diversity_metrics import assess_discovery_diversity_risk
+from src.hybrid_decision_engine import (
+    hybrid_content_selection, SelectionIndex, batch_content_selection
+)
+
+
+STRATEGIES = [(0.35, "LOW"), (0.60, "MEDIUM"), (0.75, "HIGH")]
+MAX_ITEMS = [5, 10, 20, 50]
+
+
+def make_scored_catalog(n_rows: int, k: int = 4, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'title': [f"Title {i}" for i in range(n_rows)],
+        'km_cluster': rng.choice(k, n_rows, p=np.linspace(1, 2, k) / np.linspace(1, 2, k).sum()),
+        'promotion_failure_score': rng.beta(2, 4, n_rows)
+    })
+
+
+def latency_ms(fn, repeats: int) -> tuple:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.median(times), np.percentile(times, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=30)
+    parser.add_argument("--batch-specs", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    df = make_scored_catalog(args.rows)
+    report = assess_discovery_diversity_risk(df)
+
+    start = time.perf_counter()
+    index = SelectionIndex(df)
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms for {args.rows} rows\n")
+
+    print(f"{'threshold':>9} {'bias':>6} {'items':>5} {'scan p50':>9} {'scan p99':>9} "
+          f"{'index p50':>10} {'index p99':>10} {'speedup':>8}")
+    for threshold, bias in STRATEGIES:
+        for max_items in MAX_ITEMS:
+            params = dict(max_items=max_items, risk_threshold=threshold, exploration_bias=bias)
+
+            expected = hybrid_content_selection(df, report, **params)
+            pd.testing.assert_frame_equal(expected, index.select(report, **params))
+
+            scan = latency_ms(lambda: hybrid_content_selection(df, report, **params), args.repeats)
+            fast = latency_ms(lambda: index.select(report, **params), args.repeats)
+            print(f"{threshold:>9.2f} {bias:>6} {max_items:>5} {scan[0]:>8.2f}ms {scan[1]:>8.2f}ms "
+                  f"{fast[0]:>9.3f}ms {fast[1]:>9.3f}ms {scan[0] / fast[0]:>7.0f}x")
+
+    run_batch(df, report, index, args.batch_specs, args.workers)
+
+
+def run_batch(df, report, index, n_specs, workers):
+    rng = np.random.default_rng(1)
+    clusters = report['cluster_distribution'].index.tolist()
+    specs = [
+        {
+            'risk_threshold': float(rng.choice([0.35, 0.6, 0.75])),
+            'exploration_bias': str(rng.choice(["LOW", "MEDIUM", "HIGH"])),
+            'max_items': int(rng.choice(MAX_ITEMS)),
+            'clusters': None if rng.random() < 0.5 else rng.choice(clusters, 2, replace=False).tolist()
+        }
+        for _ in range(n_specs)
+    ]
+
+    def scan_all():
+        for spec in specs:
+            params = {k: v for k, v in spec.items() if k != 'clusters'}
+            subset = df if spec['clusters'] is None else df[df['km_cluster'].isin(spec['clusters'])]
+            hybrid_content_selection(subset, report, **params)
+
+    start = time.perf_counter()
+    scan_all()
+    t_scan = time.perf_counter() - start
+
+    timings = {}
+    for w in (1, workers):
+        start = time.perf_counter()
+        batch_content_selection(index, report, specs, max_workers=w)
+        timings[w] = time.perf_counter() - start
+
+    print(f"\nBatch of {n_specs} specs: independent scans {t_scan * 1000:.0f} ms, "
+          + ", ".join(f"batch ({w} worker{'s' if w > 1 else ''}) {t * 1000:.1f} ms" for w, t in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
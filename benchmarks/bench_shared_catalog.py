@@ -0,0 +1,79 @@
+# ============================
+# BENCHMARK: SHARED CATALOG vs PER-SESSION COPIES
+# ============================
+# Publishes artifacts for a synthetic catalog, then compares what N
+# concurrent Streamlit sessions cost when every rerun unpickles its own
+# copy of the loader output (st.cache_data) with handing all of them
+# the same src.shared_catalog snapshot.
+#
+#   python -m benchmarks.bench_shared_catalog --rows 200000 --sessions 20
+
+import argparse
+import os
+import pickle
+import tempfile
+import time
+import tracemalloc
+
+from src.preprocessing import preprocess_netflix_data
+from src.pipeline import fit_catalog
+from src.artifacts import save_artifacts
+from src.shared_catalog import SharedCatalog
+from benchmarks.synthetic import make_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_dir = os.path.join(tmp, 'artifacts')
+        start = time.perf_counter()
+        results = fit_catalog(
+            preprocess_netflix_data(make_catalog(args.rows)), k=4,
+            kmeans_params={'silhouette': 'sample'}, n_jobs=-1
+        )
+        save_artifacts(artifact_dir, results)
+        del results
+        t_fit = time.perf_counter() - start
+
+        start = time.perf_counter()
+        catalog = SharedCatalog(artifact_dir)
+        t_load = time.perf_counter() - start
+        snapshot = catalog.snapshot
+
+        # st.cache_data: the loader output is pickled once, and every
+        # rerun gets its own unpickled copy
+        payload = pickle.dumps(
+            (snapshot.df, snapshot.diversity_report, snapshot.stage_timings, snapshot.risk_components)
+        )
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        copies = [pickle.loads(payload) for _ in range(args.sessions)]
+        t_copies = (time.perf_counter() - start) / args.sessions
+        _, peak_copies = tracemalloc.get_traced_memory()
+        del copies
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        shared = [catalog.snapshot for _ in range(args.sessions)]
+        t_shared = (time.perf_counter() - start) / args.sessions
+        _, peak_shared = tracemalloc.get_traced_memory()
+        del shared
+        tracemalloc.stop()
+
+    print(f"{args.rows} rows, {args.sessions} concurrent sessions\n")
+    print(f"Full pipeline (first visitor, no artifacts): {t_fit:.2f} s")
+    print(f"Shared snapshot load (once per process):    {t_load:.2f} s")
+    print(f"\nPer-session copies: {t_copies * 1000:.2f} ms/rerun, "
+          f"{peak_copies / 2**20:.1f} MB for all sessions")
+    print(f"Shared snapshot:    {t_shared * 1e6:.2f} µs/rerun, "
+          f"{peak_shared / 2**20:.3f} MB for all sessions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# ============================
+# BENCHMARK: SVD SOLVERS
+# ============================
+# Fit time and explained variance of TruncatedSVD settings on the
+# pipeline's TF-IDF matrix (synthetic catalog), against the current
+# default, plus the cost of a transform-only run with persisted models.
+#
+#   python -m benchmarks.bench_svd --rows 200000
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.preprocessing import preprocess_netflix_data
+from src.text_features import (
+    clean_descriptions, transform_text, save_text_models, load_text_models,
+    TFIDF_PARAMS, SVD_COMPONENTS, SVD_PARAMS
+)
+from benchmarks.synthetic import make_catalog
+
+
+CONFIGS = {
+    'default (float64)': {},
+    'arpack (float64)': {'algorithm': 'arpack'},
+    'randomized float32': {'dtype': 'float32'},
+    'float32 n_iter=2': {'dtype': 'float32', 'n_iter': 2},
+    'float32 n_iter=7 os=20': {'dtype': 'float32', 'n_iter': 7, 'n_oversamples': 20},
+}
+
+
+def fit_svd(texts, params: dict):
+    params = {**SVD_PARAMS, **params}
+    dtype = np.dtype(params.pop('dtype'))
+    vectorizer = TfidfVectorizer(dtype=dtype, **TFIDF_PARAMS)
+    tfidf = vectorizer.fit_transform(texts)
+
+    svd = TruncatedSVD(n_components=SVD_COMPONENTS, random_state=42, **params)
+    start = time.perf_counter()
+    svd.fit(tfidf)
+    return vectorizer, svd, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    df = preprocess_netflix_data(make_catalog(args.rows))
+    texts = clean_descriptions(df['description'], n_jobs=args.n_jobs)
+
+    print(f"{args.rows} rows, {SVD_COMPONENTS} components\n")
+    print(f"{'config':<26}{'fit s':>8}{'explained var':>15}{'vs default':>12}")
+    fitted = {}
+    for name, params in CONFIGS.items():
+        vectorizer, svd, elapsed = fit_svd(texts, params)
+        fitted[name] = (vectorizer, svd)
+        explained = svd.explained_variance_ratio_.sum()
+        base = fitted['default (float64)'][1].explained_variance_ratio_.sum()
+        print(f"{name:<26}{elapsed:>8.2f}{explained:>15.4f}{explained / base:>12.2%}")
+
+    # Transform-only run with persisted models
+    vectorizer, svd = fitted['randomized float32']
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'text_models.joblib')
+        save_text_models(path, vectorizer, svd, params={})
+        size_mb = os.path.getsize(path) / 2**20
+
+        start = time.perf_counter()
+        vectorizer, svd = load_text_models(path, params={})
+        X_svd = transform_text(texts, vectorizer, svd)
+        elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fit_svd(texts, CONFIGS['randomized float32'])
+    fit_elapsed = time.perf_counter() - start
+
+    print(f"\nTF-IDF + SVD fit (float32):       {fit_elapsed:.2f} s")
+    print(f"Load persisted models + transform: {elapsed:.2f} s "
+          f"({size_mb:.1f} MB on disk, output {X_svd.dtype} {X_svd.shape})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# ============================
+# BENCHMARK: TEXT EMBEDDING MODES
+# ============================
+# Exact TfidfVectorizer + TruncatedSVD versus the streaming hashed TF-IDF
+# (src.streaming_text) on synthetic catalogs: fit time, peak traced
+# memory, overlap of the top document-frequency terms and agreement of
+# the resulting KMeans clusters.
+#
+#   python -m benchmarks.bench_text_embeddings --sizes 50000 200000
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import adjusted_rand_score
+
+from src.preprocessing import preprocess_netflix_data
+from src.text_features import clean_descriptions, TFIDF_PARAMS, SVD_COMPONENTS
+from src.streaming_text import fit_streaming_embeddings
+from src.clustering import build_feature_matrix, fit_kmeans
+from benchmarks.synthetic import make_catalog
+from benchmarks.bench_clustering import label_agreement
+
+
+def fit_exact(texts):
+    vectorizer = TfidfVectorizer(**TFIDF_PARAMS)
+    svd = TruncatedSVD(n_components=SVD_COMPONENTS, random_state=42)
+    return svd.fit_transform(vectorizer.fit_transform(texts)), vectorizer, svd
+
+
+def fit_hashing(texts, chunk_size, svd_sample_size):
+    return fit_streaming_embeddings(
+        texts, TFIDF_PARAMS, SVD_COMPONENTS,
+        chunk_size=chunk_size, svd_sample_size=svd_sample_size
+    )
+
+
+def measure(fn):
+    # Timed untraced; tracemalloc slows the pure-Python tokenizer a lot
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def top_term_overlap(exact_vectorizer, hashed_vectorizer, n: int) -> float:
+    """
+    Share of the exact mode's n highest-DF terms whose hash buckets are
+    among the hashed mode's n highest-DF buckets.
+    """
+    terms = exact_vectorizer.get_feature_names_out()
+    top_terms = terms[np.argsort(exact_vectorizer.idf_, kind='stable')[:n]]
+    exact_buckets = {hashed_vectorizer.bucket(t) for t in top_terms}
+    return len(exact_buckets & set(hashed_vectorizer.top_buckets(n))) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20_000, 100_000])
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--top-terms", type=int, default=500)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--svd-sample-size", type=int, default=50_000)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9}  {'mode':<8}{'fit s':>9}{'peak MB':>10}"
+          f"{'top-term overlap':>18}{'ARI':>7}{'agreement':>11}")
+    for n in args.sizes:
+        df = preprocess_netflix_data(make_catalog(n))
+        texts = clean_descriptions(df['description'], n_jobs=args.n_jobs)
+
+        (X_exact, exact_vec, _), t_exact, m_exact = measure(lambda: fit_exact(texts))
+        (X_hash, hash_vec, _), t_hash, m_hash = measure(
+            lambda: fit_hashing(texts, args.chunk_size, args.svd_sample_size)
+        )
+
+        labels_exact, _ = fit_kmeans(build_feature_matrix(df, X_exact), k=args.k)
+        labels_hash, _ = fit_kmeans(build_feature_matrix(df, X_hash), k=args.k)
+
+        overlap = top_term_overlap(exact_vec, hash_vec, args.top_terms)
+        ari = adjusted_rand_score(labels_exact, labels_hash)
+        agreement = label_agreement(labels_exact, labels_hash)
+
+        print(f"{n:>9}  {'tfidf':<8}{t_exact:>9.2f}{m_exact / 2**20:>10.1f}")
+        print(f"{n:>9}  {'hashing':<8}{t_hash:>9.2f}{m_hash / 2**20:>10.1f}"
+              f"{overlap:>18.1%}{ari:>7.3f}{agreement:>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# ============================
+# LOAD TEST: SCORING SERVICE
+# ============================
+# Drives a running src.service instance on localhost with concurrent
+# keep-alive connections and reports client-side throughput and p50/p99
+# latency per endpoint, followed by the server's own /metrics.
+#
+#   python -m src.service --artifacts artifacts &
+#   python -m benchmarks.load_test --concurrency 32 --duration 20
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_catalog
+
+
+STRATEGIES = [
+    {'risk_threshold': 0.35, 'exploration_bias': 'LOW'},
+    {'risk_threshold': 0.60, 'exploration_bias': 'MEDIUM'},
+    {'risk_threshold': 0.75, 'exploration_bias': 'HIGH'}
+]
+
+
+def build_requests(n_titles: int = 500) -> list:
+    titles = make_catalog(n_titles, seed=7).astype(object)
+    titles = titles.where(titles.notna(), None).to_dict(orient='records')
+    for t in titles:
+        t['release_year'] = int(t['release_year'])
+
+    requests = []
+    for i, title in enumerate(titles):
+        requests.append(('POST', '/score', {'titles': [title]}))
+        requests.append(('POST', '/select', {**STRATEGIES[i % 3], 'max_items': 10 + i % 11}))
+        if i % 10 == 0:
+            requests.append(('GET', '/diversity', None))
+    return requests
+
+
+async def call(reader, writer, method, path, payload):
+    body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode('latin-1')
+        + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, requests, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for method, path, payload in requests:
+            if time.perf_counter() >= deadline:
+                break
+            start = time.perf_counter()
+            status, _ = await call(reader, writer, method, path, payload)
+            latencies.setdefault(path, []).append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors[path] = errors.get(path, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    requests = build_requests()
+    deadline = time.perf_counter() + args.duration
+    latencies, errors = {}, {}
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(args.host, args.port, itertools.islice(itertools.cycle(requests), i, None),
+               deadline, latencies, errors)
+        for i in range(args.concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.0f} req/s, "
+          f"{args.concurrency} connections)\n")
+    print(f"{'endpoint':<12} {'count':>7} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for path, values in sorted(latencies.items()):
+        arr = np.array(values)
+        print(f"{path:<12} {len(arr):>7} {np.percentile(arr, 50):>8.2f} "
+              f"{np.percentile(arr, 99):>8.2f} {errors.get(path, 0):>7}")
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, metrics = await call(reader, writer, 'GET', '/metrics', None)
+    writer.close()
+    print("\nServer metrics:")
+    print(json.dumps(metrics, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
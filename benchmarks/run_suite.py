@@ -0,0 +1,233 @@
+# ============================
+# BENCHMARK SUITE
+# ============================
+# Times every pipeline function in src/ and the end-to-end main.main on
+# synthetic catalogs (see benchmarks.synthetic), appends the results to a
+# JSON history file and compares them against a saved baseline.
+#
+#   python -m benchmarks.run_suite --sizes 10000 100000 1000000
+#   python -m benchmarks.run_suite --sizes 10000 100000 --save-baseline
+#
+# Catalog CSVs are generated once per (size, seed) and reused.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import main as pipeline_main
+from src.data_loader import load_netflix_data, iter_netflix_data, concat_chunks
+from src.preprocessing import preprocess_netflix_data, preprocess_netflix_chunks
+from src.text_features import clean_descriptions, build_text_embeddings
+from src.feature_store import build_feature_store
+from src.clustering import fit_kmeans, evaluate_silhouette
+from src.promotion_risk import fit_risk_stats, compute_promotion_failure_score
+from src.diversity_metrics import assess_discovery_diversity_risk
+from src.hybrid_decision_engine import hybrid_content_selection, SelectionIndex
+from benchmarks.synthetic import write_catalog_csv
+
+
+RESULTS_DIR = "benchmarks/results"
+HISTORY_PATH = os.path.join(RESULTS_DIR, "history.json")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+CATALOG_DIR = ".cache/bench"
+
+REGRESSION_TOLERANCE = 0.20  # slower than baseline by more than 20% ...
+REGRESSION_MIN_DELTA_S = 0.05  # ... and by at least 50 ms (ignores timer noise)
+
+
+def timed(timings: dict, name: str, fn, repeats: int = 1):
+    """Runs fn repeats times, records the best wall time, returns the last result."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    timings[name] = round(best, 6)
+    print(f"  {name:<36}{best:>10.3f} s")
+    return result
+
+
+def catalog_path(n_rows: int, seed: int) -> str:
+    path = os.path.join(CATALOG_DIR, f"catalog_{n_rows}_{seed}.csv")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        write_catalog_csv(path, n_rows, seed=seed)
+        print(f"  generated {path} in {time.perf_counter() - start:.1f} s")
+    return path
+
+
+def run_size(n_rows: int, args) -> dict:
+    print(f"\n{n_rows} rows")
+    path = catalog_path(n_rows, args.seed)
+    t = {}
+    r = args.repeats
+
+    raw = timed(t, 'load_netflix_data', lambda: load_netflix_data(path), r)
+    timed(t, 'load_netflix_data[typed]', lambda: load_netflix_data(path, typed=True), r)
+    df = timed(t, 'preprocess_netflix_data', lambda: preprocess_netflix_data(raw), r)
+    timed(
+        t, 'preprocess_netflix_chunks',
+        lambda: concat_chunks(preprocess_netflix_chunks(iter_netflix_data(path))), r
+    )
+
+    timed(t, 'clean_descriptions', lambda: clean_descriptions(df['description'], n_jobs=args.n_jobs), r)
+    X_svd, _, _ = timed(
+        t, 'build_text_embeddings', lambda: build_text_embeddings(df, n_jobs=args.n_jobs), r
+    )
+
+    store, _, _ = timed(t, 'build_feature_store', lambda: build_feature_store(df, X_svd), r)
+    X = store.matrix
+
+    labels, _ = timed(
+        t, 'fit_kmeans', lambda: fit_kmeans(X, k=args.k, backend=args.backend), r
+    )
+    timed(
+        t, f'evaluate_silhouette[{args.silhouette}]',
+        lambda: evaluate_silhouette(X, labels, mode=args.silhouette), r
+    )
+
+    df['km_cluster'] = labels
+    stats = timed(t, 'fit_risk_stats', lambda: fit_risk_stats(df, X, labels), r)
+    scored = timed(
+        t, 'compute_promotion_failure_score',
+        lambda: compute_promotion_failure_score(df.copy(), X, stats=stats), r
+    )
+
+    report = timed(t, 'assess_discovery_diversity_risk', lambda: assess_discovery_diversity_risk(scored), r)
+    timed(t, 'hybrid_content_selection', lambda: hybrid_content_selection(scored, report), r)
+    index = timed(t, 'SelectionIndex', lambda: SelectionIndex(scored), r)
+    timed(t, 'SelectionIndex.select', lambda: index.select(report), r)
+
+    if n_rows <= args.main_max_rows:
+        def _run_main():
+            # Fresh stage / embedding caches and artifact dir, no profiling
+            # logs: a cold end-to-end run that leaves the user's files untouched
+            with tempfile.TemporaryDirectory() as tmp, \
+                    contextlib.redirect_stdout(io.StringIO()):
+                pipeline_main.main(
+                    data_path=path,
+                    cache_dir=os.path.join(tmp, 'stages'),
+                    artifact_dir=os.path.join(tmp, 'artifacts'),
+                    embedding_cache_path=os.path.join(tmp, 'embeddings.sqlite'),
+                    profile_log=None,
+                    profile_dump=None
+                )
+        timed(t, 'main.main', _run_main, r)
+
+    return t
+
+
+# --------------------------------------------------
+# History + baseline comparison
+# --------------------------------------------------
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _read_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def compare(run: dict, baseline: dict, tolerance: float, min_delta: float) -> list:
+    """
+    Prints current vs baseline timings; returns the regressed
+    (size, function) pairs.
+    """
+    regressions = []
+    print(f"\nComparison against baseline {baseline.get('commit')} ({baseline['timestamp']}):")
+    print(f"{'rows':>9}  {'function':<36}{'base s':>10}{'now s':>10}{'ratio':>8}")
+    for size, timings in run['results'].items():
+        base_timings = baseline['results'].get(size, {})
+        for name, seconds in timings.items():
+            base = base_timings.get(name)
+            if base is None:
+                continue
+            ratio = seconds / base if base > 0 else float('inf')
+            regressed = ratio > 1 + tolerance and seconds - base > min_delta
+            if regressed:
+                regressions.append((size, name))
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{size:>9}  {name:<36}{base:>10.3f}{seconds:>10.3f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--backend", default='exact', choices=['exact', 'minibatch'])
+    parser.add_argument("--silhouette", default='sample', choices=['exact', 'sample', 'centroid'])
+    parser.add_argument("--main-max-rows", type=int, default=100_000,
+                        help="skip end-to-end main.main above this size (exact silhouette is O(n^2))")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    run = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': {k: v for k, v in vars(args).items()
+                   if k not in ('history', 'baseline', 'save_baseline', 'fail_on_regression')},
+        'results': {str(n): run_size(n, args) for n in args.sizes}
+    }
+
+    history = _read_json(args.history, [])
+    history.append(run)
+    _write_json(args.history, history)
+    print(f"\nAppended run to {args.history} ({len(history)} runs)")
+
+    if args.save_baseline:
+        _write_json(args.baseline, run)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    baseline = _read_json(args.baseline, None)
+    if baseline is None:
+        print(f"No baseline at {args.baseline} (create one with --save-baseline)")
+        return
+
+    regressions = compare(run, baseline, args.tolerance, REGRESSION_MIN_DELTA_S)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# ============================
+# SYNTHETIC CATALOG GENERATOR
+# ============================
+
+# Raw catalogs in the schema preprocess_netflix_data expects, from a few
+# thousand rows in memory up to millions of rows written to CSV in chunks.
+#
+#   python -m benchmarks.synthetic --rows 1000000 --out data/synthetic_1m.csv
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+WORDS = (
+    "young woman man family friends secret past mysterious life love city small town "
+    "detective murder investigation war soldier journey home school teen comedian "
+    "documentary explores world history music band dream career crime gang police "
+    "power struggle kingdom royal battle survival island ocean space mission alien "
+    "heist thief con artist wedding romance village farmer father mother daughter son"
+).split()
+# Function words and contractions interleaved so cleaning has real work to do
+FILLERS = ("a", "the", "and", "of", "in", "to", "their", "his", "her", "when",
+           "after", "who", "it's", "can't", "they're")
+# Zipf-like word frequencies, as in real descriptions
+WORD_PROBS = 1 / np.arange(1, len(WORDS) + 1)
+WORD_PROBS /= WORD_PROBS.sum()
+
+GENRES = [
+    "Dramas", "Comedies", "Documentaries", "International Movies", "Action & Adventure",
+    "Independent Movies", "Thrillers", "Romantic Movies", "Horror Movies", "Kids' TV",
+    "International TV Shows", "TV Dramas", "TV Comedies", "Crime TV Shows", "Docuseries",
+    "Stand-Up Comedy", "Music & Musicals", "Sci-Fi & Fantasy", "Anime Series", "Reality TV"
+]
+COUNTRIES = ["United States", "India", "United Kingdom", "Japan", "South Korea",
+             "Canada", "Spain", "France", "Mexico", "Egypt"]
+RATINGS = ["TV-MA", "TV-14", "TV-PG", "R", "PG-13", "TV-Y7", "PG", "TV-G", "NR", "G"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+
+
+def make_catalog(n_rows: int, seed: int = 0, start_id: int = 0) -> pd.DataFrame:
+    """
+    Raw catalog rows in the schema preprocess_netflix_data expects,
+    including missing values and placeholder strings.
+    """
+    rng = np.random.default_rng(seed)
+
+    is_movie = rng.random(n_rows) < 0.69
+    minutes = np.clip(rng.normal(100, 28, n_rows).astype(int), 3, 312)
+    seasons = np.minimum(rng.geometric(0.55, n_rows), 17)
+    duration = np.where(
+        is_movie,
+        pd.Series(minutes).astype(str) + " min",
+        pd.Series(seasons).astype(str) + np.where(seasons > 1, " Seasons", " Season")
+    ).astype(object)
+
+    release_year = np.clip(2021 - rng.gamma(1.5, 5, n_rows).astype(int), 1925, 2021)
+    year_added = np.clip(release_year + rng.geometric(0.35, n_rows) - 1, 2008, 2021)
+    month = rng.integers(0, 12, n_rows)
+    day = rng.integers(1, 29, n_rows)
+    date_added = [f"{MONTHS[m]} {d}, {y}" for m, d, y in zip(month, day, year_added)]
+
+    n_genres = rng.integers(1, 4, n_rows)
+    genre_idx = rng.integers(0, len(GENRES), (n_rows, 3))
+    listed_in = [", ".join(dict.fromkeys(GENRES[g] for g in row[:k])) for row, k in zip(genre_idx, n_genres)]
+
+    desc_len = rng.integers(15, 30, n_rows)
+    word_idx = rng.choice(len(WORDS), (n_rows, 30), p=WORD_PROBS)
+    filler_idx = rng.integers(0, len(FILLERS), (n_rows, 30))
+    use_filler = rng.random((n_rows, 30)) < 0.3
+    description = [
+        " ".join(
+            FILLERS[f] if filler else WORDS[w]
+            for w, f, filler in zip(words[:k], fills[:k], mask[:k])
+        ).capitalize() + "."
+        for words, fills, mask, k in zip(word_idx, filler_idx, use_filler, desc_len)
+    ]
+
+    df = pd.DataFrame({
+        'show_id': [f"s{i}" for i in range(start_id, start_id + n_rows)],
+        'type': np.where(is_movie, "Movie", "TV Show"),
+        'title': [f"Title {i}" for i in range(start_id, start_id + n_rows)],
+        'director': rng.choice(["Director A", "Director B", "Director C", "unknown"], n_rows).astype(object),
+        'cast': rng.choice(["Actor A, Actor B", "Actor C", "Actor D, Actor E, Actor F"], n_rows).astype(object),
+        'country': rng.choice(COUNTRIES, n_rows).astype(object),
+        'date_added': np.array(date_added, dtype=object),
+        'release_year': release_year,
+        'rating': rng.choice(RATINGS, n_rows).astype(object),
+        'duration': duration,
+        'listed_in': listed_in,
+        'description': description
+    })
+
+    # Sprinkle missing values and placeholders like the real catalog
+    for col, rate in [('director', 0.3), ('cast', 0.09), ('country', 0.06), ('date_added', 0.001)]:
+        df.loc[rng.random(n_rows) < rate, col] = np.nan
+    df.loc[rng.random(n_rows) < 0.01, 'country'] = 'not specified'
+
+    return df
+
+
+def write_catalog_csv(path: str, n_rows: int, seed: int = 0, chunk_size: int = 250_000) -> str:
+    """
+    Writes an n_rows catalog to CSV chunk by chunk (constant memory),
+    with unique show_ids across chunks. Reproducible for a given seed.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    for i, start in enumerate(range(0, n_rows, chunk_size)):
+        chunk = make_catalog(min(chunk_size, n_rows - start), seed=seed + i, start_id=start)
+        chunk.to_csv(tmp, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    args = parser.parse_args()
+
+    write_catalog_csv(args.out, args.rows, seed=args.seed, chunk_size=args.chunk_size)
+    print(f"Wrote {args.rows} rows to {args.out}")
@@ -2,59 +2,94 @@
 # MAIN EXECUTION PIPELINE
 # ============================
 
-import numpy as np
-
-# --- NLTK one-time setup ---
-from src.nltk_setup import setup_nltk
-
-# --- Core pipeline imports ---
-from src.data_loader import load_netflix_data
-from src.preprocessing import preprocess_netflix_data
-from src.text_features import build_text_embeddings
-from src.clustering import build_feature_matrix, run_kmeans
-from src.promotion_risk import compute_promotion_failure_score
-from src.diversity_metrics import assess_discovery_diversity_risk
-from src.hybrid_decision_engine import hybrid_content_selection
+# Pipeline modules (pandas, scikit-learn, NLTK) are imported inside main()
+# so that importing this module stays cheap.
 
 
 # ----------------------------
 # CONFIG
 # ----------------------------
 DATA_PATH = "data/netflix.csv"
-K_CLUSTERS = 4
+K_CLUSTERS = 4  # or "auto" to sweep K_RANGE and keep the best-scoring K
+K_RANGE = range(2, 11)
+# backend: 'exact' | 'minibatch' (add 'chunk_size' to stream via partial_fit)
+# silhouette: 'exact' | 'sample' | 'centroid' | 'off'
+# sweep_silhouette: scoring of each K when K_CLUSTERS = "auto" (default 'sample')
+KMEANS_PARAMS = {'backend': 'exact', 'silhouette': 'exact'}
+TEXT_MODE = "tfidf"  # or "hashing": streaming hashed TF-IDF, bounded memory on huge catalogs
+# TruncatedSVD solver: 'algorithm', 'n_iter', 'n_oversamples', 'dtype' ('float32' halves memory)
+SVD_PARAMS = {'algorithm': 'randomized', 'n_iter': 5, 'n_oversamples': 10, 'dtype': 'float64'}
+TEXT_MODELS_PATH = None  # e.g. "models/text_models.joblib": fit once, then transform-only
+EMBEDDING_CACHE_PATH = ".cache/embeddings.sqlite"  # per-description cleaned text/vectors (None = off)
+N_JOBS = -1  # worker processes for text cleaning (-1 = all cores)
+STAGE_WORKERS = 4  # threads for independent pipeline stages (1 = sequential)
+CACHE_DIR = ".cache/stages"  # set to None to disable the stage cache
+RISK_WEIGHTS = {'w_duration': 0.4, 'w_cluster': 0.4, 'w_delay': 0.2}
+ARTIFACT_DIR = "artifacts"  # fitted models + scored catalog for incremental runs
+PROFILE_LOG = "logs/stage_timings.jsonl"  # per-stage timings, one JSON line per stage
+PROFILE_DUMP = None  # e.g. "logs/pipeline.prof" for a cProfile dump (snakeviz/flameprof);
+                     # cProfile only sees the main thread, so pair it with STAGE_WORKERS = 1
+
+
+_CONFIGURED = object()  # "use the setting above"; None switches the path off
+
+
+def main(
+    data_path: str = None,
+    cache_dir: str = None,
+    artifact_dir: str = None,
+    embedding_cache_path: str = _CONFIGURED,
+    profile_log: str = _CONFIGURED,
+    profile_dump: str = _CONFIGURED
+):
+    """
+    Runs the full pipeline. Arguments override DATA_PATH, CACHE_DIR,
+    ARTIFACT_DIR, EMBEDDING_CACHE_PATH, PROFILE_LOG and PROFILE_DUMP
+    (used by benchmarks.run_suite on synthetic catalogs); the last three
+    accept None to switch them off.
+    """
+    data_path = data_path or DATA_PATH
+    cache_dir = cache_dir or CACHE_DIR
+    artifact_dir = artifact_dir or ARTIFACT_DIR
+    if embedding_cache_path is _CONFIGURED:
+        embedding_cache_path = EMBEDDING_CACHE_PATH
+    if profile_log is _CONFIGURED:
+        profile_log = PROFILE_LOG
+    if profile_dump is _CONFIGURED:
+        profile_dump = PROFILE_DUMP
+
+    # --- Core pipeline imports ---
+    from src.pipeline import run_pipeline
+    from src.artifacts import save_artifacts
+    from src.hybrid_decision_engine import hybrid_content_selection
+    from src.profiling import StageProfiler
+    from src.dag import report_schedule
 
-
-def main():
     print("Starting Netflix Content Risk Pipeline...\n")
-
-    # 0️⃣ Ensure NLTK resources are available (runs only once)
-    setup_nltk()
-
-    # 1️⃣ Load raw data
-    df_raw = load_netflix_data(DATA_PATH)
-    print(f"Raw dataset loaded: {df_raw.shape}")
-
-    # 2️⃣ Preprocess & feature engineering
-    df = preprocess_netflix_data(df_raw)
-    print(f"After preprocessing: {df.shape}")
-
-    # 3️⃣ Text embeddings (TF-IDF + TruncatedSVD)
-    X_svd, vectorizer, svd = build_text_embeddings(df)
-    print(f"Text embedding shape (SVD): {X_svd.shape}")
-
-    # 4️⃣ Build combined feature matrix
-    X = build_feature_matrix(df, X_svd)
-    print(f"Final feature matrix shape: {X.shape}")
-
-    # 5️⃣ Clustering (KMeans)
-    df, kmeans = run_kmeans(df, X, k=K_CLUSTERS)
+    profiler = StageProfiler(profile_log, profile_dump).start()
+
+    # 0️⃣–6️⃣ Load, preprocess, embed, cluster, score (stage-cached,
+    # independent branches run concurrently)
+    results = run_pipeline(
+        data_path,
+        k=K_CLUSTERS,
+        k_range=K_RANGE,
+        kmeans_params=KMEANS_PARAMS,
+        risk_weights=RISK_WEIGHTS,
+        text_mode=TEXT_MODE,
+        svd_params=SVD_PARAMS,
+        text_models_path=TEXT_MODELS_PATH,
+        embedding_cache_path=embedding_cache_path,
+        n_jobs=N_JOBS,
+        max_workers=STAGE_WORKERS,
+        cache_dir=cache_dir,
+        profiler=profiler
+    )
+    df = results['df']
 
     print("\nCluster distribution:")
     print(df['km_cluster'].value_counts())
 
-    # 6️⃣ Promotion Failure Score (Upgrade Layer 1)
-    df = compute_promotion_failure_score(df, X)
-
     print("\nPromotion Failure Score summary:")
     print(df['promotion_failure_score'].describe())
 
@@ -67,7 +102,7 @@ def main():
     )
 
     # 7️⃣ Discovery Diversity Risk (Upgrade Layer 2)
-    diversity_report = assess_discovery_diversity_risk(df)
+    diversity_report = results['diversity_report']
 
     print("\nDiscovery Diversity Risk Report:")
     print("Cluster exposure distribution:")
@@ -77,12 +112,21 @@ def main():
     print(f"Top-2 Dominance: {diversity_report['top2_dominance']:.2f}")
     print(f"Diversity Risk Level: {diversity_report['diversity_risk']}")
 
+    # Near-duplicate titles (LSH over description embeddings)
+    with profiler.stage('near_duplicates.report', len(df)):
+        duplicates = results['near_duplicates'].report(df)
+
+    print(f"\nNear-duplicate title pairs: {len(duplicates)}")
+    if len(duplicates):
+        print(duplicates[['title_a', 'title_b', 'similarity']].head(5))
+
     # 8️⃣ Hybrid Decision Engine (Final Layer)
-    selected_content = hybrid_content_selection(
-        df=df,
-        diversity_report=diversity_report,
-        max_items=10
-    )
+    with profiler.stage('selection', len(df)):
+        selected_content = hybrid_content_selection(
+            df=df,
+            diversity_report=diversity_report,
+            max_items=10
+        )
 
     print("\nFinal Content Selection (Hybrid Engine):")
     print(
@@ -91,6 +135,18 @@ def main():
         ]
     )
 
+    # 9️⃣ Publish fitted models and scored catalog (read by the Streamlit panel)
+    results['stage_timings'] = profiler.summary()
+    with profiler.stage('save_artifacts', len(df)):
+        save_artifacts(artifact_dir, results)
+    print(f"\nArtifacts saved to: {artifact_dir}")
+
+    profiler.finish()
+    profiler.report()
+    report_schedule(results['schedule'])
+    if profile_log:
+        print(f"Stage timings appended to: {profile_log}")
+
     print("\nPipeline completed successfully.")
 
 
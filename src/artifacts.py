@@ -0,0 +1,55 @@
+import os
+import shutil
+import time
+import uuid
+
+from src.stage_cache import write_artifact_dir, read_artifact_dir
+
+
+# Fitted objects needed to score and place new titles without refitting
+MODEL_KEYS = ['vectorizer', 'svd', 'scaler', 'fill_values', 'kmeans', 'risk_stats']
+# Published when present: LSH index, and the timings of the run that
+# produced the set (shown by the Streamlit panel)
+OPTIONAL_KEYS = ['near_duplicates', 'stage_timings', 'schedule']
+
+
+def save_artifacts(artifact_dir: str, results: dict) -> None:
+    """
+    Publishes the scored catalog, feature matrix and fitted models.
+
+    The new set is written next to the old one and swapped in, so
+    readers never see a half-written directory.
+    """
+    artifacts = {'catalog': results['df'], 'X': results['X']}
+    artifacts.update({key: results[key] for key in MODEL_KEYS})
+    for key in OPTIONAL_KEYS:
+        if results.get(key) is not None:
+            artifacts[key] = results[key]
+
+    parent = os.path.dirname(os.path.abspath(artifact_dir))
+    os.makedirs(parent, exist_ok=True)
+
+    tmp_dir = f"{artifact_dir}.tmp-{uuid.uuid4().hex[:8]}"
+    write_artifact_dir(tmp_dir, artifacts, {'created_at': time.time()})
+
+    old_dir = f"{artifact_dir}.old-{uuid.uuid4().hex[:8]}"
+    if os.path.exists(artifact_dir):
+        os.replace(artifact_dir, old_dir)
+    os.replace(tmp_dir, artifact_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def load_artifacts(artifact_dir: str, mmap_mode: str = None) -> dict:
+    """
+    Loads published artifacts back into the run_pipeline result layout.
+    """
+    artifacts = read_artifact_dir(artifact_dir, mmap_mode=mmap_mode)
+    artifacts['df'] = artifacts.pop('catalog')
+    return artifacts
+
+
+def load_models(artifact_dir: str) -> dict:
+    """
+    Loads only the fitted models (MODEL_KEYS), not the catalog or matrix.
+    """
+    return read_artifact_dir(artifact_dir, names=MODEL_KEYS)
@@ -2,31 +2,297 @@ import numpy as np
 import pandas as pd
 
 from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score, silhouette_samples
+from threadpoolctl import threadpool_limits
 
+from src.promotion_risk import cluster_centroids, compute_centroid_distances
+from src.profiling import profile_stage
 
-def build_feature_matrix(df: pd.DataFrame, X_svd: np.ndarray):
-    num_cols = ['release_year', 'duration_int', 'num_genres', 'delay_years']
 
-    X_struct = df[num_cols].copy()
-    for c in num_cols:
+STRUCT_COLS = ['release_year', 'duration_int', 'num_genres', 'delay_years']
+
+CLUSTER_BACKENDS = ('exact', 'minibatch')
+DEFAULT_N_INIT = {'exact': 20, 'minibatch': 3}
+
+SILHOUETTE_MODES = ('exact', 'sample', 'centroid', 'off')
+SILHOUETTE_SAMPLE_SIZE = 10_000
+
+
+def _structural_features(df: pd.DataFrame, fill_values: dict = None):
+    X_struct = df[STRUCT_COLS].copy()
+    fill_values = dict(fill_values or {})
+    for c in STRUCT_COLS:
         X_struct[c] = pd.to_numeric(X_struct[c], errors='coerce')
-        median_val = X_struct[c].median()
-        X_struct[c] = X_struct[c].fillna(median_val)
+        if c not in fill_values:
+            fill_values[c] = X_struct[c].median()
+        X_struct[c] = X_struct[c].fillna(fill_values[c])
+    return X_struct, fill_values
 
-    scaler = StandardScaler()
-    X_struct_scaled = scaler.fit_transform(X_struct)
 
-    X = np.hstack([X_svd, X_struct_scaled])
+def build_feature_matrix(
+    df: pd.DataFrame,
+    X_svd: np.ndarray,
+    return_scaler: bool = False,
+    out: np.ndarray = None
+):
+    """
+    Stacks SVD text components with standardized structural features.
+    With return_scaler=True also returns the fitted scaler and the
+    median fill values so new rows can be transformed consistently.
+    out may be a preallocated (e.g. memory-mapped float32) matrix that
+    is filled in place instead of allocating a dense hstack copy.
+    """
+    X_struct_scaled, scaler, fill_values = scale_structural_features(df)
+    X = stack_features(X_svd, X_struct_scaled, out)
+
+    if return_scaler:
+        return X, scaler, fill_values
     return X
 
 
-def run_kmeans(df: pd.DataFrame, X: np.ndarray, k: int = 4):
-    kmeans = KMeans(n_clusters=k, random_state=42, n_init=20)
-    df['km_cluster'] = kmeans.fit_predict(X)
+def scale_structural_features(df: pd.DataFrame):
+    """
+    Median-filled, standardized structural columns (the part of the
+    feature matrix that does not depend on the text embeddings).
+    Returns (X_struct_scaled, scaler, fill_values).
+    """
+    X_struct, fill_values = _structural_features(df)
+
+    scaler = StandardScaler()
+    return scaler.fit_transform(X_struct), scaler, fill_values
+
+
+def stack_features(X_svd: np.ndarray, X_struct_scaled: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    SVD components followed by the scaled structural columns, written
+    into out when given.
+    """
+    if out is None:
+        return np.hstack([X_svd, X_struct_scaled])
+
+    n_svd = X_svd.shape[1]
+    out[:, :n_svd] = X_svd
+    out[:, n_svd:] = X_struct_scaled
+    return out
+
+
+def transform_feature_matrix(
+    df: pd.DataFrame,
+    X_svd: np.ndarray,
+    scaler: StandardScaler,
+    fill_values: dict
+) -> np.ndarray:
+    """
+    Builds feature rows for new titles with an already fitted scaler.
+    """
+    X_struct, _ = _structural_features(df, fill_values)
+    return np.hstack([X_svd, scaler.transform(X_struct)])
+
+
+# --------------------------------------------------
+# Clustering backends
+# --------------------------------------------------
+def iter_row_chunks(X: np.ndarray, chunk_size: int):
+    """
+    Yields row blocks of X as views (no copies for ndarray/memmap input).
+    """
+    for start in range(0, len(X), chunk_size):
+        yield X[start:start + chunk_size]
+
+
+def fit_streaming_kmeans(
+    chunks,
+    k: int,
+    n_init: int = 3,
+    batch_size: int = 1024,
+    n_epochs: int = 3,
+    random_state: int = 42
+) -> MiniBatchKMeans:
+    """
+    Fits MiniBatchKMeans with partial_fit over row chunks.
+
+    chunks is a callable returning a fresh iterator of chunks, so the
+    data is re-read once per epoch and never has to be in memory at once.
+    n_init candidate models are seeded on the first chunk and the one
+    with the lowest inertia there is trained on the full stream.
+    """
+    first = next(iter(chunks()))
+    candidates = []
+    for i in range(n_init):
+        model = MiniBatchKMeans(n_clusters=k, random_state=random_state + i, batch_size=batch_size)
+        model.partial_fit(first)
+        candidates.append((-model.score(first), i, model))
+    model = min(candidates)[2]
+
+    for _ in range(n_epochs):
+        for chunk in chunks():
+            for batch in iter_row_chunks(chunk, batch_size):
+                if len(batch) >= k:
+                    model.partial_fit(batch)
+
+    return model
+
+
+def fit_kmeans(
+    X: np.ndarray,
+    k: int = 4,
+    backend: str = 'exact',
+    n_init: int = None,
+    batch_size: int = 1024,
+    chunk_size: int = None,
+    n_epochs: int = 3,
+    n_threads: int = None
+):
+    """
+    Fits the selected clustering backend and returns (labels, model).
+
+    - exact: KMeans on the full matrix (the original behaviour)
+    - minibatch: MiniBatchKMeans; with chunk_size set, the matrix is
+      streamed through partial_fit in row chunks
+    n_threads caps the BLAS/OpenMP threads used while fitting.
+    """
+    if backend not in CLUSTER_BACKENDS:
+        raise ValueError(f"Unknown clustering backend: {backend!r}")
+    if n_init is None:
+        n_init = DEFAULT_N_INIT[backend]
+
+    with threadpool_limits(limits=n_threads):
+        if backend == 'exact':
+            model = KMeans(n_clusters=k, random_state=42, n_init=n_init)
+            labels = model.fit_predict(X)
+        elif chunk_size is None:
+            model = MiniBatchKMeans(
+                n_clusters=k, random_state=42, n_init=n_init, batch_size=batch_size
+            )
+            labels = model.fit_predict(X)
+        else:
+            model = fit_streaming_kmeans(
+                lambda: iter_row_chunks(X, chunk_size),
+                k, n_init=n_init, batch_size=batch_size, n_epochs=n_epochs
+            )
+            labels = np.concatenate([model.predict(c) for c in iter_row_chunks(X, chunk_size)])
+
+    return labels, model
+
+
+# --------------------------------------------------
+# Silhouette evaluation
+# --------------------------------------------------
+def stratified_sample(labels: np.ndarray, sample_size: int, random_state: int = 42) -> np.ndarray:
+    """
+    Row indices sampled per cluster in proportion to cluster size
+    (at least two per cluster where possible).
+    """
+    rng = np.random.default_rng(random_state)
+    n = len(labels)
+    idx = []
+    for c in np.unique(labels):
+        members = np.flatnonzero(labels == c)
+        take = max(2, int(round(sample_size * len(members) / n)))
+        idx.append(rng.choice(members, size=min(take, len(members)), replace=False))
+    return np.sort(np.concatenate(idx))
+
+
+def simplified_silhouette(
+    X: np.ndarray,
+    labels: np.ndarray,
+    distances: np.ndarray = None,
+    chunk_size: int = 50_000
+) -> float:
+    """
+    Centroid-based silhouette: a = distance to own centroid,
+    b = distance to the nearest other centroid. O(n·k) instead of O(n²).
+    distances may be the per-point centroid distances already computed
+    (compute_centroid_distances), which cluster atypicality risk reuses.
+    """
+    centroid_labels, centroids = cluster_centroids(X, labels)
+    if distances is None:
+        distances = compute_centroid_distances(X, labels, centroid_labels, centroids)
+
+    own = np.searchsorted(centroid_labels, labels)
+    c_sq = (centroids ** 2).sum(axis=1)
+    scores = np.empty(len(X))
+
+    for start in range(0, len(X), chunk_size):
+        block = X[start:start + chunk_size]
+        d2 = (block ** 2).sum(axis=1)[:, None] - 2 * block @ centroids.T + c_sq
+        d = np.sqrt(np.maximum(d2, 0))
+        d[np.arange(len(block)), own[start:start + chunk_size]] = np.inf
+        a = distances[start:start + chunk_size]
+        b = d.min(axis=1)
+        scores[start:start + chunk_size] = (b - a) / np.maximum(np.maximum(a, b), 1e-12)
+
+    return float(scores.mean())
+
+
+def evaluate_silhouette(
+    X: np.ndarray,
+    labels: np.ndarray,
+    mode: str = 'exact',
+    sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+    random_state: int = 42,
+    distances: np.ndarray = None
+) -> dict:
+    """
+    Silhouette score with a selectable cost/accuracy trade-off:
+
+    - exact: full pairwise silhouette (O(n²))
+    - sample: stratified sample with a fixed seed, plus a 95% confidence
+      interval from the per-point silhouette values
+    - centroid: simplified silhouette from centroid distances
+    - off: skipped
+    """
+    if mode not in SILHOUETTE_MODES:
+        raise ValueError(f"Unknown silhouette mode: {mode!r}")
+
+    result = {'mode': mode, 'score': None, 'ci': None, 'n': len(X)}
+
+    if mode == 'exact' or (mode == 'sample' and len(X) <= sample_size):
+        result['score'] = float(silhouette_score(X, labels))
+    elif mode == 'sample':
+        idx = stratified_sample(labels, sample_size, random_state)
+        values = silhouette_samples(X[idx], labels[idx])
+        half_width = 1.96 * values.std(ddof=1) / np.sqrt(len(values))
+        result.update(
+            score=float(values.mean()),
+            ci=(float(values.mean() - half_width), float(values.mean() + half_width)),
+            n=len(idx)
+        )
+    elif mode == 'centroid':
+        result['score'] = simplified_silhouette(X, labels, distances)
+
+    return result
+
+
+def run_kmeans(
+    df: pd.DataFrame,
+    X: np.ndarray,
+    k: int = 4,
+    silhouette: str = 'exact',
+    silhouette_sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+    profiler=None,
+    **backend_params
+):
+    with profile_stage(profiler, 'cluster.fit', len(X)):
+        labels, kmeans = fit_kmeans(X, k=k, **backend_params)
+    df['km_cluster'] = labels
 
-    sil = silhouette_score(X, df['km_cluster'])
-    print(f"KMeans Silhouette (k={k}): {sil:.3f}")
+    with profile_stage(profiler, 'cluster.silhouette', len(X)):
+        distances = None
+        if silhouette == 'centroid':
+            # Kept on the frame so the risk computation can reuse them
+            distances = compute_centroid_distances(X, labels)
+            df['centroid_distance'] = distances
+        sil = evaluate_silhouette(
+            X, labels, mode=silhouette, sample_size=silhouette_sample_size, distances=distances
+        )
+    if sil['mode'] == 'exact':
+        print(f"KMeans Silhouette (k={k}): {sil['score']:.3f}")
+    elif sil['ci'] is not None:
+        lo, hi = sil['ci']
+        print(f"KMeans Silhouette (k={k}, sampled n={sil['n']}): {sil['score']:.3f} [{lo:.3f}, {hi:.3f}]")
+    elif sil['score'] is not None:
+        print(f"KMeans Silhouette (k={k}, {sil['mode']}): {sil['score']:.3f}")
 
     return df, kmeans
@@ -0,0 +1,254 @@
+# ============================
+# PIPELINE STAGE GRAPH
+# ============================
+# Stages declare the values they read and the values they produce;
+# run() works out which stages the requested values need (a stage with
+# a stage-cache hit does not need its inputs) and starts each one as
+# soon as its inputs exist, on a thread pool. Threads are enough here:
+# the heavy stages spend their time in numpy / scikit-learn code that
+# releases the GIL, or in their own worker processes (text cleaning).
+#
+# Every run records when each stage started and finished, so the
+# critical path (the chain of dependent stages that bounds the wall
+# time) can be reported next to the per-stage timings.
+
+import time
+from collections import ChainMap
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+
+import pandas as pd
+
+from src.profiling import profile_stage
+
+
+class Stage:
+    """
+    One node of the graph: fn(**inputs) returns a dict holding (at
+    least) every name in outputs. With a key, the result is stored in /
+    loaded from the stage cache under (name, key).
+    """
+
+    def __init__(self, name, fn, inputs=(), outputs=(), key=None, rows=None, on_done=None):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.key = key
+        self.rows = rows
+        self.on_done = on_done
+
+
+def _run_inline(fn, *args) -> Future:
+    # Same interface as pool.submit, for max_workers=1
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except BaseException as exc:
+        future.set_exception(exc)
+    return future
+
+
+class PipelineDAG:
+    """
+    Runs named stages in dependency order, independent branches
+    concurrently (max_workers threads; 1 runs everything inline, in the
+    order the stages were added).
+
+    rows is a callable of the run's values (e.g. the catalog length)
+    that fills the profiler's row count for stages that do not set
+    their own. on_done callbacks run on the calling thread, in
+    completion order, with the stage's outputs.
+    """
+
+    def __init__(self, cache=None, profiler=None, max_workers: int = None, rows=None):
+        self.cache = cache
+        self.profiler = profiler
+        self.max_workers = max_workers
+        self.rows = rows
+        self.stages = {}
+        self.producers = {}
+        self.timings = {}
+        self._deps = {}
+        self._hits = set()
+        self._values = {}
+
+    def add(self, name: str, fn, inputs=(), outputs=(), key=None, rows=None, on_done=None):
+        if name in self.stages:
+            raise ValueError(f"duplicate stage {name!r}")
+        for value in outputs:
+            if value in self.producers:
+                raise ValueError(f"{value!r} is produced by both {self.producers[value]!r} and {name!r}")
+
+        self.stages[name] = Stage(name, fn, inputs, outputs, key, rows, on_done)
+        self.producers.update({value: name for value in outputs})
+        return self
+
+    # ----------------------------
+    # Planning
+    # ----------------------------
+    def _cached(self, stage: Stage) -> bool:
+        return self.cache is not None and stage.key is not None and self.cache.has(stage.name, stage.key)
+
+    def plan(self, targets, given=()) -> list:
+        """
+        Names of the stages needed to produce targets (in the order they
+        were added). Values in given are not recomputed, and stages with
+        a cache hit do not pull in their inputs.
+        """
+        needed = set()
+        self._hits = set()
+        pending = [value for value in targets if value not in given]
+
+        while pending:
+            value = pending.pop()
+            if value in given:
+                continue
+            if value not in self.producers:
+                raise KeyError(f"no stage produces {value!r}")
+
+            name = self.producers[value]
+            if name in needed:
+                continue
+            needed.add(name)
+
+            stage = self.stages[name]
+            if self._cached(stage):
+                self._hits.add(name)
+            else:
+                pending.extend(stage.inputs)
+
+        return [name for name in self.stages if name in needed]
+
+    # ----------------------------
+    # Execution
+    # ----------------------------
+    def _execute(self, stage: Stage, kwargs: dict, start: float):
+        began = time.perf_counter()
+        cached = stage.name in self._hits
+
+        with profile_stage(self.profiler, stage.name, cached=cached) as info:
+            fn = lambda: stage.fn(**kwargs)
+            if self.cache is None or stage.key is None:
+                result = fn()
+            else:
+                result = self.cache.run(stage.name, stage.key, fn)
+
+            missing = [value for value in stage.outputs if value not in result]
+            if missing:
+                raise ValueError(f"stage {stage.name!r} did not produce {missing}")
+
+            rows = stage.rows or self.rows
+            info['rows'] = rows(ChainMap(result, self._values)) if rows else None
+
+        ended = time.perf_counter()
+        return result, {
+            'start_s': began - start,
+            'end_s': ended - start,
+            'wall_s': ended - began,
+            'cached': cached
+        }
+
+    def run(self, targets=None, given: dict = None) -> dict:
+        """
+        Runs the stages needed for targets (default: every output) and
+        returns all values produced, plus the given ones.
+        """
+        values = self._values = dict(given or {})
+        if targets is None:
+            targets = list(self.producers)
+        remaining = self.plan(targets, values)
+
+        self._deps = {
+            name: set() if name in self._hits else {
+                self.producers[value] for value in self.stages[name].inputs if value not in values
+            }
+            for name in remaining
+        }
+        self.timings = {}
+        start = time.perf_counter()
+
+        if self.max_workers == 1:
+            pool, submit = nullcontext(), _run_inline
+        else:
+            pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='stage')
+            submit = pool.submit
+
+        with pool:
+            running = {}
+            while remaining or running:
+                for name in [n for n in remaining if self._deps[n].issubset(self.timings)]:
+                    remaining.remove(name)
+                    stage = self.stages[name]
+                    kwargs = {} if name in self._hits else {value: values[value] for value in stage.inputs}
+                    running[submit(self._execute, stage, kwargs, start)] = name
+
+                if not running:
+                    raise ValueError(f"stages {remaining} depend on each other")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(finished, key=lambda f: list(self.stages).index(running[f])):
+                    name = running.pop(future)
+                    result, timing = future.result()
+                    values.update(result)
+                    self.timings[name] = timing
+
+                    stage = self.stages[name]
+                    if stage.on_done is not None:
+                        stage.on_done(result)
+
+        self.timings['total'] = {'wall_s': time.perf_counter() - start}
+        return values
+
+    # ----------------------------
+    # Reporting
+    # ----------------------------
+    def critical_path(self):
+        """
+        (stage names, seconds) of the dependency chain with the largest
+        summed wall time in the last run.
+        """
+        finish, previous = {}, {}
+        for name in sorted(self._deps, key=lambda n: self.timings[n]['end_s']):
+            before = max(self._deps[name], key=finish.get, default=None)
+            finish[name] = self.timings[name]['wall_s'] + (finish[before] if before else 0.0)
+            previous[name] = before
+
+        if not finish:
+            return [], 0.0
+        name = last = max(finish, key=finish.get)
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1], finish[last]
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Start / end offsets and wall time of every stage of the last run,
+        flagging the ones on the critical path.
+        """
+        path, _ = self.critical_path()
+        frame = pd.DataFrame(
+            [{'stage': name, **self.timings[name]} for name in self._deps]
+        ).set_index('stage').sort_values('start_s')
+        frame['critical'] = frame.index.isin(path)
+        frame.attrs['total_s'] = self.timings['total']['wall_s']
+        return frame
+
+    def report(self) -> None:
+        report_schedule(self.summary())
+
+
+def report_schedule(schedule: pd.DataFrame) -> None:
+    """
+    Prints a PipelineDAG.summary() frame with its critical path.
+    """
+    path = schedule.index[schedule['critical']]
+    print("\nStage schedule:")
+    print(schedule.round(3).to_string())
+    print(
+        f"Critical path: {' → '.join(path)} ({schedule.loc[path, 'wall_s'].sum():.2f} s); "
+        f"wall {schedule.attrs.get('total_s', schedule['end_s'].max()):.2f} s "
+        f"for {schedule['wall_s'].sum():.2f} s of stage time"
+    )
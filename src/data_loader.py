@@ -1,9 +1,92 @@
 import pandas as pd
+from pandas.api.types import union_categoricals
 
 
-def load_netflix_data(filepath: str) -> pd.DataFrame:
+# --------------------------------------------------
+# Column schema
+# --------------------------------------------------
+CATEGORICAL_COLS = ['type', 'rating', 'country']
+STRING_COLS = ['show_id', 'title', 'director', 'cast', 'date_added',
+               'duration', 'listed_in', 'description']
+
+NETFLIX_DTYPES = {
+    **{c: 'category' for c in CATEGORICAL_COLS},
+    **{c: 'string[pyarrow]' for c in STRING_COLS}
+}
+DATE_FORMAT = '%B %d, %Y'  # e.g. "September 25, 2021"
+
+LOAD_CHUNK_SIZE = 100_000
+
+
+def load_netflix_data(filepath: str, typed: bool = False) -> pd.DataFrame:
     """
-    Load raw Netflix dataset from CSV.
+    Load raw Netflix dataset from CSV (or Parquet).
+    typed=True applies the explicit column schema.
     """
+    if filepath.endswith('.parquet'):
+        return concat_chunks(iter_netflix_data(filepath))
+    if typed:
+        return _apply_schema(pd.read_csv(filepath, dtype=NETFLIX_DTYPES))
     df = pd.read_csv(filepath)
     return df
+
+
+def parse_date_added(values: pd.Series) -> pd.Series:
+    """
+    The one date_added parser for every entry point (loader, preprocessing,
+    delta ingest, service, partitioned scoring): strips padding such as
+    " August 4, 2017" and parses the fast fixed DATE_FORMAT; values in
+    other formats (e.g. "2019-09-01", "Sep 1, 2019") are parsed one by
+    one, and anything unparseable becomes NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    text = values.astype('string[pyarrow]').str.strip()
+    parsed = pd.to_datetime(text, format=DATE_FORMAT, errors='coerce')
+
+    retry = parsed.isna() & text.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(text[retry], format='mixed', errors='coerce')
+    return parsed
+
+
+def _apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    dtypes = {c: t for c, t in NETFLIX_DTYPES.items() if c in df.columns and c != 'date_added'}
+    df = df.astype(dtypes)
+
+    if 'date_added' in df.columns:
+        df['date_added'] = parse_date_added(df['date_added'])
+    return df
+
+
+def iter_netflix_data(filepath: str, chunksize: int = LOAD_CHUNK_SIZE):
+    """
+    Streams the catalog as typed DataFrame chunks (categorical
+    type/rating/country, pyarrow-backed strings, parsed date_added),
+    so large files never have to be loaded as object columns at once.
+    Reads CSV or Parquet (by extension).
+    """
+    if filepath.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(filepath).iter_batches(batch_size=chunksize):
+            yield _apply_schema(batch.to_pandas())
+        return
+
+    for chunk in pd.read_csv(filepath, dtype=NETFLIX_DTYPES, chunksize=chunksize):
+        yield _apply_schema(chunk)
+
+
+def concat_chunks(chunks) -> pd.DataFrame:
+    """
+    Concatenates chunks, unifying per-chunk categories so categorical
+    columns stay categorical.
+    """
+    frames = list(chunks)
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([f[col] for f in frames]).categories
+            for f in frames:
+                f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-from scipy.stats import entropy
 
 
 # --------------------------------------------------
@@ -19,6 +18,8 @@ def compute_entropy(probs: pd.Series) -> float:
     """
     Shannon entropy of cluster exposure distribution.
     """
+    from scipy.stats import entropy  # scipy.stats is slow to import
+
     return entropy(probs, base=2)
 
 
@@ -33,7 +34,22 @@ def compute_dominance_ratio(probs: pd.Series, top_k: int = 1) -> float:
 
 
 # --------------------------------------------------
-# D) Discovery Diversity Risk Assessment
+# D) Risk Flag
+# --------------------------------------------------
+def diversity_risk_flag(top1_dominance: float) -> str:
+    """
+    HIGH / MEDIUM / LOW from the top-1 cluster share.
+    """
+    # Heuristic thresholds (explainable)
+    if top1_dominance > 0.65:
+        return "HIGH"
+    if top1_dominance > 0.45:
+        return "MEDIUM"
+    return "LOW"
+
+
+# --------------------------------------------------
+# E) Discovery Diversity Risk Assessment
 # --------------------------------------------------
 def assess_discovery_diversity_risk(
     df: pd.DataFrame,
@@ -49,13 +65,7 @@ def assess_discovery_diversity_risk(
     dominance_1 = compute_dominance_ratio(probs, top_k=1)
     dominance_2 = compute_dominance_ratio(probs, top_k=2)
 
-    # Heuristic thresholds (explainable)
-    if dominance_1 > 0.65:
-        risk_flag = "HIGH"
-    elif dominance_1 > 0.45:
-        risk_flag = "MEDIUM"
-    else:
-        risk_flag = "LOW"
+    risk_flag = diversity_risk_flag(dominance_1)
 
     return {
         "cluster_distribution": probs,
@@ -0,0 +1,310 @@
+# ============================
+# STREAMING EXPOSURE DIVERSITY
+# ============================
+# Diversity health from impression logs rather than catalog composition:
+# (timestamp, title, cluster) exposure events update per-cluster counters
+# over a tumbling window and a sliding window, and entropy / top-k
+# dominance are maintained incrementally, so each event costs O(1).
+
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.diversity_metrics import diversity_risk_flag
+
+
+EXPOSURE_WINDOW_S = 3600  # tumbling window length and sliding window span
+EXPOSURE_SLIDE_S = 60     # sliding window granularity (pane length)
+
+# Σ c·log c is updated by differences; recompute it exactly this often
+# so floating-point drift cannot build up over very long streams
+RESYNC_EVERY = 1 << 20
+
+
+def _clogc(c: int) -> float:
+    return c * math.log2(c) if c > 0 else 0.0
+
+
+# --------------------------------------------------
+# Incremental counters
+# --------------------------------------------------
+class ExposureCounts:
+    """
+    Per-cluster exposure counts with O(1) entropy and top-k dominance.
+
+    Entropy uses H = log2 N - Σ c·log2 c / N, with the sum adjusted by
+    the two terms an update changes. For dominance, clusters sit in
+    buckets keyed by count, linked in count order (as in an LFU cache);
+    a ±1 update moves a cluster to the adjacent bucket, and the top-k
+    share walks at most k buckets down from the highest count.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self._sum_clogc = 0.0
+        self._updates = 0
+
+        # Bucket 0 is a permanent, empty sentinel at the bottom
+        self._members = {0: set()}
+        self._lower = {0: None}
+        self._higher = {0: None}
+        self.top = 0
+
+    def add(self, cluster, n: int = 1) -> None:
+        if n == 0:
+            return  # a zero delta would move the cluster onto its own bucket
+        old = self.counts.get(cluster, 0)
+        new = old + n
+        if new < 0:
+            raise ValueError(f"cluster {cluster!r} would have a negative count")
+
+        self._sum_clogc += _clogc(new) - _clogc(old)
+        self.total += n
+        self._move(cluster, old, new)
+        if new:
+            self.counts[cluster] = new
+        else:
+            self.counts.pop(cluster, None)
+
+        self._updates += 1
+        if self._updates % RESYNC_EVERY == 0:
+            self._sum_clogc = sum(_clogc(c) for c in self.counts.values())
+
+    # ---------- count buckets ----------
+    def _move(self, cluster, old: int, new: int) -> None:
+        if new not in self._members:
+            self._insert_bucket(new, near=old)
+        if new:
+            self._members[new].add(cluster)
+        if old:
+            members = self._members[old]
+            members.discard(cluster)
+            if not members:
+                self._remove_bucket(old)
+
+    def _insert_bucket(self, count: int, near: int) -> None:
+        # Walk from an existing bucket to count's neighbours (one step for ±1)
+        lower = near
+        if count > near:
+            while self._higher[lower] is not None and self._higher[lower] < count:
+                lower = self._higher[lower]
+        else:
+            while lower > count:
+                lower = self._lower[lower]
+
+        higher = self._higher[lower]
+        self._members[count] = set()
+        self._lower[count] = lower
+        self._higher[count] = higher
+        self._higher[lower] = count
+        if higher is None:
+            self.top = count
+        else:
+            self._lower[higher] = count
+
+    def _remove_bucket(self, count: int) -> None:
+        lower, higher = self._lower.pop(count), self._higher.pop(count)
+        del self._members[count]
+        self._higher[lower] = higher
+        if higher is None:
+            self.top = lower
+        else:
+            self._lower[higher] = lower
+
+    # ---------- metrics ----------
+    def entropy(self) -> float:
+        if self.total == 0:
+            return 0.0
+        return max(math.log2(self.total) - self._sum_clogc / self.total, 0.0)
+
+    def dominance(self, top_k: int = 1) -> float:
+        """
+        Fraction of exposure from the top_k clusters.
+        """
+        if self.total == 0:
+            return 0.0
+        share, remaining, count = 0, top_k, self.top
+        while remaining and count:
+            taken = min(len(self._members[count]), remaining)
+            share += taken * count
+            remaining -= taken
+            count = self._lower[count]
+        return share / self.total
+
+    def report(self) -> dict:
+        """
+        Same keys as assess_discovery_diversity_risk, plus the event count.
+        """
+        top1 = self.dominance(1)
+        return {
+            'cluster_distribution': (pd.Series(self.counts, dtype=float) / max(self.total, 1)).sort_index(),
+            'entropy': self.entropy(),
+            'top1_dominance': top1,
+            'top2_dominance': self.dominance(2),
+            'diversity_risk': diversity_risk_flag(top1),
+            'events': self.total
+        }
+
+
+# --------------------------------------------------
+# Windows
+# --------------------------------------------------
+class SlidingWindow:
+    """
+    Counts over the last `window` seconds, advanced in `slide`-second panes.
+
+    Each event is added to the current pane and to the running counts;
+    when a pane falls out of the window its per-cluster totals are
+    subtracted, so memory is bounded by panes × clusters, not events.
+    """
+
+    def __init__(self, window: float = EXPOSURE_WINDOW_S, slide: float = EXPOSURE_SLIDE_S):
+        if slide <= 0 or window < slide:
+            raise ValueError("need 0 < slide <= window")
+        self.window = window
+        self.slide = slide
+        self.panes = deque()  # (pane_start, {cluster: count})
+        self.counts = ExposureCounts()
+
+    def add(self, timestamp: float, cluster) -> None:
+        pane_start = timestamp - timestamp % self.slide
+        if not self.panes or pane_start > self.panes[-1][0]:
+            self.panes.append((pane_start, {}))
+            self._expire(pane_start)
+
+        # Late events are counted in the newest pane
+        pane = self.panes[-1][1]
+        pane[cluster] = pane.get(cluster, 0) + 1
+        self.counts.add(cluster)
+
+    def _expire(self, pane_start: float) -> None:
+        while self.panes and self.panes[0][0] <= pane_start - self.window:
+            _, expired = self.panes.popleft()
+            for cluster, n in expired.items():
+                self.counts.add(cluster, -n)
+
+    def bounds(self) -> tuple:
+        if not self.panes:
+            return None, None
+        end = self.panes[-1][0] + self.slide
+        return max(self.panes[0][0], end - self.window), end
+
+
+class TumblingWindow:
+    """
+    Counts over fixed, non-overlapping `window`-second intervals.
+    """
+
+    def __init__(self, window: float = EXPOSURE_WINDOW_S):
+        self.window = window
+        self.start = None
+        self.counts = ExposureCounts()
+
+    def add(self, timestamp: float, cluster):
+        """
+        Adds one event; returns the report of the window it closed, if any.
+        """
+        start = timestamp - timestamp % self.window
+        closed = None
+        if self.start is None:
+            self.start = start
+        elif start > self.start:
+            closed = self.close()
+            self.start = start
+        self.counts.add(cluster)
+        return closed
+
+    def close(self):
+        if self.start is None or self.counts.total == 0:
+            return None
+        report = {
+            **self.counts.report(),
+            'window_start': self.start,
+            'window_end': self.start + self.window
+        }
+        self.counts = ExposureCounts()
+        return report
+
+
+# --------------------------------------------------
+# Tracker
+# --------------------------------------------------
+class DiversityStreamTracker:
+    """
+    Consumes (timestamp, title, cluster) exposure events, in timestamp
+    order, into a tumbling and a sliding window.
+
+    Timestamps are seconds (e.g. Unix time). Events without a cluster are
+    resolved through title_clusters (title → cluster, e.g. from the
+    scored catalog) and skipped if the title is unknown.
+    """
+
+    def __init__(
+        self,
+        window: float = EXPOSURE_WINDOW_S,
+        slide: float = EXPOSURE_SLIDE_S,
+        title_clusters: dict = None
+    ):
+        self.tumbling = TumblingWindow(window)
+        self.sliding = SlidingWindow(window, slide)
+        self.title_clusters = title_clusters or {}
+        self.skipped = 0
+
+    def update(self, timestamp: float, title=None, cluster=None):
+        """
+        Records one exposure; returns the closed tumbling-window report
+        when this event starts a new window, else None.
+        """
+        if cluster is None:
+            cluster = self.title_clusters.get(title)
+            if cluster is None:
+                self.skipped += 1
+                return None
+        self.sliding.add(timestamp, cluster)
+        return self.tumbling.add(timestamp, cluster)
+
+    def sliding_report(self) -> dict:
+        start, end = self.sliding.bounds()
+        return {**self.sliding.counts.report(), 'window_start': start, 'window_end': end}
+
+    def flush(self):
+        """
+        Closes the current tumbling window (end of a replay).
+        """
+        return self.tumbling.close()
+
+
+def replay_exposures(tracker: DiversityStreamTracker, events: pd.DataFrame,
+                     time_col: str = 'timestamp', title_col: str = 'title',
+                     cluster_col: str = 'km_cluster') -> list:
+    """
+    Feeds an exposure log through the tracker; returns every tumbling
+    window report, including the final partial window.
+    """
+    timestamps = events[time_col]
+    if pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = timestamps.to_numpy('datetime64[ns]').astype(np.int64) / 1e9
+    timestamps = np.asarray(timestamps, dtype=float).tolist()
+
+    titles = events[title_col].tolist() if title_col in events else [None] * len(events)
+    if cluster_col in events:
+        # Missing clusters fall back to the title lookup
+        column = events[cluster_col].astype(object)
+        clusters = column.where(column.notna(), None).tolist()
+    else:
+        clusters = [None] * len(events)
+
+    reports = []
+    update = tracker.update
+    for ts, title, cluster in zip(timestamps, titles, clusters):
+        closed = update(ts, title, cluster)
+        if closed is not None:
+            reports.append(closed)
+
+    final = tracker.flush()
+    if final is not None:
+        reports.append(final)
+    return reports
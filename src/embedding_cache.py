@@ -0,0 +1,207 @@
+# ============================
+# PER-DESCRIPTION EMBEDDING CACHE
+# ============================
+
+import hashlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+
+EMBEDDING_CACHE_PATH = ".cache/embeddings.sqlite"
+
+# Bump whenever clean_and_lemmatize (or its lexicon) changes output
+CLEANING_VERSION = 1
+
+# LRU bound per table; one entry is one cleaned text or one SVD vector
+MAX_ENTRIES = 2_000_000
+
+SQL_BATCH = 900  # stays under SQLite's bound-parameter limit
+
+
+def description_key(text: str) -> str:
+    payload = f"{CLEANING_VERSION}\0{text}".encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def model_version(vectorizer, svd) -> str:
+    """
+    Fingerprint of fitted text models: same fingerprint, same vectors.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(type(vectorizer).__name__.encode('utf-8'))
+    vocabulary = getattr(vectorizer, 'vocabulary_', None)
+    if vocabulary is not None:
+        h.update(repr(sorted(vocabulary.items())).encode('utf-8'))
+    for name in ('columns_', 'idf_'):
+        values = getattr(vectorizer, name, None)
+        if values is not None:
+            h.update(np.ascontiguousarray(values).tobytes())
+    h.update(np.ascontiguousarray(svd.components_).tobytes())
+    return f"{CLEANING_VERSION}-{h.hexdigest()}"
+
+
+def _batches(items, size: int = SQL_BATCH):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class EmbeddingCache:
+    """
+    SQLite store of cleaned descriptions and their SVD vectors, keyed by
+    a hash of the raw description (and the cleaning / model version), so
+    unchanged titles are never cleaned or transformed twice.
+
+    Every lookup refreshes last_used; once a table exceeds max_entries
+    the least recently used rows are evicted. Hit/miss counts for the
+    current run are kept in self.stats.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = {'clean_hits': 0, 'clean_misses': 0,
+                      'vector_hits': 0, 'vector_misses': 0, 'evicted': 0}
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cleaned (
+                key TEXT PRIMARY KEY, clean TEXT NOT NULL, last_used REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS vectors (
+                key TEXT NOT NULL, model TEXT NOT NULL, vector BLOB NOT NULL,
+                last_used REAL NOT NULL, PRIMARY KEY (key, model)
+            );
+            CREATE INDEX IF NOT EXISTS cleaned_lru ON cleaned (last_used);
+            CREATE INDEX IF NOT EXISTS vectors_lru ON vectors (last_used);
+        """)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ---------- generic lookup / store ----------
+    def _lookup(self, table: str, column: str, keys: list, model: str = None) -> dict:
+        found = {}
+        now = time.time()
+        model_clause = " AND model = ?" if model is not None else ""
+        extra = [model] if model is not None else []
+        with self.conn:
+            for batch in _batches(keys):
+                marks = ','.join('?' * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT key, {column} FROM {table} WHERE key IN ({marks}){model_clause}",
+                    batch + extra
+                ).fetchall()
+                found.update(rows)
+                self.conn.execute(
+                    f"UPDATE {table} SET last_used = ? WHERE key IN ({marks}){model_clause}",
+                    [now] + batch + extra
+                )
+        return found
+
+    def _evict(self, table: str) -> None:
+        excess = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                f"DELETE FROM {table} WHERE rowid IN "
+                f"(SELECT rowid FROM {table} ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            self.stats['evicted'] += excess
+
+    # ---------- cleaned text ----------
+    def cleaned(self, texts: list, clean_fn) -> list:
+        """
+        Cleaned versions of texts; misses are cleaned in one call to
+        clean_fn(list_of_texts) and stored.
+        """
+        keys = [description_key(t) if isinstance(t, str) else None for t in texts]
+        unique = list({k for k in keys if k is not None})
+        found = self._lookup('cleaned', 'clean', unique)
+
+        miss_texts = {}
+        for k, t in zip(keys, texts):
+            if k is not None and k not in found:
+                miss_texts.setdefault(k, t)
+
+        if miss_texts:
+            miss_keys = list(miss_texts)
+            cleaned = clean_fn([miss_texts[k] for k in miss_keys])
+            found.update(zip(miss_keys, cleaned))
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO cleaned (key, clean, last_used) VALUES (?, ?, ?)",
+                    [(k, c, now) for k, c in zip(miss_keys, cleaned)]
+                )
+                self._evict('cleaned')
+
+        self.stats['clean_hits'] += len(unique) - len(miss_texts)
+        self.stats['clean_misses'] += len(miss_texts)
+        return [found[k] if k is not None else '' for k in keys]
+
+    # ---------- SVD vectors ----------
+    def vectors(self, texts: list, cleaned: list, model: str, transform_fn,
+                n_components: int, dtype) -> np.ndarray:
+        """
+        SVD vectors for texts under the given model version; misses are
+        computed with transform_fn(list_of_cleaned_texts) and stored.
+        """
+        dtype = np.dtype(dtype)
+        model = f"{model}-{dtype.str}"
+        keys = [description_key(t) if isinstance(t, str) else None for t in texts]
+        unique = list({k for k in keys if k is not None})
+        found = self._lookup('vectors', 'vector', unique, model)
+
+        X = np.empty((len(texts), n_components), dtype=dtype)
+        hit_rows = [i for i, k in enumerate(keys) if k in found]
+        if hit_rows:
+            blob = b''.join(found[keys[i]] for i in hit_rows)
+            X[hit_rows] = np.frombuffer(blob, dtype=dtype).reshape(-1, n_components)
+
+        miss_rows = [i for i, k in enumerate(keys) if k not in found]
+        if miss_rows:
+            X[miss_rows] = transform_fn([cleaned[i] for i in miss_rows])
+
+        new = {keys[i]: i for i in miss_rows if keys[i] is not None}
+        if new:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO vectors (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+                    [(k, model, X[i].tobytes(), now) for k, i in new.items()]
+                )
+                self._evict('vectors')
+
+        self.stats['vector_hits'] += len(found)
+        self.stats['vector_misses'] += len(new)
+        return X
+
+    def hit_rates(self) -> dict:
+        s = self.stats
+        return {
+            'clean_hit_rate': _rate(s['clean_hits'], s['clean_misses']),
+            'vector_hit_rate': _rate(s['vector_hits'], s['vector_misses']),
+        }
+
+    def report(self) -> str:
+        s, r = self.stats, self.hit_rates()
+        return (
+            f"[embed-cache] cleaned: {s['clean_hits']} hits / {s['clean_misses']} misses "
+            f"({_pct(r['clean_hit_rate'])}), vectors: {s['vector_hits']} hits / "
+            f"{s['vector_misses']} misses ({_pct(r['vector_hit_rate'])}), "
+            f"evicted {s['evicted']}"
+        )
+
+
+def _rate(hits: int, misses: int):
+    return hits / (hits + misses) if hits + misses else None
+
+
+def _pct(rate) -> str:
+    return f"{rate:.1%}" if rate is not None else "n/a"
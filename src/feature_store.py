@@ -0,0 +1,140 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.clustering import scale_structural_features, stack_features, STRUCT_COLS
+
+
+class FeatureStore:
+    """
+    float32 feature matrix in a memory-mapped .npy file, plus a column
+    schema recording which column ranges are SVD and which structural.
+
+    Readers get np.memmap views, so clustering, risk scoring and the app
+    can share one on-disk copy instead of holding float64 arrays.
+    """
+
+    DATA_FILE = 'features.npy'
+    SCHEMA_FILE = 'schema.json'
+
+    def __init__(self, path: str, matrix: np.ndarray, schema: dict):
+        self.path = path
+        self.matrix = matrix
+        self.schema = schema
+
+    # ----------------------------
+    # Construction
+    # ----------------------------
+    @staticmethod
+    def _schema(n_rows: int, groups: dict, dtype) -> dict:
+        columns, spans, start = [], {}, 0
+        for name, cols in groups.items():
+            columns.extend(cols)
+            spans[name] = [start, start + len(cols)]
+            start += len(cols)
+
+        return {
+            'n_rows': int(n_rows),
+            'dtype': np.dtype(dtype).name,
+            'columns': columns,
+            'groups': spans
+        }
+
+    @classmethod
+    def create(cls, path: str, n_rows: int, groups: dict, dtype=np.float32):
+        """
+        Allocates a writable file-backed store. groups maps group name →
+        column names, laid out left to right in the given order.
+        """
+        schema = cls._schema(n_rows, groups, dtype)
+
+        os.makedirs(path)
+        with open(os.path.join(path, cls.SCHEMA_FILE), 'w') as f:
+            json.dump(schema, f)
+
+        matrix = np.lib.format.open_memmap(
+            os.path.join(path, cls.DATA_FILE), mode='w+', dtype=dtype,
+            shape=(n_rows, len(schema['columns']))
+        )
+        return cls(path, matrix, schema)
+
+    @classmethod
+    def in_memory(cls, n_rows: int, groups: dict, dtype=np.float32):
+        """
+        Same layout without a backing file (used when nothing is persisted).
+        """
+        schema = cls._schema(n_rows, groups, dtype)
+        return cls(None, np.empty((n_rows, len(schema['columns'])), dtype=dtype), schema)
+
+    @classmethod
+    def open(cls, path: str, mode: str = 'r'):
+        with open(os.path.join(path, cls.SCHEMA_FILE)) as f:
+            schema = json.load(f)
+        matrix = np.load(os.path.join(path, cls.DATA_FILE), mmap_mode=mode)
+        return cls(path, matrix, schema)
+
+    # ----------------------------
+    # Access (all zero-copy views)
+    # ----------------------------
+    @property
+    def columns(self) -> list:
+        return self.schema['columns']
+
+    def group(self, name: str) -> np.ndarray:
+        start, stop = self.schema['groups'][name]
+        return self.matrix[:, start:stop]
+
+    @property
+    def svd(self) -> np.ndarray:
+        return self.group('svd')
+
+    @property
+    def structural(self) -> np.ndarray:
+        return self.group('structural')
+
+    def __len__(self) -> int:
+        return self.schema['n_rows']
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def flush(self) -> None:
+        if isinstance(self.matrix, np.memmap):
+            self.matrix.flush()
+
+    def move(self, new_path: str) -> None:
+        """
+        Renames the store directory; open mappings stay valid.
+        """
+        self.flush()
+        os.replace(self.path, new_path)
+        self.path = new_path
+
+
+def build_feature_store(df: pd.DataFrame, X_svd: np.ndarray, path: str = None):
+    """
+    build_feature_matrix written straight into a new float32 store
+    (file-backed when path is given). Returns (store, scaler, fill_values).
+    """
+    X_struct_scaled, scaler, fill_values = scale_structural_features(df)
+    return stack_feature_store(X_svd, X_struct_scaled, path), scaler, fill_values
+
+
+def stack_feature_store(X_svd: np.ndarray, X_struct_scaled: np.ndarray, path: str = None) -> FeatureStore:
+    """
+    Store from already scaled structural columns (see
+    scale_structural_features), so both halves can be built separately.
+    """
+    groups = {
+        'svd': [f'svd_{i}' for i in range(X_svd.shape[1])],
+        'structural': list(STRUCT_COLS)
+    }
+    if path is None:
+        store = FeatureStore.in_memory(len(X_svd), groups)
+    else:
+        store = FeatureStore.create(path, len(X_svd), groups)
+    stack_features(X_svd, X_struct_scaled, out=store.matrix)
+    store.flush()
+    return store
@@ -1,7 +1,28 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 import pandas as pd
 import numpy as np
 
 
+# --------------------------------------------------
+# STRATEGY → EXPLORATION RATIO
+# --------------------------------------------------
+def exploration_ratio_for(exploration_bias: str, diversity_report: dict) -> float:
+    if exploration_bias == "HIGH":
+        return 0.40
+    if exploration_bias == "LOW":
+        return 0.10
+
+    # MEDIUM → adapt to diversity health
+    if diversity_report['diversity_risk'] == "HIGH":
+        return 0.35
+    if diversity_report['diversity_risk'] == "MEDIUM":
+        return 0.25
+    return 0.10
+
+
 # --------------------------------------------------
 # HYBRID DECISION ENGINE (FINAL)
 # --------------------------------------------------
@@ -29,18 +50,7 @@ def hybrid_content_selection(
         safe_df = df.copy()
 
     # 2️⃣ Determine exploration ratio (STRATEGY-DRIVEN)
-    if exploration_bias == "HIGH":
-        exploration_ratio = 0.40
-    elif exploration_bias == "LOW":
-        exploration_ratio = 0.10
-    else:
-        # MEDIUM → adapt to diversity health
-        if diversity_report['diversity_risk'] == "HIGH":
-            exploration_ratio = 0.35
-        elif diversity_report['diversity_risk'] == "MEDIUM":
-            exploration_ratio = 0.25
-        else:
-            exploration_ratio = 0.10
+    exploration_ratio = exploration_ratio_for(exploration_bias, diversity_report)
 
     n_explore = int(max_items * exploration_ratio)
     n_exploit = max_items - n_explore
@@ -53,14 +63,14 @@ def hybrid_content_selection(
     # 4️⃣ Exploitation: safe content from dominant cluster
     exploit_candidates = (
         safe_df[safe_df[cluster_col] == dominant_cluster]
-        .sort_values(risk_col)
+        .sort_values(risk_col, kind='stable')
         .head(n_exploit)
     )
 
     # 5️⃣ Exploration: safe content from under-exposed clusters
     explore_candidates = (
         safe_df[safe_df[cluster_col].isin(under_exposed_clusters)]
-        .sort_values(risk_col)
+        .sort_values(risk_col, kind='stable')
         .head(n_explore)
     )
 
@@ -69,3 +79,151 @@ def hybrid_content_selection(
     final_selection = final_selection.drop_duplicates().head(max_items)
 
     return final_selection
+
+
+# --------------------------------------------------
+# PRECOMPUTED SELECTION INDEX
+# --------------------------------------------------
+class SelectionIndex:
+    """
+    Row positions of each cluster, sorted by risk once.
+
+    A selection is then a bisect on risk_threshold per cluster plus a
+    k-way merge of the cluster lists, touching only the rows returned.
+    Results match hybrid_content_selection, except that rows are
+    de-duplicated by position rather than by comparing every column.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        cluster_col: str = 'km_cluster',
+        risk_col: str = 'promotion_failure_score'
+    ):
+        self.df = df
+
+        # Missing risk sorts last, exactly like sort_values
+        risk = df[risk_col].to_numpy(dtype=float, na_value=np.nan)
+        risk = np.where(np.isnan(risk), np.inf, risk)
+        order = np.argsort(risk, kind='stable')
+        self.sorted_risk = risk[order]
+
+        labels = df[cluster_col].to_numpy()[order]
+        self.clusters = {}
+        for c in pd.unique(labels):
+            if pd.isna(c):
+                continue
+            members = order[labels == c]
+            self.clusters[c] = (risk[members], members)
+
+    def _candidates(self, cluster, limit_risk: float):
+        """
+        (risk, position) pairs of a cluster up to limit_risk, in order.
+        """
+        risks, members = self.clusters.get(cluster, (np.empty(0), np.empty(0, dtype=int)))
+        stop = np.searchsorted(risks, limit_risk, side='right')
+        return risks[:stop], members[:stop]
+
+    def select(
+        self,
+        diversity_report: dict,
+        max_items: int = 10,
+        risk_threshold: float = 0.6,
+        exploration_bias: str = "MEDIUM",
+        clusters=None,
+        near_duplicates=None,
+        max_similarity: float = None
+    ) -> pd.DataFrame:
+        """
+        Same result as hybrid_content_selection. clusters optionally
+        restricts the catalog to those clusters (as if the frame had been
+        filtered on cluster_col before the call).
+
+        With a NearDuplicateIndex (src.near_duplicates), each stream skips
+        candidates whose description embedding is at least max_similarity
+        (default: the index threshold) similar to a title already chosen,
+        and takes the next lowest-risk one instead.
+        """
+        cluster_probs = diversity_report['cluster_distribution']
+        allowed = None if clusters is None else set(clusters)
+
+        # 1️⃣ Safe pool (relaxed to the whole catalog if too small)
+        if allowed is None:
+            n_safe = np.searchsorted(self.sorted_risk, risk_threshold, side='right')
+        else:
+            n_safe = sum(len(self._candidates(c, risk_threshold)[1]) for c in allowed)
+        limit = risk_threshold if n_safe >= max_items else np.inf
+
+        # 2️⃣ Exploration ratio
+        exploration_ratio = exploration_ratio_for(exploration_bias, diversity_report)
+        n_explore = int(max_items * exploration_ratio)
+        n_exploit = max_items - n_explore
+
+        dominant_cluster = cluster_probs.idxmax()
+
+        # 3️⃣ Exploitation: head of the dominant cluster's list
+        exploit = []
+        if allowed is None or dominant_cluster in allowed:
+            dominant = self._candidates(dominant_cluster, limit)[1]
+            if near_duplicates is None:
+                exploit = dominant[:n_exploit].tolist()
+            else:
+                exploit = _distinct(dominant.tolist(), n_exploit, [], near_duplicates, max_similarity)
+
+        # 4️⃣ Exploration: lowest-risk rows across all listed clusters
+        streams = [
+            zip(*self._candidates(c, limit))
+            for c in cluster_probs.index
+            if allowed is None or c in allowed
+        ]
+        merged = (pos for _, pos in heapq.merge(*streams))
+        if near_duplicates is None:
+            explore = list(islice(merged, n_explore))
+        else:
+            explore = _distinct(merged, n_explore, exploit, near_duplicates, max_similarity)
+
+        # 5️⃣ Combine (first occurrence wins) & finalize
+        positions = list(dict.fromkeys(exploit + explore))[:max_items]
+        return self.df.iloc[positions]
+
+
+def _distinct(positions, n: int, chosen: list, near_duplicates, max_similarity) -> list:
+    """
+    First n positions (in order) that are not near-duplicates of chosen
+    or of each other.
+    """
+    taken = []
+    for pos in positions:
+        if len(taken) >= n:
+            break
+        if not near_duplicates.is_too_similar(pos, chosen + taken, max_similarity):
+            taken.append(pos)
+    return taken
+
+
+# --------------------------------------------------
+# BATCH SELECTION
+# --------------------------------------------------
+def batch_content_selection(
+    index: SelectionIndex,
+    diversity_report: dict,
+    specs: list,
+    max_workers: int = None
+) -> list:
+    """
+    Evaluates many selection specs against one shared SelectionIndex.
+
+    Each spec is a dict with any of risk_threshold, exploration_bias,
+    max_items, clusters, near_duplicates and max_similarity (defaults as
+    in SelectionIndex.select).
+    Returns one slate per spec, in order; max_workers > 1 fans the specs
+    out over a thread pool.
+    """
+    def run(spec):
+        return index.select(diversity_report, **spec)
+
+    if not max_workers or max_workers <= 1:
+        return [run(spec) for spec in specs]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run, specs))
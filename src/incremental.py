@@ -0,0 +1,170 @@
+# ============================
+# INCREMENTAL CATALOG INGESTION
+# ============================
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.nltk_setup import setup_nltk
+from src.data_loader import load_netflix_data
+from src.preprocessing import preprocess_netflix_data
+from src.text_features import clean_descriptions
+from src.streaming_text import HashedTfidfVectorizer
+from src.clustering import transform_feature_matrix
+from src.promotion_risk import compute_promotion_failure_score, compute_centroid_distances
+from src.diversity_metrics import assess_discovery_diversity_risk
+from src.near_duplicates import NearDuplicateIndex
+from src.artifacts import load_artifacts, save_artifacts
+from src.pipeline import fit_catalog
+
+
+# Share of delta rows lying beyond the base catalog's 95th-percentile
+# centroid distance; above this the clusters no longer describe the data.
+DRIFT_THRESHOLD = 0.25
+
+# Deltas larger than this share of the base catalog always trigger a refit
+MAX_DELTA_FRACTION = 0.2
+
+
+def embed_descriptions(df: pd.DataFrame, models: dict, n_jobs: int = 1) -> np.ndarray:
+    """
+    SVD text embeddings of new titles using the persisted vectorizer and SVD.
+    """
+    clean = clean_descriptions(df['description'], n_jobs=n_jobs)
+    return models['svd'].transform(models['vectorizer'].transform(clean))
+
+
+def embed_new_titles(df: pd.DataFrame, models: dict, n_jobs: int = 1, X_svd=None) -> np.ndarray:
+    """
+    Feature rows for new titles using the persisted vectorizer, SVD and
+    scaler, in the dtype the clusters were fitted on.
+    """
+    if X_svd is None:
+        X_svd = embed_descriptions(df, models, n_jobs=n_jobs)
+    X = transform_feature_matrix(df, X_svd, models['scaler'], models['fill_values'])
+    return X.astype(models['kmeans'].cluster_centers_.dtype, copy=False)
+
+
+def measure_drift(X_new: np.ndarray, labels: np.ndarray, stats: dict) -> float:
+    """
+    Fraction of new rows farther from their centroid than the base p95.
+    """
+    distances = compute_centroid_distances(
+        X_new, labels, stats['centroid_labels'], stats['centroids']
+    )
+    return float(np.mean(distances > stats['distance_p95']))
+
+
+def ingest_delta(
+    delta_path: str,
+    artifact_dir: str = 'artifacts',
+    key_col: str = 'show_id',
+    drift_threshold: float = DRIFT_THRESHOLD,
+    max_delta_fraction: float = MAX_DELTA_FRACTION,
+    n_jobs: int = 1,
+    save: bool = True
+) -> dict:
+    """
+    Adds new or changed titles to a published catalog.
+
+    Delta rows are transformed with the persisted models and assigned to
+    the existing clusters with kmeans.predict. Centroids and promotion
+    risk are refreshed only for the clusters the delta touches. If the
+    delta drifts away from the fitted clusters, or is large relative to
+    the base, every model is refitted on the merged catalog instead.
+    """
+    base = load_artifacts(artifact_dir)
+    catalog, X, kmeans = base['df'], base['X'], base['kmeans']
+    stats = dict(base['risk_stats'])
+
+    setup_nltk()
+    delta = preprocess_netflix_data(load_netflix_data(delta_path))
+    print(f"Delta loaded: {delta.shape}")
+
+    X_svd_delta = embed_descriptions(delta, base, n_jobs=n_jobs)
+    X_delta = embed_new_titles(delta, base, X_svd=X_svd_delta)
+    delta['km_cluster'] = kmeans.predict(X_delta)
+
+    drift = measure_drift(X_delta, delta['km_cluster'].to_numpy(), stats)
+    print(f"Delta drift (share beyond base p95 distance): {drift:.2%}")
+
+    # Changed titles replace their previous rows
+    keep = ~catalog[key_col].isin(delta[key_col]).to_numpy()
+    replaced_clusters = catalog.loc[~keep, 'km_cluster'].unique()
+
+    merged = pd.concat([catalog[keep], delta], ignore_index=True)
+    X_merged = np.vstack([X[keep], X_delta])
+
+    refit = drift > drift_threshold or len(delta) > max_delta_fraction * len(catalog)
+
+    if refit:
+        print("Drift threshold exceeded — refitting all models.")
+        merged = merged.drop(columns=['km_cluster', 'promotion_failure_score'])
+        results = fit_catalog(
+            merged,
+            k=kmeans.n_clusters,
+            risk_weights=stats['weights'],
+            n_jobs=n_jobs,
+            text_mode='hashing' if isinstance(base['vectorizer'], HashedTfidfVectorizer) else 'tfidf'
+        )
+        affected = results['risk_stats']['centroid_labels']
+    else:
+        affected = np.union1d(delta['km_cluster'].unique(), replaced_clusters)
+        labels = merged['km_cluster'].to_numpy()
+
+        # Refresh centroids of the affected clusters only
+        centroids = stats['centroids'].copy()
+        for c in affected:
+            pos = np.searchsorted(stats['centroid_labels'], c)
+            centroids[pos] = X_merged[labels == c].mean(axis=0)
+        stats['centroids'] = centroids
+
+        rows = np.isin(labels, affected)
+        scored = compute_promotion_failure_score(
+            merged.loc[rows].copy(), X_merged[rows], stats=stats, **stats['weights']
+        )
+        merged.loc[rows, 'promotion_failure_score'] = scored['promotion_failure_score'].to_numpy()
+
+        results = {
+            **base,
+            'df': merged,
+            'X': X_merged,
+            'risk_stats': stats,
+            'diversity_report': assess_discovery_diversity_risk(merged),
+            # Timings of the full run do not describe this update
+            'stage_timings': None,
+            'schedule': None
+        }
+
+        # Re-hash the index over the merged rows (stored vectors are reused)
+        index = base.get('near_duplicates')
+        if index is not None:
+            results['near_duplicates'] = NearDuplicateIndex.build(
+                np.vstack([index.vectors[keep], X_svd_delta]), threshold=index.threshold
+            )
+
+    if save:
+        save_artifacts(artifact_dir, results)
+
+    results['refit'] = refit
+    results['drift'] = drift
+    results['affected_clusters'] = [int(c) for c in affected]
+    return results
+
+
+# ----------------------------
+# ENTRY POINT
+# ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest a delta CSV of new or changed titles.")
+    parser.add_argument("delta_path")
+    parser.add_argument("--artifacts", default="artifacts")
+    parser.add_argument("--drift-threshold", type=float, default=DRIFT_THRESHOLD)
+    args = parser.parse_args()
+
+    results = ingest_delta(args.delta_path, args.artifacts, drift_threshold=args.drift_threshold)
+    print(f"Catalog size: {len(results['df'])}")
+    print(f"Refit: {results['refit']}  Affected clusters: {results['affected_clusters']}")
+    print(f"Diversity Risk Level: {results['diversity_report']['diversity_risk']}")
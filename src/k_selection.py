@@ -0,0 +1,140 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans
+from sklearn.metrics import davies_bouldin_score
+from threadpoolctl import threadpool_limits
+
+from src.clustering import fit_kmeans, evaluate_silhouette, SILHOUETTE_SAMPLE_SIZE
+
+
+K_RANGE = range(2, 11)
+SWEEP_N_INIT = 20          # restarts for cold-started fits
+WARM_START_SAMPLE = 20_000  # rows scanned when seeding the next centroid
+
+
+# --------------------------------------------------
+# Scoring
+# --------------------------------------------------
+def score_k(
+    X: np.ndarray,
+    model,
+    silhouette: str = 'sample',
+    sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+    labels: np.ndarray = None
+) -> dict:
+    """
+    Inertia, silhouette and Davies–Bouldin for one fitted model. Pass
+    labels for models from fit_kmeans (a streamed fit's labels_ and
+    inertia_ only cover its last chunk).
+    """
+    if labels is None:
+        labels, inertia = model.labels_, model.inertia_
+    else:
+        inertia = -model.score(X)
+    sil = evaluate_silhouette(X, labels, mode=silhouette, sample_size=sample_size)
+    return {
+        'k': model.n_clusters,
+        'inertia': float(inertia),
+        'silhouette': sil['score'],
+        'silhouette_ci_low': sil['ci'][0] if sil['ci'] else sil['score'],
+        'silhouette_ci_high': sil['ci'][1] if sil['ci'] else sil['score'],
+        'davies_bouldin': float(davies_bouldin_score(X, labels))
+    }
+
+
+# --------------------------------------------------
+# Fitting
+# --------------------------------------------------
+def _extend_centers(X: np.ndarray, centers: np.ndarray, random_state: int = 42) -> np.ndarray:
+    """
+    Previous centroids plus the (sampled) point farthest from all of them.
+    """
+    rng = np.random.default_rng(random_state)
+    sample = X if len(X) <= WARM_START_SAMPLE else X[rng.choice(len(X), WARM_START_SAMPLE, replace=False)]
+    d2 = (sample ** 2).sum(axis=1)[:, None] - 2 * sample @ centers.T + (centers ** 2).sum(axis=1)
+    d2 = d2.min(axis=1)
+    return np.vstack([centers, sample[np.argmax(d2)]])
+
+
+def _fit_cold(X: np.ndarray, k: int, silhouette: str, sample_size: int, backend_params: dict):
+    if backend_params.get('backend', 'exact') == 'exact':
+        backend_params = {'n_init': SWEEP_N_INIT, **backend_params}
+    labels, model = fit_kmeans(X, k=k, **backend_params)
+    model.labels_ = labels  # a streamed fit's own labels_ only cover its last chunk
+    return model, score_k(X, model, silhouette, sample_size, labels)
+
+
+def sweep_k(
+    X: np.ndarray,
+    k_range=K_RANGE,
+    warm_start: bool = True,
+    n_jobs: int = -1,
+    silhouette: str = 'sample',
+    silhouette_sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+    **backend_params
+):
+    """
+    Fits a clustering model for every K in k_range and scores each fit.
+    silhouette / silhouette_sample_size and backend_params are the
+    run_kmeans / fit_kmeans parameters ('off' is rejected: K is chosen
+    by silhouette).
+
+    With warm_start (exact backend, default n_init only), K+1 starts
+    from the K centroids plus the farthest point (a single Lloyd run
+    instead of SWEEP_N_INIT restarts). That chains the fits, so they run
+    one after another, each using every core through KMeans' own
+    threads, while scoring of finished fits runs concurrently on a
+    thread pool: far less total work than SWEEP_N_INIT restarts per K
+    in parallel. Otherwise (or with warm_start=False) independent
+    cold-started fits are spread over n_jobs worker processes.
+
+    Returns (scores DataFrame indexed by k, {k: fitted model}).
+    """
+    if silhouette == 'off':
+        raise ValueError("K selection needs a silhouette score; use 'exact', 'sample' or 'centroid'")
+
+    ks = sorted(k_range)
+    models, rows = {}, []
+    sample_size = silhouette_sample_size
+    warm_start = warm_start and backend_params.get('backend', 'exact') == 'exact' \
+        and backend_params.get('n_init') is None
+
+    if warm_start:
+        workers = os.cpu_count() if n_jobs is None or n_jobs < 1 else n_jobs
+        with threadpool_limits(limits=backend_params.get('n_threads')), \
+                ThreadPoolExecutor(max_workers=workers) as pool:
+            futures, centers = [], None
+            for k in ks:
+                if centers is None or len(centers) != k - 1:
+                    model = KMeans(n_clusters=k, random_state=42, n_init=SWEEP_N_INIT)
+                else:
+                    model = KMeans(n_clusters=k, init=_extend_centers(X, centers), n_init=1)
+                model.fit(X)
+                models[k] = model
+                centers = model.cluster_centers_
+                futures.append(pool.submit(score_k, X, model, silhouette, sample_size))
+            rows = [f.result() for f in futures]
+    else:
+        fitted = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_cold)(X, k, silhouette, sample_size, backend_params) for k in ks
+        )
+        for model, row in fitted:
+            models[model.n_clusters] = model
+            rows.append(row)
+
+    scores = pd.DataFrame(rows).set_index('k')
+    return scores, models
+
+
+def choose_k(scores: pd.DataFrame) -> int:
+    """
+    Highest sampled silhouette; Davies–Bouldin breaks near-ties
+    (overlapping silhouette confidence intervals).
+    """
+    best = scores['silhouette'].idxmax()
+    tied = scores[scores['silhouette_ci_high'] >= scores.loc[best, 'silhouette_ci_low']]
+    return int(tied['davies_bouldin'].idxmin())
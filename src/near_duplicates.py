@@ -0,0 +1,201 @@
+# ============================
+# NEAR-DUPLICATE TITLE INDEX
+# ============================
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Cosine similarity of description embeddings above which two titles are
+# treated as near-duplicates (remakes, sequels, regional variants)
+NEAR_DUPLICATE_THRESHOLD = 0.95
+
+LSH_TABLES = 12
+LSH_TARGET_BUCKET = 16  # n_bits is chosen so buckets hold about this many rows
+PAIR_BLOCK = 2048  # rows per block when comparing within a large bucket
+
+
+class NearDuplicateIndex:
+    """
+    Random-projection LSH over L2-normalized SVD embeddings.
+
+    Each of n_tables tables hashes a row to the sign pattern of n_bits
+    random projections, so rows at a small angle share a bucket in at
+    least one table with high probability. Candidate pairs are then
+    verified with exact cosine similarity, so there are no false
+    positives; recall depends on n_bits / n_tables (see
+    benchmarks.bench_near_duplicates).
+
+    Rows with an all-zero embedding (empty descriptions) are never
+    near-duplicates of anything.
+    """
+
+    VECTORS_FILE = 'vectors.npy'
+    CODES_FILE = 'codes.npy'
+    ORDER_FILE = 'order.npy'
+    PLANES_FILE = 'planes.npy'
+    META_FILE = 'meta.json'
+
+    def __init__(self, vectors, planes, codes, order, threshold=NEAR_DUPLICATE_THRESHOLD, path=None):
+        self.vectors = vectors      # (n, d) float32, unit rows
+        self.planes = planes        # (n_tables, d, n_bits)
+        self.codes = codes          # (n_tables, n) bucket codes, sorted per table
+        self.order = order          # (n_tables, n) row of each sorted code
+        self.threshold = threshold
+        self.path = path
+
+    # ----------------------------
+    # Construction
+    # ----------------------------
+    @classmethod
+    def build(
+        cls,
+        X_svd: np.ndarray,
+        n_tables: int = LSH_TABLES,
+        n_bits: int = None,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+        random_state: int = 42
+    ):
+        vectors = np.asarray(X_svd, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+        n, d = vectors.shape
+        if n_bits is None:
+            n_bits = int(np.clip(np.ceil(np.log2(max(n, 2) / LSH_TARGET_BUCKET)), 4, 30))
+
+        rng = np.random.default_rng(random_state)
+        planes = rng.standard_normal((n_tables, d, n_bits)).astype(np.float32)
+
+        codes = np.stack([cls._hash(vectors, p) for p in planes])
+        codes[:, norms.ravel() == 0] = -1  # keep empty embeddings out of real buckets
+        order = np.argsort(codes, axis=1, kind='stable')
+        codes = np.take_along_axis(codes, order, axis=1)
+        return cls(vectors, planes, codes, order, threshold)
+
+    @staticmethod
+    def _hash(vectors: np.ndarray, planes: np.ndarray) -> np.ndarray:
+        bits = (vectors @ planes) > 0
+        return bits.astype(np.int64) @ (1 << np.arange(planes.shape[1], dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def _bucket(self, table: int, code: int) -> np.ndarray:
+        lo, hi = np.searchsorted(self.codes[table], [code, code + 1])
+        return self.order[table][lo:hi]
+
+    def neighbors(self, vector: np.ndarray, threshold: float = None) -> np.ndarray:
+        """
+        Catalog rows whose cosine similarity to vector (an SVD
+        embedding, not necessarily normalized) is at least threshold.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        if norm == 0:
+            return np.empty(0, dtype=np.int64)
+        v = v / norm
+
+        candidates = np.unique(np.concatenate([
+            self._bucket(t, int(self._hash(v[None, :], self.planes[t])[0]))
+            for t in range(len(self.planes))
+        ]))
+        sims = self.vectors[candidates] @ v
+        return candidates[sims >= threshold]
+
+    def is_too_similar(self, row: int, selected: list, threshold: float = None) -> bool:
+        """
+        True if catalog row is (or nearly duplicates) any selected row.
+        An exact check against the few selected rows, no hashing needed.
+        """
+        if not selected:
+            return False
+        if row in selected:
+            return True
+        threshold = self.threshold if threshold is None else threshold
+        return bool((self.vectors[selected] @ self.vectors[row]).max() >= threshold)
+
+    def near_duplicate_pairs(self, threshold: float = None) -> np.ndarray:
+        """
+        All (i, j) row pairs, i < j, with similarity >= threshold that
+        share an LSH bucket. Only rows within a bucket are compared, so
+        the cost grows with the sum of squared bucket sizes rather than n².
+        Returns an (m, 3) array of i, j, similarity sorted by similarity.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        found = {}
+        for table in range(len(self.planes)):
+            order = self.order[table]
+            sorted_codes = np.asarray(self.codes[table])
+            starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+            sizes = np.diff(np.r_[starts, len(order)])
+
+            for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+                if sorted_codes[start] == -1:
+                    continue
+                members = np.sort(order[start:start + size])
+                for i, j, s in _pairs_above(self.vectors, members, threshold):
+                    found[(i, j)] = s
+
+        if not found:
+            return np.empty((0, 3))
+        pairs = np.array([(i, j, s) for (i, j), s in found.items()])
+        pairs[:, 2] = np.minimum(pairs[:, 2], 1.0)  # float32 rounding
+        return pairs[np.argsort(-pairs[:, 2], kind='stable')]
+
+    def report(self, df: pd.DataFrame, threshold: float = None, columns=('title',)) -> pd.DataFrame:
+        """
+        Near-duplicate pairs as a frame (positions, chosen columns of
+        both rows, similarity), most similar first.
+        """
+        pairs = self.near_duplicate_pairs(threshold)
+        left = pairs[:, 0].astype(int)
+        right = pairs[:, 1].astype(int)
+        out = pd.DataFrame({'row_a': left, 'row_b': right})
+        for col in columns:
+            values = df[col].to_numpy()
+            out[f'{col}_a'] = values[left]
+            out[f'{col}_b'] = values[right]
+        out['similarity'] = pairs[:, 2]
+        return out
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def save(self, path: str) -> None:
+        os.makedirs(path)
+        np.save(os.path.join(path, self.VECTORS_FILE), self.vectors)
+        np.save(os.path.join(path, self.PLANES_FILE), self.planes)
+        np.save(os.path.join(path, self.CODES_FILE), self.codes)
+        np.save(os.path.join(path, self.ORDER_FILE), self.order)
+        with open(os.path.join(path, self.META_FILE), 'w') as f:
+            json.dump({'threshold': self.threshold, 'n_rows': len(self)}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str = None):
+        with open(os.path.join(path, cls.META_FILE)) as f:
+            meta = json.load(f)
+        arrays = [
+            np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+            for name in (cls.VECTORS_FILE, cls.PLANES_FILE, cls.CODES_FILE, cls.ORDER_FILE)
+        ]
+        return cls(*arrays, threshold=meta['threshold'], path=path)
+
+
+def _pairs_above(vectors: np.ndarray, members: np.ndarray, threshold: float):
+    """(i, j, similarity) for member pairs i < j at or above threshold."""
+    for lo in range(0, len(members), PAIR_BLOCK):
+        block = members[lo:lo + PAIR_BLOCK]
+        rest = members[lo:]
+        sims = vectors[block] @ vectors[rest].T
+        bi, rj = np.nonzero(sims >= threshold)
+        keep = bi < rj  # block and rest both start at lo: strictly upper pairs
+        for b, r in zip(bi[keep], rj[keep]):
+            yield int(block[b]), int(rest[r]), float(sims[b, r])
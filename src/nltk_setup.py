@@ -1,19 +1,37 @@
-import nltk
+import os
 import logging
 
+_checked = set()
+
+
+def setup_nltk(require_corpora: bool = None):
+    """
+    Makes sure the NLTK resources needed for text cleaning are present.
+    Stopwords are only required when no precomputed lexicon exists;
+    WordNet always is, since tokens missing from the lexicon are still
+    lemmatized with it. Each resource is probed at most once per process.
+    """
+    from src.text_features import LEXICON_PATH
+
+    if require_corpora is None:
+        require_corpora = not os.path.exists(LEXICON_PATH)
+
+    resources = {'punkt': 'tokenizers/punkt', 'wordnet': 'corpora/wordnet'}
+    if require_corpora:
+        resources['stopwords'] = 'corpora/stopwords'
+
+    pending = {r: p for r, p in resources.items() if r not in _checked}
+    if not pending:
+        return
+
+    import nltk
 
-def setup_nltk():
     # Silence NLTK downloader logging
     logging.getLogger('nltk').setLevel(logging.ERROR)
 
-    resources = {
-        'punkt': 'tokenizers/punkt',
-        'stopwords': 'corpora/stopwords',
-        'wordnet': 'corpora/wordnet'
-    }
-
-    for resource, path in resources.items():
+    for resource, path in pending.items():
         try:
             nltk.data.find(path)
         except LookupError:
             nltk.download(resource, quiet=True)
+        _checked.add(resource)
@@ -0,0 +1,395 @@
+# ============================
+# CACHED PIPELINE STAGES
+# ============================
+
+import os
+
+import numpy as np
+
+from src.nltk_setup import setup_nltk
+from src.data_loader import iter_netflix_data, concat_chunks, LOAD_CHUNK_SIZE
+from src.preprocessing import preprocess_netflix_chunks
+from src.text_features import (
+    build_text_embeddings, clean_catalog_text, text_model_params, load_text_models, save_text_models,
+    TFIDF_PARAMS, SVD_COMPONENTS
+)
+from src.clustering import run_kmeans, scale_structural_features
+from src.feature_store import stack_feature_store
+from src.k_selection import sweep_k, choose_k, K_RANGE
+from src.promotion_risk import (
+    compute_duration_risk, compute_delay_risk, compute_cluster_distance_risk,
+    compute_centroid_distances, fit_duration_stats, fit_delay_stats, fit_distance_stats, DEFAULT_RISK_WEIGHTS
+)
+from src.diversity_metrics import assess_discovery_diversity_risk
+from src.stage_cache import StageCache, file_digest, stage_key
+from src.embedding_cache import EmbeddingCache
+from src.near_duplicates import NearDuplicateIndex
+from src.dag import PipelineDAG
+from src.profiling import profile_stage
+
+
+# Bump whenever a stage changes what it stores, to invalidate old entries
+CACHE_VERSION = 7
+
+# Values every run produces (see _results)
+RESULT_VALUES = [
+    'df', 'X_svd', 'vectorizer', 'svd', 'near_duplicates', 'feature_store',
+    'scaler', 'fill_values', 'labels', 'kmeans', 'scores', 'risk_stats'
+]
+
+
+# --------------------------------------------------
+# Stages (each returns a dict of artifacts)
+# --------------------------------------------------
+def text_stage(df, tfidf_params=None, n_components=SVD_COMPONENTS, n_jobs=1, profiler=None,
+               text_mode='tfidf', svd_params=None, models_path=None, embedding_cache_path=None):
+    setup_nltk()
+    params = text_model_params(text_mode, tfidf_params, n_components, svd_params)
+    models = load_text_models(models_path, params) if models_path else None
+    embedding_cache = EmbeddingCache(embedding_cache_path) if embedding_cache_path else None
+
+    # Runs next to other stages reading df: work on a copy of the column
+    # and hand the cleaned text on as a stage output, never as a df column
+    descriptions = df[['description']].copy()
+    try:
+        cleaned = clean_catalog_text(descriptions['description'].tolist(), n_jobs, profiler, embedding_cache)
+        X_svd, vectorizer, svd = build_text_embeddings(
+            descriptions, n_jobs=n_jobs, cleaned=cleaned, tfidf_params=tfidf_params, n_components=n_components,
+            profiler=profiler, mode=text_mode, svd_params=svd_params, models=models,
+            embedding_cache=embedding_cache
+        )
+        if embedding_cache is not None:
+            print(embedding_cache.report())
+    finally:
+        if embedding_cache is not None:
+            embedding_cache.close()
+
+    if models_path and models is None:
+        save_text_models(models_path, vectorizer, svd, params)
+        print(f"Text models saved to: {models_path}")
+    return {'X_svd': X_svd, 'vectorizer': vectorizer, 'svd': svd, 'clean_text': cleaned}
+
+
+def near_duplicate_stage(X_svd):
+    return {'near_duplicates': NearDuplicateIndex.build(X_svd)}
+
+
+def structural_stage(df):
+    X_struct, scaler, fill_values = scale_structural_features(df)
+    return {'X_struct': X_struct, 'scaler': scaler, 'fill_values': fill_values}
+
+
+def feature_stage(X_svd, X_struct, store_path=None):
+    return {'feature_store': stack_feature_store(X_svd, X_struct, store_path)}
+
+
+def cluster_stage(df, X, k, kmeans_params=None, profiler=None):
+    params = {key: value for key, value in (kmeans_params or {}).items() if key != 'sweep_silhouette'}
+    clustered, kmeans = run_kmeans(df.copy(), X, k=k, profiler=profiler, **params)
+    distances = clustered['centroid_distance'].to_numpy() if 'centroid_distance' in clustered else None
+    return {'labels': clustered['km_cluster'].to_numpy(), 'kmeans': kmeans, 'centroid_distances': distances}
+
+
+def k_sweep_stage(X, k_range=K_RANGE, n_jobs=1, kmeans_params=None):
+    # Every K is scored with a sampled silhouette unless sweep_silhouette
+    # asks otherwise; the single-fit silhouette mode does not apply
+    params = dict(kmeans_params or {})
+    params.pop('silhouette', None)
+    params['silhouette'] = params.pop('sweep_silhouette', 'sample')
+    scores, models = sweep_k(X, k_range, n_jobs=n_jobs, **params)
+    return {'k_scores': scores, 'k_models': models}
+
+
+def select_k_stage(k_scores, k_models):
+    print("\nK selection sweep:")
+    print(k_scores.round(3).to_string())
+
+    k = choose_k(k_scores)
+    print(f"Selected K: {k}")
+
+    kmeans = k_models[k]
+    return {'labels': kmeans.labels_, 'kmeans': kmeans, 'centroid_distances': None}
+
+
+def duration_risk_stage(df):
+    stats = fit_duration_stats(df)
+    return {'duration_risk': compute_duration_risk(df, stats).to_numpy(), 'duration_stats': stats}
+
+
+def delay_risk_stage(df):
+    stats = fit_delay_stats(df)
+    return {'delay_risk': compute_delay_risk(df, stats).to_numpy(), 'delay_stats': stats}
+
+
+def risk_stage(X, labels, centroid_distances, duration_risk, duration_stats, delay_risk, delay_stats,
+               risk_weights):
+    # Same stats and score as fit_risk_stats + compute_promotion_failure_score,
+    # with the clustering-independent components computed upstream. The
+    # centroid distances are computed once here (or by a centroid
+    # silhouette) and shared by the stats and the normalization.
+    if centroid_distances is None:
+        centroid_distances = compute_centroid_distances(X, labels)
+    stats = {**duration_stats, **delay_stats, **fit_distance_stats(X, labels, centroid_distances)}
+    stats['weights'] = dict(risk_weights)
+    cluster_risk = compute_cluster_distance_risk(X, labels, stats, distances=centroid_distances)
+
+    pfs = (
+        risk_weights['w_duration'] * duration_risk +
+        risk_weights['w_cluster'] * cluster_risk +
+        risk_weights['w_delay'] * delay_risk
+    )
+    return {'scores': np.clip(pfs, 0, 1), 'risk_stats': stats}
+
+
+# --------------------------------------------------
+# Stage graph
+# --------------------------------------------------
+def _add_model_stages(
+    dag, k, risk_weights, tfidf_params, n_components, kmeans_params, k_range, n_jobs,
+    profiler, text_mode, svd_params, text_models_path=None, embedding_cache_path=None,
+    data_key=None, verbose=False
+):
+    """
+    Adds every stage after preprocessing to dag. With a data_key, each
+    stage is keyed by it chained with its own parameters, so only stages
+    whose inputs changed are recomputed.
+
+        df ─┬─ text ─┬─ near_duplicates
+            │        └─ features ─ cluster (or k_sweep ─ select_k) ─┐
+            ├─ structural ─┘                                        │
+            ├─ duration_risk ───────────────────────────────────── risk
+            └─ delay_risk ──────────────────────────────────────────┘
+    """
+    cache = dag.cache
+    keyed = data_key is not None
+
+    # 2️⃣ Text embeddings (TF-IDF + TruncatedSVD)
+    models_digest = (
+        file_digest(text_models_path)
+        if text_models_path and os.path.exists(text_models_path) else None
+    )
+    text_key = stage_key(
+        data_key, tfidf_params, n_components, text_mode, svd_params or {}, models_digest
+    ) if keyed else None
+    dag.add(
+        'text',
+        lambda df: text_stage(
+            df, tfidf_params, n_components, n_jobs, profiler, text_mode, svd_params,
+            text_models_path, embedding_cache_path
+        ),
+        inputs=['df'], outputs=['X_svd', 'vectorizer', 'svd', 'clean_text'], key=text_key,
+        on_done=(lambda out: print(f"Text embedding shape (SVD): {out['X_svd'].shape}")) if verbose else None
+    )
+
+    # Near-duplicate index over the embeddings (LSH, see src.near_duplicates)
+    dag.add(
+        'near_duplicates', near_duplicate_stage,
+        inputs=['X_svd'], outputs=['near_duplicates'],
+        key=stage_key(text_key, 'lsh') if keyed else None
+    )
+
+    # 3️⃣ Combined feature matrix (float32, memory-mapped when cached);
+    # the structural half does not wait for the text branch
+    dag.add(
+        'structural', structural_stage,
+        inputs=['df'], outputs=['X_struct', 'scaler', 'fill_values'],
+        key=stage_key(data_key, 'structural') if keyed else None
+    )
+    feature_key = stage_key(text_key, 'features') if keyed else None
+    dag.add(
+        'features',
+        lambda X_svd, X_struct: feature_stage(
+            X_svd, X_struct, cache.scratch_path('features') if cache else None
+        ),
+        inputs=['X_svd', 'X_struct'], outputs=['feature_store'], key=feature_key,
+        on_done=(
+            lambda out: print(f"Final feature matrix shape: {out['feature_store'].matrix.shape}")
+        ) if verbose else None
+    )
+
+    # 4️⃣ Clustering (KMeans), optionally with an automatic K sweep
+    if k == 'auto':
+        cluster_key = stage_key(feature_key, 'auto', list(k_range), kmeans_params or {}) if keyed else None
+        dag.add(
+            'k_sweep',
+            lambda feature_store: k_sweep_stage(feature_store.matrix, k_range, n_jobs, kmeans_params),
+            inputs=['feature_store'], outputs=['k_scores', 'k_models'], key=cluster_key
+        )
+        dag.add(
+            'select_k', select_k_stage,
+            inputs=['k_scores', 'k_models'], outputs=['labels', 'kmeans', 'centroid_distances']
+        )
+    else:
+        cluster_key = stage_key(feature_key, k, kmeans_params or {}) if keyed else None
+        dag.add(
+            'cluster',
+            lambda df, feature_store: cluster_stage(df, feature_store.matrix, k, kmeans_params, profiler),
+            inputs=['df', 'feature_store'], outputs=['labels', 'kmeans', 'centroid_distances'], key=cluster_key
+        )
+
+    # 5️⃣ Promotion Failure Score (duration / delay risk only need the catalog)
+    dag.add(
+        'duration_risk', duration_risk_stage,
+        inputs=['df'], outputs=['duration_risk', 'duration_stats'],
+        key=stage_key(data_key, 'duration_risk') if keyed else None
+    )
+    dag.add(
+        'delay_risk', delay_risk_stage,
+        inputs=['df'], outputs=['delay_risk', 'delay_stats'],
+        key=stage_key(data_key, 'delay_risk') if keyed else None
+    )
+    dag.add(
+        'risk',
+        lambda feature_store, **components: risk_stage(feature_store.matrix, **components, risk_weights=risk_weights),
+        inputs=[
+            'feature_store', 'labels', 'centroid_distances',
+            'duration_risk', 'duration_stats', 'delay_risk', 'delay_stats'
+        ],
+        outputs=['scores', 'risk_stats'],
+        key=stage_key(cluster_key, risk_weights) if keyed else None
+    )
+    return dag
+
+
+def _results(values, dag, profiler=None):
+    df = values['df']
+    df['km_cluster'] = values['labels']
+    df['promotion_failure_score'] = values['scores']
+
+    # 6️⃣ Discovery Diversity Risk (cheap, always recomputed)
+    with profile_stage(profiler, 'diversity', len(df)):
+        diversity_report = assess_discovery_diversity_risk(df)
+
+    return {
+        'df': df,
+        'X_svd': values['X_svd'],
+        'X': values['feature_store'].matrix,
+        'feature_store': values['feature_store'],
+        'vectorizer': values['vectorizer'],
+        'svd': values['svd'],
+        'near_duplicates': values['near_duplicates'],
+        'scaler': values['scaler'],
+        'fill_values': values['fill_values'],
+        'kmeans': values['kmeans'],
+        'risk_stats': values['risk_stats'],
+        'diversity_report': diversity_report,
+        'schedule': dag.summary()
+    }
+
+
+def _catalog_rows(values):
+    # Cache hits may finish before the catalog itself is loaded
+    return len(values['df']) if 'df' in values else None
+
+
+# --------------------------------------------------
+# Entry points
+# --------------------------------------------------
+def fit_catalog(
+    df,
+    k: int = 4,
+    risk_weights: dict = None,
+    tfidf_params: dict = None,
+    n_components: int = SVD_COMPONENTS,
+    kmeans_params: dict = None,
+    k_range=K_RANGE,
+    n_jobs: int = 1,
+    profiler=None,
+    text_mode: str = 'tfidf',
+    svd_params: dict = None,
+    max_workers: int = None
+) -> dict:
+    """
+    Fits every model on an already preprocessed catalog (no caching).
+    """
+    risk_weights = {**DEFAULT_RISK_WEIGHTS, **(risk_weights or {})}
+
+    dag = _add_model_stages(
+        PipelineDAG(None, profiler, max_workers, rows=_catalog_rows),
+        k, risk_weights, tfidf_params, n_components, kmeans_params, k_range, n_jobs,
+        profiler, text_mode, svd_params
+    )
+    values = dag.run(RESULT_VALUES, given={'df': df})
+    return _results(values, dag, profiler)
+
+
+def run_pipeline(
+    data_path: str,
+    k: int = 4,
+    risk_weights: dict = None,
+    tfidf_params: dict = None,
+    n_components: int = SVD_COMPONENTS,
+    kmeans_params: dict = None,
+    k_range=K_RANGE,
+    n_jobs: int = 1,
+    cache_dir: str = None,
+    chunksize: int = LOAD_CHUNK_SIZE,
+    profiler=None,
+    text_mode: str = 'tfidf',
+    svd_params: dict = None,
+    text_models_path: str = None,
+    embedding_cache_path: str = None,
+    max_workers: int = None
+) -> dict:
+    """
+    Runs load → preprocess → text embeddings → feature matrix →
+    KMeans → promotion risk → diversity report.
+
+    Stages run as a graph (src.dag): the text branch, the structural
+    feature scaling and the duration / delay risks only need the
+    preprocessed catalog and run concurrently on max_workers threads
+    (1 = sequential). results['schedule'] holds each stage's start /
+    end offsets and marks the critical path.
+
+    k='auto' sweeps k_range with kmeans_params and keeps the
+    best-scoring fitted model (see src.k_selection), so the chosen K is
+    never refitted. Each K is scored with a sampled silhouette unless
+    kmeans_params['sweep_silhouette'] names another mode.
+
+    With cache_dir set, each stage is keyed by the hash of the input CSV
+    chained with its own parameters, so only stages whose inputs changed
+    are recomputed (e.g. new risk weights rerun the risk stage only).
+
+    text_mode='hashing' swaps the exact TF-IDF vocabulary for a hashed,
+    chunk-fitted one (bounded memory on very large catalogs). With
+    text_models_path set, the vectorizer + SVD are fitted once, saved
+    there, and later runs only transform (until the parameters change).
+    embedding_cache_path enables the per-description cache of cleaned
+    text and SVD vectors (src.embedding_cache), so a changed catalog
+    only cleans/embeds its new or edited descriptions.
+
+    results['near_duplicates'] is an LSH index over the SVD embeddings
+    for near-duplicate checks during selection and bulk reports.
+
+    With a StageProfiler (src.profiling), every stage and sub-stage is
+    timed; cache hits are recorded with cached=True.
+    """
+    cache = StageCache(cache_dir) if cache_dir else None
+    risk_weights = {**DEFAULT_RISK_WEIGHTS, **(risk_weights or {})}
+    tfidf_params = tfidf_params or TFIDF_PARAMS
+    dag = PipelineDAG(cache, profiler, max_workers, rows=_catalog_rows)
+
+    # 1️⃣ Load + preprocess
+    data_key = stage_key('preprocess', CACHE_VERSION, file_digest(data_path)) if cache else None
+
+    def _preprocess():
+        # Typed chunks are preprocessed as they stream in
+        chunks = iter_netflix_data(data_path, chunksize=chunksize)
+        if profiler is not None:
+            chunks = profiler.iterate('preprocess.load', chunks)
+        return {'df': concat_chunks(preprocess_netflix_chunks(chunks))}
+
+    dag.add(
+        'preprocess', _preprocess, outputs=['df'], key=data_key,
+        on_done=lambda out: print(f"After preprocessing: {out['df'].shape}")
+    )
+
+    # 2️⃣–5️⃣ Text / structural features, clustering, promotion risk
+    _add_model_stages(
+        dag, k, risk_weights, tfidf_params, n_components, kmeans_params, k_range, n_jobs,
+        profiler, text_mode, svd_params, text_models_path, embedding_cache_path,
+        data_key, verbose=True
+    )
+
+    values = dag.run(RESULT_VALUES)
+    return _results(values, dag, profiler)
@@ -2,40 +2,67 @@ import pandas as pd
 import numpy as np
 import re
 
+from src.data_loader import parse_date_added
+
 
 PLACEHOLDERS = ['no data', 'n/a', 'na', 'unknown', 'none', '-', 'not specified']
 
+# Columns whose placeholder values are normalized (the ones cleaned below)
+PLACEHOLDER_COLS = ['director', 'cast', 'country', 'rating', 'listed_in',
+                    'description', 'date_added', 'duration']
+
+# First run of digits and first run of letters, captured in one pass
+DURATION_PATTERN = r'^(?=\D*(?P<num>\d+))?(?=[^A-Za-z]*(?P<unit>[A-Za-z]+))?'
+
+
+def _per_unique(values: pd.Series, fn):
+    """
+    Applies a vectorized parser to the distinct values only and
+    broadcasts the result back (dates and durations repeat heavily).
+    """
+    codes, uniques = pd.factorize(values)
+    result = fn(pd.Series(uniques, dtype=values.dtype)).reindex(codes)
+    result.index = values.index
+    return result
 
-def preprocess_netflix_data(df_raw: pd.DataFrame) -> pd.DataFrame:
-    df = df_raw.copy()
+
+def preprocess_netflix_data(df_raw: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+    """
+    Cleans the raw catalog and derives duration, genre and delay features.
+    copy=False modifies df_raw in place instead of working on a copy.
+    """
+    df = df_raw.copy() if copy else df_raw
 
     # Normalize placeholders
-    df.replace(PLACEHOLDERS, pd.NA, inplace=True)
+    for col in PLACEHOLDER_COLS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].replace(PLACEHOLDERS, pd.NA)
 
     # Date handling
-    df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
+    if not pd.api.types.is_datetime64_any_dtype(df['date_added']):
+        df['date_added'] = _per_unique(df['date_added'], parse_date_added)
     df['year_added'] = df['date_added'].dt.year
 
     # Text columns
     for col in ['director', 'cast', 'country', 'rating', 'listed_in']:
-        df[col] = df[col].fillna('Unknown').astype(str).str.strip()
+        values = df[col]
+        is_categorical = isinstance(values.dtype, pd.CategoricalDtype)
+        if is_categorical:
+            values = values.astype(object)
+        df[col] = values.fillna('Unknown').astype(str).str.strip()
+        if is_categorical:
+            df[col] = df[col].astype('category')
 
     df['description'] = df['description'].fillna('').astype(str)
 
-    # Duration parsing
+    # Duration parsing (number and unit in one extract)
     df['duration'] = df['duration'].astype(str)
-    df['duration_int'] = df['duration'].str.extract(r'(\d+)', expand=False).astype(float)
-    df['duration_type'] = (
-        df['duration']
-        .str.extract(r'([A-Za-z]+)', expand=False)
-        .str.lower()
-        .fillna('')
-    )
+    parts = _per_unique(df['duration'], lambda u: u.str.extract(DURATION_PATTERN))
+    df['duration_int'] = parts['num'].astype(float)
+    df['duration_type'] = parts['unit'].str.lower().fillna('')
 
     # Genre count
-    df['num_genres'] = df['listed_in'].apply(
-        lambda x: len(str(x).split(',')) if pd.notna(x) else 0
-    )
+    df['num_genres'] = df['listed_in'].str.count(',') + 1
 
     # Delay years
     df['release_year'] = pd.to_numeric(df['release_year'], errors='coerce')
@@ -43,3 +70,13 @@ def preprocess_netflix_data(df_raw: pd.DataFrame) -> pd.DataFrame:
     df['delay_years'] = df['delay_years'].where(df['delay_years'].between(0, 50))
 
     return df
+
+
+def preprocess_netflix_chunks(chunks):
+    """
+    Preprocesses typed chunks (see data_loader.iter_netflix_data) one at
+    a time; every step is row-local, so results match a full-frame run.
+    Chunks are owned by the generator, so they are modified in place.
+    """
+    for chunk in chunks:
+        yield preprocess_netflix_data(chunk, copy=False)
@@ -0,0 +1,237 @@
+# ============================
+# STAGE PROFILING
+# ============================
+
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import psutil  # optional: current RSS where /proc is not available
+except ImportError:
+    psutil = None
+
+
+RSS_SAMPLE_INTERVAL_S = 0.01
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _cpu_seconds() -> float:
+    """CPU time of this process plus finished worker processes."""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+def _current_rss_mb():
+    """Resident set size right now, or None when it cannot be read."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / (1 << 20)
+    except (OSError, IndexError, ValueError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1 << 20)
+    return None
+
+
+class _RSSSampler:
+    """
+    Polls the current RSS on a daemon thread while any stage is open and
+    keeps, for each open stage, the highest value seen since it began.
+    Without a readable current RSS it falls back to growth of the
+    process high-water mark (ru_maxrss), which stays 0 for every stage
+    after the one that set the peak.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self._open = {}  # token -> [rss at start, highest rss seen]
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def begin(self):
+        rss = _current_rss_mb()
+        if rss is None:
+            return ('maxrss', _peak_rss_mb())
+
+        token = object()
+        with self._lock:
+            self._open[token] = [rss, rss]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll, name='rss-sampler', daemon=True)
+                self._thread.start()
+        return token
+
+    def end(self, token) -> float:
+        """The stage's own peak RSS above its starting RSS, in MB."""
+        if isinstance(token, tuple):
+            return _peak_rss_mb() - token[1]
+
+        rss = _current_rss_mb()
+        with self._lock:
+            start, peak = self._open.pop(token)
+        return max(peak, rss) - start
+
+    def _poll(self) -> None:
+        while True:
+            rss = _current_rss_mb()
+            with self._lock:
+                if not self._open:
+                    self._thread = None
+                    return
+                for sample in self._open.values():
+                    sample[1] = max(sample[1], rss)
+            time.sleep(self.interval)
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, peak RSS above the stage's starting
+    RSS (sampled every RSS_SAMPLE_INTERVAL_S) and throughput for each
+    pipeline stage. Nested stages use dotted names
+    ('text.clean'); records are appended to log_path as JSON lines.
+    With profile_path set, the whole run between start() and finish()
+    is also captured with cProfile (view with snakeviz or flameprof).
+
+    Stages may be recorded from several threads (src.dag); CPU time and
+    RSS are per process, so a stage's figures include whatever stages
+    overlapped it.
+    """
+
+    def __init__(self, log_path: str = None, profile_path: str = None):
+        self.log_path = log_path
+        self.profile_path = profile_path
+        self.run_id = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        self.records = []
+        self._cprofile = None
+        self._lock = threading.Lock()
+        self._rss = _RSSSampler()
+
+    # ---------- whole-run cProfile ----------
+    def start(self) -> "StageProfiler":
+        if self.profile_path and self._cprofile is None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        return self
+
+    def finish(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            os.makedirs(os.path.dirname(self.profile_path) or '.', exist_ok=True)
+            self._cprofile.dump_stats(self.profile_path)
+            self._cprofile = None
+
+    # ---------- per-stage records ----------
+    def _record(self, stage, wall, cpu, rss_delta, rows, cached, extra=None):
+        record = {
+            'run_id': self.run_id,
+            'stage': stage,
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'peak_rss_delta_mb': round(rss_delta, 3),
+            'rows': rows,
+            'rows_per_s': round(rows / wall, 1) if rows and wall > 0 else None,
+            'cached': cached,
+            **(extra or {})
+        }
+        with self._lock:
+            self.records.append(record)
+
+            if self.log_path:
+                os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+        return record
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None, cached: bool = False):
+        """
+        Times the enclosed block. The yielded dict can be updated with
+        'rows' (or 'cached') once they are known inside the block; any
+        other keys added to it (e.g. cache hit rates) are logged as well.
+        """
+        info = {'rows': rows, 'cached': cached}
+        wall, cpu, rss = time.perf_counter(), _cpu_seconds(), self._rss.begin()
+        try:
+            yield info
+        finally:
+            self._record(
+                name,
+                time.perf_counter() - wall,
+                _cpu_seconds() - cpu,
+                self._rss.end(rss),
+                info['rows'],
+                info['cached'],
+                {k: v for k, v in info.items() if k not in ('rows', 'cached')}
+            )
+
+    def iterate(self, name: str, iterable):
+        """
+        Yields from iterable, recording only the time spent producing
+        items (e.g. reading chunks) and the total rows they contain.
+        """
+        wall = cpu = 0.0
+        rows = 0
+        rss = self._rss.begin()
+        iterator = iter(iterable)
+        try:
+            while True:
+                t0, c0 = time.perf_counter(), _cpu_seconds()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    wall += time.perf_counter() - t0
+                    cpu += _cpu_seconds() - c0
+                rows += len(item)
+                yield item
+        except GeneratorExit:
+            self._rss.end(rss)  # abandoned early: stop sampling, record nothing
+            raise
+        self._record(name, wall, cpu, self._rss.end(rss), rows, False)
+
+    def summary(self) -> pd.DataFrame:
+        if not self.records:
+            return pd.DataFrame()
+        return (
+            pd.DataFrame(self.records)
+            .drop(columns='run_id')
+            .set_index('stage')
+        )
+
+    def report(self) -> None:
+        print("\nStage timings:")
+        print(self.summary().to_string())
+
+
+def profile_stage(profiler, name: str, rows: int = None, cached: bool = False):
+    """profiler.stage(...), or a no-op context when profiling is off."""
+    if profiler is None:
+        return nullcontext({'rows': rows, 'cached': cached})
+    return profiler.stage(name, rows, cached)
+
@@ -1,23 +1,28 @@
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
 
 
 # --------------------------------------------------
 # A) Duration Risk
 # --------------------------------------------------
-def compute_duration_risk(df: pd.DataFrame) -> np.ndarray:
+def compute_duration_risk(df: pd.DataFrame, stats: dict = None) -> np.ndarray:
     """
     Longer content implies higher commitment and higher promotion risk.
     Movies are penalized more than TV shows.
+    Pass stats (see fit_risk_stats) to normalize against a fitted catalog.
     """
     duration = df['duration_int'].copy()
 
     # fill missing with median
-    duration.fillna(duration.median(), inplace=True)
+    median = stats['duration_median'] if stats else duration.median()
+    duration.fillna(median, inplace=True)
 
     # normalize duration
-    duration_norm = (duration - duration.min()) / (duration.max() - duration.min())
+    if stats:
+        d_min, d_max = stats['duration_min'], stats['duration_max']
+    else:
+        d_min, d_max = duration.min(), duration.max()
+    duration_norm = (duration - d_min) / (d_max - d_min)
 
     # movie penalty
     is_movie = (df['duration_type'] == 'min').astype(int)
@@ -30,39 +35,197 @@ def compute_duration_risk(df: pd.DataFrame) -> np.ndarray:
 # --------------------------------------------------
 # B) Cluster Atypicality Risk
 # --------------------------------------------------
-def compute_cluster_distance_risk(X: np.ndarray, labels: np.ndarray) -> np.ndarray:
+DISTANCE_CHUNK_SIZE = 65_536
+
+
+def cluster_centroids(
+    X: np.ndarray,
+    labels: np.ndarray,
+    chunk_size: int = DISTANCE_CHUNK_SIZE
+):
+    """
+    Returns (cluster labels, centroid matrix) using member means,
+    accumulated in one chunked np.add.at pass (no per-cluster copies).
+    """
+    uniq, inverse = np.unique(labels, return_inverse=True)
+    sums = np.zeros((len(uniq), X.shape[1]))
+
+    for start in range(0, len(X), chunk_size):
+        np.add.at(sums, inverse[start:start + chunk_size], X[start:start + chunk_size])
+
+    counts = np.bincount(inverse, minlength=len(uniq))
+    return uniq, sums / counts[:, None]
+
+
+def compute_centroid_distances(
+    X: np.ndarray,
+    labels: np.ndarray,
+    centroid_labels: np.ndarray = None,
+    centroids: np.ndarray = None,
+    dtype=np.float64,
+    chunk_size: int = DISTANCE_CHUNK_SIZE
+) -> np.ndarray:
+    """
+    Euclidean distance of every point to its cluster centroid.
+    Centroids are computed from members unless given. Rows are processed
+    in chunks, so temporaries stay bounded at chunk_size x n_features.
+    """
+    if centroids is None:
+        centroid_labels, centroids = cluster_centroids(X, labels, chunk_size)
+
+    centroids = np.asarray(centroids, dtype=dtype)
+    owner = np.searchsorted(centroid_labels, labels)
+    distances = np.empty(len(X), dtype=dtype)
+
+    for start in range(0, len(X), chunk_size):
+        stop = start + chunk_size
+        diff = np.asarray(X[start:stop], dtype=dtype) - centroids[owner[start:stop]]
+        distances[start:stop] = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+
+    return distances
+
+
+def normalize_distances(distances: np.ndarray, d_min: float, d_max: float) -> np.ndarray:
+    """
+    Min-max scales centroid distances; all zeros when every distance is
+    equal (as MinMaxScaler did), instead of 0 / 0.
+    """
+    span = d_max - d_min
+    if span > 0:
+        return (distances - d_min) / span
+    return np.zeros(len(distances), dtype=distances.dtype)
+
+
+def compute_cluster_distance_risk(
+    X: np.ndarray,
+    labels: np.ndarray,
+    stats: dict = None,
+    centers: np.ndarray = None,
+    dtype=np.float64,
+    chunk_size: int = DISTANCE_CHUNK_SIZE,
+    distances: np.ndarray = None
+) -> np.ndarray:
     """
     Measures how far a point is from its cluster centroid.
     Farther = more atypical = higher risk.
+    centers may be a fitted kmeans.cluster_centers_ (labels 0..k-1) to
+    skip recomputing centroids; dtype=np.float32 halves working memory.
+    With stats, distances may be the per-point distances to
+    stats['centroids'] when they were already computed.
     """
-    distances = np.zeros(len(X))
+    if stats:
+        if distances is None:
+            distances = compute_centroid_distances(
+                X, labels, stats['centroid_labels'], stats['centroids'], dtype, chunk_size
+            )
+        return np.clip(normalize_distances(distances, stats['distance_min'], stats['distance_max']), 0, 1)
 
-    for c in np.unique(labels):
-        idx = np.where(labels == c)[0]
-        centroid = X[idx].mean(axis=0)
-        distances[idx] = np.linalg.norm(X[idx] - centroid, axis=1)
+    centroid_labels = None if centers is None else np.arange(len(centers))
+    distances = compute_centroid_distances(
+        X, labels, centroid_labels, centers, dtype, chunk_size
+    )
 
     # normalize distances
-    scaler = MinMaxScaler()
-    distance_risk = scaler.fit_transform(distances.reshape(-1, 1)).flatten()
-
-    return distance_risk
+    return normalize_distances(distances, distances.min(), distances.max())
 
 
 # --------------------------------------------------
 # C) Delay Risk
 # --------------------------------------------------
-def compute_delay_risk(df: pd.DataFrame) -> np.ndarray:
+def compute_delay_risk(df: pd.DataFrame, stats: dict = None) -> np.ndarray:
     """
     Larger gap between release and platform addition increases promotion risk.
     """
     delay = df['delay_years'].copy()
-    delay.fillna(delay.median(), inplace=True)
+    median = stats['delay_median'] if stats else delay.median()
+    delay.fillna(median, inplace=True)
+
+    if stats:
+        d_min, d_max = stats['delay_min'], stats['delay_max']
+    else:
+        d_min, d_max = delay.min(), delay.max()
 
-    delay_norm = (delay - delay.min()) / (delay.max() - delay.min())
+    delay_norm = (delay - d_min) / (d_max - d_min)
     return delay_norm.clip(0, 1)
 
 
+# --------------------------------------------------
+# NORMALIZATION STATISTICS
+# --------------------------------------------------
+def fit_duration_stats(df: pd.DataFrame) -> dict:
+    duration = df['duration_int'].fillna(df['duration_int'].median())
+    return {
+        'duration_median': df['duration_int'].median(),
+        'duration_min': duration.min(),
+        'duration_max': duration.max()
+    }
+
+
+def fit_delay_stats(df: pd.DataFrame) -> dict:
+    delay = df['delay_years'].fillna(df['delay_years'].median())
+    return {
+        'delay_median': df['delay_years'].median(),
+        'delay_min': delay.min(),
+        'delay_max': delay.max()
+    }
+
+
+def fit_distance_stats(X: np.ndarray, labels: np.ndarray, distances: np.ndarray = None) -> dict:
+    """
+    distances may be the per-point distances to the member centroids
+    (compute_centroid_distances) when they were already computed.
+    """
+    centroid_labels, centroids = cluster_centroids(X, labels)
+    if distances is None:
+        distances = compute_centroid_distances(X, labels, centroid_labels, centroids)
+    return {
+        'centroid_labels': centroid_labels,
+        'centroids': centroids,
+        'distance_min': distances.min(),
+        'distance_max': distances.max(),
+        'distance_p95': np.percentile(distances, 95)
+    }
+
+
+def fit_risk_stats(df: pd.DataFrame, X: np.ndarray, labels: np.ndarray) -> dict:
+    """
+    Captures the medians, ranges and centroids used to normalize the
+    risk components, so titles added later are scored on the same scale.
+    The three parts can also be fitted separately (duration and delay
+    do not depend on the clustering).
+    """
+    return {**fit_duration_stats(df), **fit_delay_stats(df), **fit_distance_stats(X, labels)}
+
+
+# --------------------------------------------------
+# COMPONENT MATRIX
+# --------------------------------------------------
+# Weight name of each column of compute_risk_components
+RISK_COMPONENTS = ['w_duration', 'w_cluster', 'w_delay']
+DEFAULT_RISK_WEIGHTS = {'w_duration': 0.4, 'w_cluster': 0.4, 'w_delay': 0.2}
+
+
+def compute_risk_components(
+    df: pd.DataFrame,
+    X: np.ndarray,
+    cluster_col: str = 'km_cluster',
+    stats: dict = None,
+    centers: np.ndarray = None,
+    dtype=np.float64,
+    chunk_size: int = DISTANCE_CHUNK_SIZE
+) -> np.ndarray:
+    """
+    Duration, cluster atypicality and delay risk as an (n, 3) matrix
+    (columns in RISK_COMPONENTS order), so many weightings can be scored
+    with one matrix product (see src.risk_sweep).
+    """
+    return np.column_stack([
+        np.asarray(compute_duration_risk(df, stats), dtype=np.float64),
+        compute_cluster_distance_risk(X, df[cluster_col].values, stats, centers, dtype, chunk_size),
+        np.asarray(compute_delay_risk(df, stats), dtype=np.float64)
+    ])
+
+
 # --------------------------------------------------
 # FINAL PROMOTION FAILURE SCORE
 # --------------------------------------------------
@@ -72,16 +235,22 @@ def compute_promotion_failure_score(
     cluster_col: str = 'km_cluster',
     w_duration: float = 0.4,
     w_cluster: float = 0.4,
-    w_delay: float = 0.2
+    w_delay: float = 0.2,
+    stats: dict = None,
+    centers: np.ndarray = None,
+    dtype=np.float64,
+    chunk_size: int = DISTANCE_CHUNK_SIZE
 ) -> pd.DataFrame:
     """
     Combines duration risk, cluster atypicality risk, and delay risk
     into a single Promotion Failure Score.
     """
 
-    duration_risk = compute_duration_risk(df)
-    cluster_risk = compute_cluster_distance_risk(X, df[cluster_col].values)
-    delay_risk = compute_delay_risk(df)
+    duration_risk = compute_duration_risk(df, stats)
+    cluster_risk = compute_cluster_distance_risk(
+        X, df[cluster_col].values, stats, centers, dtype, chunk_size
+    )
+    delay_risk = compute_delay_risk(df, stats)
 
     pfs = (
         w_duration * duration_risk +
@@ -0,0 +1,102 @@
+# ============================
+# MERGEABLE QUANTILE SKETCH
+# ============================
+
+import numpy as np
+
+
+SKETCH_K = 256  # top compactor size; rank error shrinks roughly as 1/k
+
+
+class QuantileSketch:
+    """
+    KLL-style quantile sketch: bounded memory, mergeable across chunks
+    and processes, with exact min / max / count.
+
+    Values enter level 0; when a level outgrows its capacity it is
+    sorted and every other item (random offset) moves up a level with
+    twice the weight. Level capacities shrink geometrically (factor 2/3)
+    below the top, so the sketch holds about 3k values. Until the first
+    compaction (fewer than ~k values) quantiles are exact and linearly
+    interpolated like pandas / np.quantile; afterwards the two middle
+    weighted values are averaged when q·n falls exactly between them.
+    """
+
+    def __init__(self, k: int = SKETCH_K, seed: int = 0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+
+            items = np.sort(items)
+            odd = len(items) % 2
+            promoted = items[odd:][self._rng.integers(2)::2]
+            self.levels[level] = items[:odd]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level = 0  # capacities shift when a level is added
+
+    def update(self, values):
+        """
+        Adds an array of values (NaN ignored).
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other: 'QuantileSketch'):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return np.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        values = np.concatenate(self.levels)
+        if all(len(items) == 0 for items in self.levels[1:]):
+            return float(np.quantile(values, q))  # nothing compacted yet
+
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+        target = q * cumulative[-1]
+        pos = min(np.searchsorted(cumulative, target), len(values) - 1)
+        if pos + 1 < len(values) and cumulative[pos] == target:
+            return float((values[pos] + values[pos + 1]) / 2)
+        return float(values[pos])
+
+    def median(self) -> float:
+        return self.quantile(0.5)
@@ -0,0 +1,186 @@
+# ============================
+# RISK-WEIGHT SWEEP
+# ============================
+# Scores the catalog under many (w_duration, w_cluster, w_delay) weight
+# vectors at once from the (n, 3) risk component matrix, and measures
+# how stable the top-N titles are against the default weighting.
+
+import numpy as np
+import pandas as pd
+
+from src.promotion_risk import RISK_COMPONENTS, DEFAULT_RISK_WEIGHTS
+
+
+# Scores held in memory per block (rows × weight vectors), 32 MB as float64
+SWEEP_BLOCK_CELLS = 1 << 22
+
+
+def weight_grid(step: float = 0.05) -> np.ndarray:
+    """
+    Every non-negative weight vector summing to 1 on a `step` lattice,
+    as an (m, 3) array in RISK_COMPONENTS order.
+    """
+    n = int(round(1 / step))
+    i, j = np.meshgrid(np.arange(n + 1), np.arange(n + 1), indexing='ij')
+    keep = i + j <= n
+    i, j = i[keep], j[keep]
+    return np.column_stack([i, j, n - i - j]) / n
+
+
+def _weight_matrix(weights) -> np.ndarray:
+    """
+    (m, 3) array from a weight dict, a frame with RISK_COMPONENTS
+    columns, or an array-like of weight vectors.
+    """
+    if isinstance(weights, dict):
+        return np.array([[weights[name] for name in RISK_COMPONENTS]], dtype=np.float64)
+    if isinstance(weights, pd.DataFrame):
+        return weights[RISK_COMPONENTS].to_numpy(dtype=np.float64)
+    return np.atleast_2d(np.asarray(weights, dtype=np.float64))
+
+
+def score_weights(components: np.ndarray, weights) -> np.ndarray:
+    """
+    Promotion Failure Scores, shape (n, m), for each weight vector.
+    """
+    return np.clip(np.asarray(components, dtype=np.float64) @ _weight_matrix(weights).T, 0, 1)
+
+
+def top_n_positions(
+    components: np.ndarray,
+    weights,
+    top_n: int = 10,
+    ascending: bool = False,
+    block_cells: int = SWEEP_BLOCK_CELLS
+) -> np.ndarray:
+    """
+    Row positions of the top_n highest-scoring titles (lowest with
+    ascending=True) for every weight vector, as an (m, top_n) array
+    ordered by score.
+
+    Rows are scored block by block (one matrix product per block). The
+    first block seeds the running top_n via a partition; later blocks
+    only merge the scores that beat each weight vector's current N-th
+    best, so memory stays proportional to block_cells whatever the
+    catalog size. With non-negative weights, rows whose largest (or
+    smallest) component cannot beat any current cut-off are skipped
+    before the product. Equal scores go to the earlier row; scores that
+    only differ by float rounding may order differently from a full
+    sort of separately computed scores.
+    """
+    W = _weight_matrix(weights)
+    n, m = len(components), len(W)
+    top_n = min(top_n, n)
+    rows = max(top_n, block_cells // max(m, 1))
+
+    # Keys are scores (negated for highest-first), laid out (weight, row);
+    # clipping is monotone, so only candidates need clipping
+    signed = W if ascending else -W
+    lo, hi = (0.0, 1.0) if ascending else (-1.0, 0.0)
+
+    block = np.asarray(components[:rows], dtype=np.float64)
+    keys = np.clip(signed @ block.T, lo, hi)
+    keys[np.isnan(keys)] = np.inf  # missing scores rank last
+
+    # Seed: rows below each N-th key, then the earliest rows equal to it
+    kth = np.partition(keys, top_n - 1, axis=1)[:, top_n - 1:top_n]
+    below = keys < kth
+    ties = keys == kth
+    ties &= np.cumsum(ties, axis=1) <= top_n - below.sum(axis=1, keepdims=True)
+    idx = np.nonzero(below | ties)[1].reshape(m, top_n)
+    best_keys = np.take_along_axis(keys, idx, axis=1)
+    order = np.lexsort((idx, best_keys))
+    best_pos = np.take_along_axis(idx, order, axis=1)
+    best_keys = np.take_along_axis(best_keys, order, axis=1)
+
+    # With non-negative weights a row scores between sum(w)·min(c) and
+    # sum(w)·max(c), which rules most rows out before the product
+    w_sums = W.sum(axis=1)
+    bounded = (W >= 0).all() and (w_sums > 0).all()
+
+    owners = np.repeat(np.arange(m), top_n)
+    for start in range(rows, n, rows):
+        block = np.asarray(components[start:start + rows], dtype=np.float64)
+        rows_in = None
+        if bounded:
+            if ascending:
+                rows_in = np.flatnonzero(block.min(axis=1) < (best_keys[:, -1] / w_sums).max())
+            else:
+                rows_in = np.flatnonzero(block.max(axis=1) > (-best_keys[:, -1] / w_sums).min())
+            if not len(rows_in):
+                continue
+            block = block[rows_in]
+
+        keys = signed @ block.T
+        w, r = np.nonzero(keys < best_keys[:, -1:])
+        if not len(w):
+            continue
+        candidates = np.clip(keys[w, r], lo, hi)
+        if rows_in is not None:
+            r = rows_in[r]
+
+        # Merge candidates into each weight vector's sorted top_n
+        all_w = np.concatenate([owners, w])
+        all_keys = np.concatenate([best_keys.ravel(), candidates])
+        all_pos = np.concatenate([best_pos.ravel(), start + r])
+        order = np.lexsort((all_pos, all_keys, all_w))
+        group_start = np.searchsorted(all_w[order], np.arange(m))
+        rank = np.arange(len(order)) - np.repeat(group_start, np.bincount(all_w, minlength=m))
+        keep = order[rank < top_n]
+        best_keys = all_keys[keep].reshape(m, top_n)
+        best_pos = all_pos[keep].reshape(m, top_n)
+
+    return best_pos
+
+
+def kendall_tau(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Kendall's tau-b of two score vectors, from all pairs (meant for the
+    few dozen titles of two top-N sets; NaN if either is constant).
+    """
+    iu = np.triu_indices(len(a), 1)
+    da = np.sign(a[:, None] - a[None, :])[iu]
+    db = np.sign(b[:, None] - b[None, :])[iu]
+    n_a, n_b = np.count_nonzero(da), np.count_nonzero(db)
+    if not n_a or not n_b:
+        return np.nan
+    return float((da * db).sum() / np.sqrt(n_a * n_b))
+
+
+def sweep_risk_weights(
+    components: np.ndarray,
+    weights,
+    top_n: int = 10,
+    default_weights: dict = None,
+    ascending: bool = False,
+    block_cells: int = SWEEP_BLOCK_CELLS
+):
+    """
+    Ranking stability of many weightings against the default.
+
+    Returns (frame, top) where top is the (m, top_n) array from
+    top_n_positions and frame has one row per weight vector with its
+    weights, the Jaccard overlap of its top-N set with the default one,
+    and Kendall's tau between the two weightings' scores over the union
+    of both top-N sets.
+    """
+    W = _weight_matrix(weights)
+    default = _weight_matrix({**DEFAULT_RISK_WEIGHTS, **(default_weights or {})})
+
+    top = top_n_positions(components, np.vstack([default, W]), top_n, ascending, block_cells)
+    base, top = top[0], top[1:]
+    k = top.shape[1]
+
+    overlap = np.isin(top, base).sum(axis=1)
+    jaccard = overlap / (2 * k - overlap)
+
+    taus = np.empty(len(W))
+    for i, row in enumerate(top):
+        union = np.union1d(base, row)
+        scores = score_weights(components[union], np.vstack([default, W[i]]))
+        taus[i] = kendall_tau(scores[:, 0], scores[:, 1])
+
+    frame = pd.DataFrame(W, columns=RISK_COMPONENTS)
+    frame['jaccard'] = jaccard
+    frame['kendall_tau'] = taus
+    return frame, top
@@ -0,0 +1,357 @@
+# ============================
+# SCORING & SELECTION SERVICE
+# ============================
+# Asyncio HTTP/1.1 service over the published artifacts (see main.py).
+# Models and the scored catalog are loaded once at startup.
+#
+#   python -m src.service --artifacts artifacts --port 8080
+#
+# Endpoints (JSON in / JSON out):
+#   GET  /health
+#   GET  /diversity                 current diversity report
+#   GET  /metrics                   p50/p99 latency per endpoint, batch sizes
+#   POST /score   {"titles": [...]} cluster + promotion failure score
+#   POST /assign  {"titles": [...]} cluster only
+#   POST /select  {"max_items", "risk_threshold", "exploration_bias", "clusters",
+#                  "dedupe", "max_similarity"}  dedupe skips near-duplicate titles
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from http import HTTPStatus
+
+import numpy as np
+import pandas as pd
+
+from src.nltk_setup import setup_nltk
+from src.text_features import warm_up_nlp
+from src.preprocessing import preprocess_netflix_data
+from src.promotion_risk import compute_promotion_failure_score
+from src.diversity_metrics import assess_discovery_diversity_risk
+from src.hybrid_decision_engine import SelectionIndex
+from src.incremental import embed_new_titles
+from src.artifacts import load_artifacts
+
+
+RAW_COLUMNS = ['show_id', 'type', 'title', 'director', 'cast', 'country', 'date_added',
+               'release_year', 'rating', 'duration', 'listed_in', 'description']
+SELECTION_COLUMNS = ['show_id', 'title', 'type', 'km_cluster', 'promotion_failure_score']
+
+MAX_BATCH = 64
+MAX_WAIT_MS = 5.0
+LATENCY_WINDOW = 10_000
+
+
+# --------------------------------------------------
+# Metrics
+# --------------------------------------------------
+class LatencyMetrics:
+    """
+    Rolling per-endpoint latencies (last LATENCY_WINDOW requests).
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self.latencies = {}
+        self.counts = {}
+
+    def record(self, route: str, seconds: float) -> None:
+        self.latencies.setdefault(route, deque(maxlen=self.window)).append(seconds * 1000)
+        self.counts[route] = self.counts.get(route, 0) + 1
+
+    def snapshot(self) -> dict:
+        out = {}
+        for route, values in self.latencies.items():
+            arr = np.fromiter(values, dtype=float)
+            out[route] = {
+                'count': self.counts[route],
+                'p50_ms': round(float(np.percentile(arr, 50)), 3),
+                'p99_ms': round(float(np.percentile(arr, 99)), 3),
+                'mean_ms': round(float(arr.mean()), 3)
+            }
+        return out
+
+
+# --------------------------------------------------
+# Request batching
+# --------------------------------------------------
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into one call of fn(records), flushing
+    at max_batch records or after max_wait_ms, whichever comes first.
+    fn runs in the default thread pool so the event loop stays responsive.
+    If a merged batch fails, its requests are rerun one by one so the
+    error only reaches the request that caused it.
+    """
+
+    def __init__(self, fn, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+
+    async def submit(self, records: list) -> list:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((records, future))
+        return await future
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            records = [r for batch, _ in pending for r in batch]
+            self.batch_sizes.append(len(records))
+            try:
+                results = await loop.run_in_executor(None, self.fn, records)
+            except Exception as exc:
+                if len(pending) == 1:
+                    _resolve(pending[0][1], error=exc)
+                else:
+                    await self._run_each(pending)
+                continue
+
+            start = 0
+            for batch, future in pending:
+                _resolve(future, results[start:start + len(batch)])
+                start += len(batch)
+
+    async def _run_each(self, pending: list) -> None:
+        # A merged batch failed: rerun every request on its own, so one
+        # client's bad records only fail that client's request
+        loop = asyncio.get_running_loop()
+        for batch, future in pending:
+            try:
+                _resolve(future, await loop.run_in_executor(None, self.fn, batch))
+            except Exception as exc:
+                _resolve(future, error=exc)
+
+
+def _resolve(future, result=None, error: Exception = None) -> None:
+    if future.done():  # the client went away
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+# --------------------------------------------------
+# Service
+# --------------------------------------------------
+class ScoringService:
+    """
+    Warm models + scored catalog, with the HTTP routes on top.
+    """
+
+    def __init__(self, artifact_dir: str, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        artifacts = load_artifacts(artifact_dir, mmap_mode='r')
+        self.models = artifacts
+        self.catalog = artifacts['df']
+        self.risk_stats = artifacts['risk_stats']
+        self.diversity_report = assess_discovery_diversity_risk(self.catalog)
+        self.index = SelectionIndex(self.catalog)
+
+        self.metrics = LatencyMetrics()
+        self.score_batcher = MicroBatcher(self.score_records, max_batch, max_wait_ms)
+        self.assign_batcher = MicroBatcher(self.assign_records, max_batch, max_wait_ms)
+
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/diversity'): self.diversity,
+            ('GET', '/metrics'): self.metrics_report,
+            ('POST', '/score'): self.score,
+            ('POST', '/assign'): self.assign,
+            ('POST', '/select'): self.select
+        }
+
+    # ----------------------------
+    # Model calls (sync, batched)
+    # ----------------------------
+    def _prepare(self, records: list):
+        raw = pd.DataFrame.from_records(records).reindex(columns=RAW_COLUMNS)
+        df = preprocess_netflix_data(raw, copy=False)
+        X = embed_new_titles(df, self.models)
+        df['km_cluster'] = self.models['kmeans'].predict(X)
+        return df, X
+
+    def assign_records(self, records: list) -> list:
+        df, _ = self._prepare(records)
+        return [{'cluster': int(c)} for c in df['km_cluster']]
+
+    def score_records(self, records: list) -> list:
+        df, X = self._prepare(records)
+        df = compute_promotion_failure_score(
+            df, X, stats=self.risk_stats, **self.risk_stats['weights']
+        )
+        return [
+            {'cluster': int(c), 'promotion_failure_score': None if pd.isna(s) else float(s)}
+            for c, s in zip(df['km_cluster'], df['promotion_failure_score'])
+        ]
+
+    # ----------------------------
+    # Routes
+    # ----------------------------
+    async def health(self, _):
+        return 200, {'status': 'ok', 'catalog_size': len(self.catalog)}
+
+    async def diversity(self, _):
+        report = self.diversity_report
+        return 200, {
+            'cluster_distribution': {str(k): float(v) for k, v in report['cluster_distribution'].items()},
+            'entropy': float(report['entropy']),
+            'top1_dominance': float(report['top1_dominance']),
+            'top2_dominance': float(report['top2_dominance']),
+            'diversity_risk': report['diversity_risk']
+        }
+
+    async def metrics_report(self, _):
+        sizes = np.fromiter(self.score_batcher.batch_sizes, dtype=float)
+        return 200, {
+            'latency': self.metrics.snapshot(),
+            'score_batches': len(sizes),
+            'mean_score_batch_size': float(sizes.mean()) if len(sizes) else 0.0
+        }
+
+    async def score(self, body):
+        return 200, {'results': await self.score_batcher.submit(_titles(body))}
+
+    async def assign(self, body):
+        return 200, {'results': await self.assign_batcher.submit(_titles(body))}
+
+    async def select(self, body):
+        params = {k: body[k] for k in ('max_items', 'risk_threshold', 'exploration_bias', 'clusters') if k in body}
+        if body.get('dedupe'):
+            index = self.models.get('near_duplicates')
+            if index is None:
+                raise ValueError("artifacts have no near-duplicate index; rerun the pipeline")
+            params['near_duplicates'] = index
+            params['max_similarity'] = body.get('max_similarity')
+        slate = self.index.select(self.diversity_report, **params)
+        columns = [c for c in SELECTION_COLUMNS if c in slate.columns]
+        return 200, {'selection': json.loads(slate[columns].to_json(orient='records'))}
+
+    # ----------------------------
+    # HTTP
+    # ----------------------------
+    async def dispatch(self, method: str, path: str, body: bytes):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            return 404, {'error': f'no route for {method} {path}'}
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {'error': 'invalid JSON body'}
+        try:
+            return await handler(payload)
+        except (KeyError, TypeError, ValueError) as exc:
+            return 400, {'error': str(exc)}
+        except Exception as exc:  # never leave the client without a response
+            print(f"[service] {method} {path} failed: {exc!r}")
+            return 500, {'error': f'internal error: {type(exc).__name__}'}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get('content-length') or 0))
+                path = target.split('?', 1)[0]
+
+                start = time.perf_counter()
+                status, payload = await self.dispatch(method, path, body)
+                self.metrics.record(path, time.perf_counter() - start)
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ValueError as exc:
+            # Malformed request line, bad Content-Length or a line over the
+            # reader's limit: answer before closing
+            try:
+                await self._respond(writer, 400, {'error': f'bad request: {exc}'}, keep_alive=False)
+            except ConnectionError:
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+            + data
+        )
+        await writer.drain()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8080) -> None:
+        batchers = [
+            asyncio.create_task(self.score_batcher.run()),
+            asyncio.create_task(self.assign_batcher.run())
+        ]
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving {len(self.catalog)} titles on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in batchers:
+                task.cancel()
+
+
+def _titles(body) -> list:
+    titles = body.get('titles', [body]) if isinstance(body, dict) else body
+    if not isinstance(titles, list) or not titles:
+        raise ValueError("expected a non-empty 'titles' list")
+    return titles
+
+
+# ----------------------------
+# ENTRY POINT
+# ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve promotion risk scoring and selection.")
+    parser.add_argument("--artifacts", default="artifacts")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    setup_nltk()
+    warm_up_nlp()
+    service = ScoringService(args.artifacts, args.max_batch, args.max_wait_ms)
+    asyncio.run(service.serve(args.host, args.port))
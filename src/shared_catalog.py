@@ -0,0 +1,132 @@
+# ============================
+# SHARED READ-ONLY CATALOG
+# ============================
+# One process-wide, read-only view of the published artifacts (see
+# src.artifacts.save_artifacts) for long-running readers such as the
+# Streamlit panel: the scored catalog is loaded once, the feature matrix
+# and near-duplicate index are memory-mapped, and the derived objects
+# (diversity report, risk components, selection index) are built once
+# per artifact set instead of once per session.
+#
+# A background thread polls the manifest's created_at and swaps in a
+# new snapshot when main.py publishes a newer artifact set; readers that
+# still hold the old snapshot keep using it (its memory maps stay valid
+# after save_artifacts removes the old directory).
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from src.artifacts import load_artifacts
+from src.stage_cache import read_manifest, MANIFEST
+from src.promotion_risk import compute_risk_components
+from src.diversity_metrics import assess_discovery_diversity_risk
+from src.hybrid_decision_engine import SelectionIndex
+
+
+REFRESH_INTERVAL_S = 30.0
+
+
+def _read_only(array):
+    if isinstance(array, np.ndarray):
+        array.flags.writeable = False
+    return array
+
+
+class CatalogSnapshot:
+    """
+    One published artifact set and everything derived from it. Shared
+    by every reader: arrays are read-only (X is a read-only memory map)
+    and the catalog frame must not be modified in place (use .assign()
+    or a copy).
+    """
+
+    def __init__(self, artifact_dir: str, artifacts: dict, created_at: float):
+        self.artifact_dir = artifact_dir
+        self.created_at = created_at
+        self.df = artifacts['df']
+        self.X = artifacts['X']
+        self.near_duplicates = artifacts.get('near_duplicates')
+        self.models = artifacts
+        self.risk_stats = artifacts['risk_stats']
+        self.stage_timings = artifacts.get('stage_timings')
+        self.schedule = artifacts.get('schedule')
+
+        self.diversity_report = assess_discovery_diversity_risk(self.df)
+        self.risk_components = _read_only(
+            compute_risk_components(self.df, self.X, stats=self.risk_stats)
+        )
+        self.selection_index = SelectionIndex(self.df)
+
+    @classmethod
+    def load(cls, artifact_dir: str):
+        """
+        Loads the current artifact set. Raises OSError if main.py
+        published a newer set while it was being read.
+        """
+        created_at = read_manifest(artifact_dir).get('created_at')
+        artifacts = load_artifacts(artifact_dir, mmap_mode='r')
+        if read_manifest(artifact_dir).get('created_at') != created_at:
+            raise OSError(f"artifacts in {artifact_dir} changed while loading")
+        return cls(artifact_dir, artifacts, created_at)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+
+class SharedCatalog:
+    """
+    Holds the current CatalogSnapshot of artifact_dir. snapshot is
+    swapped atomically, so a reader that takes it once per request sees
+    one consistent artifact set. start() begins polling for newer
+    artifacts every refresh_interval seconds on a daemon thread.
+    """
+
+    def __init__(self, artifact_dir: str, refresh_interval: float = REFRESH_INTERVAL_S):
+        self.artifact_dir = artifact_dir
+        self.refresh_interval = refresh_interval
+        self.snapshot = CatalogSnapshot.load(artifact_dir)
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _published_at(self):
+        path = os.path.join(self.artifact_dir, MANIFEST)
+        if not os.path.exists(path):
+            return None
+        return read_manifest(self.artifact_dir).get('created_at')
+
+    def refresh(self) -> bool:
+        """
+        Loads the published artifacts if they are newer than the current
+        snapshot. Returns True when the snapshot was replaced.
+        """
+        created_at = self._published_at()
+        if created_at is None or created_at == self.snapshot.created_at:
+            return False
+
+        self.snapshot = CatalogSnapshot.load(self.artifact_dir)
+        print(f"[catalog] loaded artifacts published at {time.ctime(self.snapshot.created_at)}")
+        return True
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except (OSError, ValueError) as exc:  # mid-publish; retried next interval
+                self.last_error = exc
+
+    def start(self) -> "SharedCatalog":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll, name='catalog-refresh', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.feature_store import FeatureStore
+from src.near_duplicates import NearDuplicateIndex
+
+
+# --------------------------------------------------
+# Keys
+# --------------------------------------------------
+def file_digest(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA-256 of a file's contents, read in chunks.
+    """
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def stage_key(*parts) -> str:
+    """
+    Stable hash of stage inputs (parent keys and parameters).
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+# --------------------------------------------------
+# Artifact directories
+# --------------------------------------------------
+MANIFEST = 'manifest.json'
+
+
+def write_artifact_dir(path: str, artifacts: dict, meta: dict = None) -> None:
+    """
+    Writes artifacts into a fresh directory: DataFrames as Parquet,
+    arrays as .npy, file-backed feature stores are moved in, near-duplicate
+    indexes get a directory of .npy files, and anything else (fitted
+    sklearn models) is written with joblib.
+    The manifest is written last, so a directory without one is incomplete.
+    """
+    os.makedirs(path)
+
+    kinds = {}
+    for name, obj in artifacts.items():
+        fp = os.path.join(path, name)
+        if isinstance(obj, pd.DataFrame):
+            obj.to_parquet(fp + '.parquet')
+            kinds[name] = 'parquet'
+        elif isinstance(obj, np.ndarray):
+            np.save(fp + '.npy', obj)
+            kinds[name] = 'npy'
+        elif isinstance(obj, FeatureStore) and obj.path is not None:
+            obj.move(fp + '.store')
+            kinds[name] = 'feature_store'
+        elif isinstance(obj, NearDuplicateIndex):
+            obj.save(fp + '.lsh')
+            kinds[name] = 'near_duplicates'
+        else:
+            joblib.dump(obj, fp + '.joblib')
+            kinds[name] = 'joblib'
+
+    with open(os.path.join(path, MANIFEST), 'w') as f:
+        json.dump({**(meta or {}), 'artifacts': kinds}, f)
+
+
+def read_manifest(path: str) -> dict:
+    with open(os.path.join(path, MANIFEST)) as f:
+        return json.load(f)
+
+
+def read_artifact_dir(path: str, mmap_mode: str = None, names=None) -> dict:
+    """
+    Loads every artifact listed in a directory's manifest (or only names).
+    """
+    artifacts = {}
+    for name, kind in read_manifest(path)['artifacts'].items():
+        if names is not None and name not in names:
+            continue
+        fp = os.path.join(path, name)
+        if kind == 'parquet':
+            artifacts[name] = pd.read_parquet(fp + '.parquet')
+        elif kind == 'npy':
+            artifacts[name] = np.load(fp + '.npy', mmap_mode=mmap_mode)
+        elif kind == 'feature_store':
+            artifacts[name] = FeatureStore.open(fp + '.store')
+        elif kind == 'near_duplicates':
+            artifacts[name] = NearDuplicateIndex.load(fp + '.lsh', mmap_mode=mmap_mode)
+        else:
+            artifacts[name] = joblib.load(fp + '.joblib')
+    return artifacts
+
+
+# --------------------------------------------------
+# Content-addressed stage cache
+# --------------------------------------------------
+class StageCache:
+    """
+    Stores stage artifacts under <cache_dir>/<stage>/<key>/.
+    A stage directory only becomes visible once all of its artifacts
+    are written.
+    """
+
+    def __init__(self, cache_dir: str = '.cache/stages'):
+        self.cache_dir = cache_dir
+
+    def path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, key)
+
+    def has(self, stage: str, key: str) -> bool:
+        return os.path.exists(os.path.join(self.path(stage, key), MANIFEST))
+
+    def scratch_path(self, stage: str) -> str:
+        """
+        Fresh path inside the cache for artifacts built directly on disk
+        (e.g. a feature store); save() moves them into the stage directory.
+        """
+        os.makedirs(os.path.join(self.cache_dir, stage), exist_ok=True)
+        return os.path.join(self.cache_dir, stage, f".scratch-{uuid.uuid4().hex[:8]}")
+
+    def load(self, stage: str, key: str, mmap_mode: str = None) -> dict:
+        return read_artifact_dir(self.path(stage, key), mmap_mode=mmap_mode)
+
+    def save(self, stage: str, key: str, artifacts: dict) -> None:
+        stage_dir = self.path(stage, key)
+        tmp_dir = f"{stage_dir}.tmp-{uuid.uuid4().hex[:8]}"
+        write_artifact_dir(tmp_dir, artifacts, {'stage': stage, 'key': key})
+
+        try:
+            os.replace(tmp_dir, stage_dir)
+        except OSError:
+            # Another run published the same key first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        # Keep feature stores / indexes pointing at their published location
+        for name, obj in artifacts.items():
+            if isinstance(obj, FeatureStore) and obj.path is not None:
+                obj.path = os.path.join(stage_dir, name + '.store')
+            elif isinstance(obj, NearDuplicateIndex):
+                obj.path = os.path.join(stage_dir, name + '.lsh')
+
+    def run(self, stage: str, key: str, fn) -> dict:
+        """
+        Returns cached artifacts for (stage, key), or calls fn() and
+        stores its dict of artifacts.
+        """
+        if self.has(stage, key):
+            print(f"[cache] {stage}: hit ({key})")
+            return self.load(stage, key)
+
+        artifacts = fn()
+        self.save(stage, key, artifacts)
+        return artifacts
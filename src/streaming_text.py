@@ -0,0 +1,147 @@
+# ============================
+# STREAMING TEXT EMBEDDINGS
+# ============================
+
+import numpy as np
+import scipy.sparse as sp
+
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+from src.profiling import profile_stage
+
+
+HASH_FEATURES = 2 ** 20
+EMBED_CHUNK_SIZE = 50_000
+SVD_SAMPLE_SIZE = 100_000
+
+
+def iter_chunks(texts, chunk_size: int = EMBED_CHUNK_SIZE):
+    for start in range(0, len(texts), chunk_size):
+        yield texts[start:start + chunk_size]
+
+
+class HashedTfidfVectorizer:
+    """
+    TF-IDF over a fixed-size hashed term space, fitted in chunks.
+
+    partial_fit accumulates per-bucket document and term counts (two
+    arrays of n_features, whatever the vocabulary size); finalize keeps
+    the max_features most frequent buckets with df >= min_df, as
+    TfidfVectorizer does for terms, and computes smoothed IDF weights.
+    transform is stateless per chunk, so it streams as well.
+    """
+
+    def __init__(
+        self,
+        max_features: int = 5000,
+        ngram_range: tuple = (1, 1),
+        min_df: int = 1,
+        stop_words=None,
+        n_features: int = HASH_FEATURES
+    ):
+        self.max_features = max_features
+        self.ngram_range = tuple(ngram_range)
+        self.min_df = min_df
+        self.stop_words = stop_words
+        self.n_features = n_features
+
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=self.ngram_range,
+            stop_words=stop_words,
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32
+        )
+        self.n_docs_ = 0
+        self.doc_freq_ = np.zeros(n_features, dtype=np.int64)
+        self.term_freq_ = np.zeros(n_features, dtype=np.float64)
+        self.columns_ = None
+        self.idf_ = None
+
+    @classmethod
+    def from_tfidf_params(cls, params: dict, n_features: int = HASH_FEATURES):
+        keys = ('max_features', 'ngram_range', 'min_df', 'stop_words')
+        return cls(n_features=n_features, **{k: params[k] for k in keys if k in params})
+
+    def partial_fit(self, texts) -> "HashedTfidfVectorizer":
+        counts = self.hasher.transform(texts).tocsc()
+        self.n_docs_ += counts.shape[0]
+        self.doc_freq_ += np.diff(counts.indptr)
+        self.term_freq_ += np.asarray(counts.sum(axis=0)).ravel()
+        return self
+
+    def finalize(self) -> "HashedTfidfVectorizer":
+        candidates = np.flatnonzero(self.doc_freq_ >= self.min_df)
+        if self.max_features is not None and len(candidates) > self.max_features:
+            top = np.argsort(-self.term_freq_[candidates], kind='stable')[:self.max_features]
+            candidates = candidates[top]
+
+        self.columns_ = np.sort(candidates)
+        df = self.doc_freq_[self.columns_]
+        self.idf_ = (np.log((1 + self.n_docs_) / (1 + df)) + 1).astype(np.float32)
+        return self
+
+    def fit(self, texts, chunk_size: int = EMBED_CHUNK_SIZE) -> "HashedTfidfVectorizer":
+        for chunk in iter_chunks(texts, chunk_size):
+            self.partial_fit(chunk)
+        return self.finalize()
+
+    def transform(self, texts) -> sp.csr_matrix:
+        counts = self.hasher.transform(texts)[:, self.columns_]
+        return normalize(counts @ sp.diags(self.idf_), norm='l2', copy=False).tocsr()
+
+    def bucket(self, term: str) -> int:
+        """Hash bucket of an (already analyzed) term or n-gram."""
+        return abs(murmurhash3_32(term, seed=0, positive=False)) % self.n_features
+
+    def top_buckets(self, n: int) -> np.ndarray:
+        """Buckets of the n selected terms with the highest document frequency."""
+        order = np.argsort(-self.doc_freq_[self.columns_], kind='stable')[:n]
+        return self.columns_[order]
+
+
+def fit_streaming_embeddings(
+    texts,
+    tfidf_params: dict,
+    n_components: int,
+    chunk_size: int = EMBED_CHUNK_SIZE,
+    svd_sample_size: int = SVD_SAMPLE_SIZE,
+    random_state: int = 42,
+    svd_params: dict = None,
+    dtype=np.float64,
+    profiler=None
+):
+    """
+    Two chunked passes over cleaned texts: hashed DF/IDF, then TF-IDF →
+    SVD transform. The randomized SVD is fitted on a uniform row sample
+    of at most svd_sample_size documents, so only the sample and one
+    chunk of sparse TF-IDF rows are held at a time.
+    """
+    n = len(texts)
+    with profile_stage(profiler, 'text.tfidf', n):
+        vectorizer = HashedTfidfVectorizer.from_tfidf_params(tfidf_params).fit(texts, chunk_size)
+
+    with profile_stage(profiler, 'text.svd', n):
+        rng = np.random.default_rng(random_state)
+        sample = np.sort(rng.choice(n, min(n, svd_sample_size), replace=False))
+        X_sample = vectorizer.transform([texts[i] for i in sample])
+        svd = TruncatedSVD(n_components=n_components, random_state=random_state, **(svd_params or {}))
+        svd.fit(X_sample)
+
+        X_svd = np.empty((n, n_components), dtype=dtype)
+        X_svd[sample] = svd.transform(X_sample)
+        del X_sample
+
+        # Sampled rows are already embedded; stream the rest
+        rest = np.ones(n, dtype=bool)
+        rest[sample] = False
+        rest = np.flatnonzero(rest)
+        for start in range(0, len(rest), chunk_size):
+            rows = rest[start:start + chunk_size]
+            X_svd[rows] = svd.transform(vectorizer.transform([texts[i] for i in rows]))
+
+    return X_svd, vectorizer, svd
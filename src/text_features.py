@@ -1,54 +1,392 @@
+import os
 import re
+import gzip
+import json
 import string
-import nltk
-import contractions
+import multiprocessing
+import threading
 import pandas as pd
 
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import TruncatedSVD
+from src.profiling import profile_stage
 
-stop_words = set(stopwords.words('english'))
-lemmatizer = WordNetLemmatizer()
+# NLTK, contractions and scikit-learn are imported on first use so that
+# importing this module (and everything that imports it) stays cheap.
 
+# Precompiled cleaning steps (shared by the single-text and batched paths)
+URL_PATTERN = re.compile(r'http\S+|www\S+')
+DIGIT_WORD_PATTERN = re.compile(r'\w*\d\w*')
+PUNCT_TABLE = str.maketrans('', '', string.punctuation)
 
-def clean_and_lemmatize(text: str) -> str:
-    if not isinstance(text, str) or text.strip() == '':
-        return ''
+LEMMA_CACHE_SIZE = 200_000
+CLEAN_CHUNK_SIZE = 2_000
+# Cleaning workers are started from a clean server process rather than
+# forked from the caller, which may have other threads running (the
+# concurrent pipeline stages of src.dag); forking those can deadlock.
+CLEAN_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+# Imported once by the fork server, so each worker starts warm
+CLEAN_PRELOAD = ['src.text_features', 'contractions', 'nltk.tokenize', 'nltk.stem']
+
+TFIDF_PARAMS = {
+    'max_features': 5000,
+    'ngram_range': (1, 2),
+    'min_df': 2,
+    'stop_words': 'english'
+}
+SVD_COMPONENTS = 50
+
+# 'tfidf': exact vocabulary (TfidfVectorizer); 'hashing': fixed-size hashed
+# TF-IDF fitted in chunks with a sampled SVD (see src.streaming_text)
+TEXT_MODES = ('tfidf', 'hashing')
+
+# TruncatedSVD solver settings. 'randomized' cost grows with n_iter (power
+# iterations) and n_oversamples; dtype='float32' halves TF-IDF/SVD memory.
+SVD_PARAMS = {
+    'algorithm': 'randomized',
+    'n_iter': 5,
+    'n_oversamples': 10,
+    'dtype': 'float64'
+}
+TEXT_CHUNK_SIZE = 50_000
+
+# Precomputed stopwords + lemma table; when present the stopwords corpus
+# is never loaded and WordNet only lemmatizes tokens missing from it.
+# Build with: python -m src.text_features --build-lexicon CSV
+LEXICON_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'lexicon.json.gz'
+)
+
+
+# --------------------------------------------------
+# Lazily loaded NLP resources
+# --------------------------------------------------
+_nlp = None
+_nlp_lock = threading.Lock()  # service / DAG threads may clean text at once
+
+
+def load_lexicon(path: str = LEXICON_PATH):
+    """
+    Returns (stop_words, lemma_table) from a lexicon file, or None
+    when the file does not exist.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lexicon = json.load(f)
+    return set(lexicon['stopwords']), lexicon['lemmas']
+
+
+def _resources() -> dict:
+    """
+    Loads the tokenizer, stopwords and lemma table on first call.
+    Prefers the precomputed lexicon over the NLTK corpora.
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import contractions
+                from nltk.tokenize import word_tokenize
+
+                lexicon = load_lexicon(LEXICON_PATH)
+                if lexicon is not None:
+                    stop_words, lemmas = lexicon
+                else:
+                    from nltk.corpus import stopwords
+                    stop_words, lemmas = set(stopwords.words('english')), {}
+
+                _nlp = {
+                    'fix': contractions.fix,
+                    'tokenize': word_tokenize,
+                    'stop_words': stop_words,
+                    'lemmas': lemmas,
+                    'lemmatizer': None
+                }
+    return _nlp
+
+
+def _wordnet_lemmatize(token: str) -> str:
+    nlp = _resources()
+    if nlp['lemmatizer'] is None:
+        with _nlp_lock:
+            if nlp['lemmatizer'] is None:
+                from nltk.stem import WordNetLemmatizer
+                lemmatizer = WordNetLemmatizer()
+                lemmatizer.lemmatize('titles')  # loads the lazy WordNet corpus while locked
+                nlp['lemmatizer'] = lemmatizer
+    return nlp['lemmatizer'].lemmatize(token)
 
-    text = contractions.fix(text)
+
+def warm_up_nlp() -> None:
+    """
+    Loads the tokenizer, stopwords, lexicon and WordNet up front, so
+    concurrent callers never race on NLTK's lazy loaders.
+    """
+    _wordnet_lemmatize('titles')
+    _content_tokens("Warm-up: it's a short description.")
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def _lemmatize(token: str) -> str:
+    lemma = _resources()['lemmas'].get(token)
+    if lemma is None:
+        lemma = _wordnet_lemmatize(token)
+    return lemma
+
+
+def _content_tokens(text: str) -> list:
+    """Normalized tokens that survive stopword/length filtering."""
+    nlp = _resources()
+
+    text = nlp['fix'](text)
     text = text.lower()
-    text = re.sub(r'http\S+|www\S+', '', text)
-    text = text.translate(str.maketrans('', '', string.punctuation))
-    text = re.sub(r'\w*\d\w*', '', text)
-
-    tokens = word_tokenize(text)
-    tokens = [
-        lemmatizer.lemmatize(t)
-        for t in tokens
+    text = URL_PATTERN.sub('', text)
+    text = text.translate(PUNCT_TABLE)
+    text = DIGIT_WORD_PATTERN.sub('', text)
+
+    stop_words = nlp['stop_words']
+    return [
+        t for t in nlp['tokenize'](text)
         if t not in stop_words and len(t) > 1
     ]
-    return ' '.join(tokens)
 
 
-def build_text_embeddings(df: pd.DataFrame):
-    df = df.copy()
-    df['clean_description'] = df['description'].apply(clean_and_lemmatize)
+def clean_and_lemmatize(text: str) -> str:
+    if not isinstance(text, str) or text.strip() == '':
+        return ''
+
+    return ' '.join(_lemmatize(t) for t in _content_tokens(text))
+
+
+# --------------------------------------------------
+# Batched cleaning engine
+# --------------------------------------------------
+def _clean_chunk(texts: list) -> list:
+    return [clean_and_lemmatize(t) for t in texts]
+
+
+def clean_descriptions(
+    texts,
+    n_jobs: int = 1,
+    chunk_size: int = CLEAN_CHUNK_SIZE
+) -> list:
+    """
+    Cleans a sequence of descriptions in chunks, optionally across a
+    process pool. Output is identical to mapping clean_and_lemmatize.
+    n_jobs=-1 uses every available core.
+    """
+    texts = list(texts)
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
 
+    if n_jobs == 1 or len(chunks) <= 1:
+        cleaned = [_clean_chunk(c) for c in chunks]
+    else:
+        context = multiprocessing.get_context(CLEAN_START_METHOD)
+        if CLEAN_START_METHOD == 'forkserver':
+            context.set_forkserver_preload(CLEAN_PRELOAD)
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks)), mp_context=context) as pool:
+            cleaned = list(pool.map(_clean_chunk, chunks))
 
-    vectorizer = TfidfVectorizer(
-        max_features=5000,
-        ngram_range=(1, 2),
-        min_df=2,
-        stop_words='english'
-    )
+    return [t for chunk in cleaned for t in chunk]
 
-    tfidf_matrix = vectorizer.fit_transform(df['clean_description'])
 
-    svd = TruncatedSVD(n_components=50, random_state=42)
-    X_svd = svd.fit_transform(tfidf_matrix)
+def transform_text(texts, vectorizer, svd, chunk_size: int = TEXT_CHUNK_SIZE, dtype=None):
+    """
+    Embeds cleaned texts with already fitted models, chunk by chunk.
+    """
+    import numpy as np
+
+    dtype = np.dtype(dtype or svd.components_.dtype)
+    X_svd = np.empty((len(texts), svd.n_components), dtype=dtype)
+    for start in range(0, len(texts), chunk_size):
+        chunk = texts[start:start + chunk_size]
+        X_svd[start:start + len(chunk)] = svd.transform(vectorizer.transform(chunk))
+    return X_svd
+
+
+def clean_catalog_text(descriptions: list, n_jobs: int = 1, profiler=None, embedding_cache=None) -> list:
+    """
+    clean_descriptions for a whole catalog (a list, in row order),
+    through the EmbeddingCache when one is given.
+    """
+    with profile_stage(profiler, 'text.clean', len(descriptions)) as info:
+        if embedding_cache is None:
+            return clean_descriptions(descriptions, n_jobs=n_jobs)
+        cleaned = embedding_cache.cleaned(
+            descriptions, lambda texts: clean_descriptions(texts, n_jobs=n_jobs)
+        )
+        info['cache_hit_rate'] = embedding_cache.hit_rates()['clean_hit_rate']
+        return cleaned
+
+
+def build_text_embeddings(
+    df: pd.DataFrame,
+    n_jobs: int = 1,
+    tfidf_params: dict = None,
+    n_components: int = SVD_COMPONENTS,
+    profiler=None,
+    mode: str = 'tfidf',
+    svd_params: dict = None,
+    models: tuple = None,
+    embedding_cache=None,
+    cleaned: list = None
+):
+    """
+    Cleans descriptions and embeds them with TF-IDF → TruncatedSVD.
+    Returns (X_svd, vectorizer, svd). svd_params overrides SVD_PARAMS
+    (solver, power iterations, oversampling, dtype). With fitted
+    models=(vectorizer, svd) nothing is fitted: texts are only
+    transformed. An EmbeddingCache (src.embedding_cache) skips cleaning,
+    and in transform-only runs the SVD transform, for descriptions it
+    has already seen. cleaned (see clean_catalog_text) skips cleaning.
+    df is only read.
+    """
+    if mode not in TEXT_MODES:
+        raise ValueError(f"Unknown text embedding mode: {mode!r}")
+
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.decomposition import TruncatedSVD
+
+    svd_params = {**SVD_PARAMS, **(svd_params or {})}
+    dtype = np.dtype(svd_params.pop('dtype'))
+
+    descriptions = df['description'].tolist()
+    n_rows = len(descriptions)
+    if cleaned is None:
+        cleaned = clean_catalog_text(descriptions, n_jobs, profiler, embedding_cache)
+
+    if models is not None:
+        vectorizer, svd = models
+        with profile_stage(profiler, 'text.transform', n_rows) as info:
+            if embedding_cache is None:
+                X_svd = transform_text(cleaned, vectorizer, svd, dtype=dtype)
+            else:
+                from src.embedding_cache import model_version
+                X_svd = embedding_cache.vectors(
+                    descriptions, cleaned, model_version(vectorizer, svd),
+                    lambda texts: transform_text(texts, vectorizer, svd, dtype=dtype),
+                    svd.n_components, dtype
+                )
+                info['cache_hit_rate'] = embedding_cache.hit_rates()['vector_hit_rate']
+        return X_svd, vectorizer, svd
+
+    if mode == 'hashing':
+        from src.streaming_text import fit_streaming_embeddings
+        return fit_streaming_embeddings(
+            cleaned, tfidf_params or TFIDF_PARAMS, n_components,
+            svd_params=svd_params, dtype=dtype, profiler=profiler
+        )
+
+    vectorizer = TfidfVectorizer(dtype=dtype, **(tfidf_params or TFIDF_PARAMS))
+
+    with profile_stage(profiler, 'text.tfidf', n_rows):
+        tfidf_matrix = vectorizer.fit_transform(cleaned)
+
+    svd = TruncatedSVD(n_components=n_components, random_state=42, **svd_params)
+    with profile_stage(profiler, 'text.svd', n_rows):
+        X_svd = svd.fit_transform(tfidf_matrix)
 
     return X_svd, vectorizer, svd
+
+
+# --------------------------------------------------
+# Persisted text models (transform-only runs)
+# --------------------------------------------------
+def text_model_params(
+    mode: str = 'tfidf',
+    tfidf_params: dict = None,
+    n_components: int = SVD_COMPONENTS,
+    svd_params: dict = None
+) -> dict:
+    """Everything that determines the fitted vectorizer + SVD (JSON-safe)."""
+    return json.loads(json.dumps({
+        'mode': mode,
+        'tfidf_params': tfidf_params or TFIDF_PARAMS,
+        'n_components': n_components,
+        'svd_params': {**SVD_PARAMS, **(svd_params or {})}
+    }))
+
+
+def save_text_models(path: str, vectorizer, svd, params: dict) -> None:
+    import joblib
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    joblib.dump({'vectorizer': vectorizer, 'svd': svd, 'params': params}, tmp)
+    os.replace(tmp, path)
+
+
+def load_text_models(path: str, params: dict):
+    """
+    Returns the persisted (vectorizer, svd), or None when the file is
+    missing or was fitted with different parameters.
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    import joblib
+
+    saved = joblib.load(path)
+    if saved['params'] != params:
+        print(f"Text models at {path} were fitted with different parameters; refitting.")
+        return None
+    return saved['vectorizer'], saved['svd']
+
+# --------------------------------------------------
+# Lexicon builder
+# --------------------------------------------------
+def build_lexicon(texts, path: str = LEXICON_PATH) -> dict:
+    """
+    Precomputes the stopword list and the WordNet lemma of every token
+    in texts, and writes them to a gzipped JSON lexicon. Tokens missing
+    from the lexicon still fall back to WordNet at runtime.
+    """
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+
+    global _nlp
+    _nlp = None  # tokenize against the NLTK stopwords, not an old lexicon
+    nlp = _resources()
+    nlp['stop_words'] = set(stopwords.words('english'))
+    nlp['lemmas'] = {}
+
+    lemmatizer = WordNetLemmatizer()
+    vocab = set()
+    for text in texts:
+        if isinstance(text, str) and text.strip() != '':
+            vocab.update(_content_tokens(text))
+
+    lexicon = {
+        'stopwords': sorted(nlp['stop_words']),
+        'lemmas': {t: lemmatizer.lemmatize(t) for t in sorted(vocab)}
+    }
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(lexicon, f, separators=(',', ':'))
+
+    _nlp = None
+    _lemmatize.cache_clear()
+    return lexicon
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.data_loader import load_netflix_data
+    from src.nltk_setup import setup_nltk
+
+    parser = argparse.ArgumentParser(description="Build the precomputed text lexicon.")
+    parser.add_argument('--build-lexicon', metavar='DATA_PATH', required=True)
+    parser.add_argument('--out', default=LEXICON_PATH)
+    args = parser.parse_args()
+
+    setup_nltk(require_corpora=True)
+    lexicon = build_lexicon(load_netflix_data(args.build_lexicon)['description'], args.out)
+    print(f"Lexicon saved to {args.out}: {len(lexicon['stopwords'])} stopwords, "
+          f"{len(lexicon['lemmas'])} lemmas")